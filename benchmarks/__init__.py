@@ -0,0 +1 @@
+"""Benchmarks of the theaters application, run against a dedicated PostgreSQL database."""
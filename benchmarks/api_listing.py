@@ -0,0 +1,115 @@
+"""
+Per-page latency of the REST API listings on a large ticket table.
+
+Usage:
+    python -m benchmarks.api_listing --tickets 1000000 --keepdb
+"""
+
+import argparse
+from functools import partial
+
+from benchmarks.base import bench_database, format_timings, measure, setup_django, write_line
+
+BATCH_SIZE = 10000
+DEFAULT_TICKETS = 1000000
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_REPEAT = 50
+
+
+def seed(tickets: int) -> None:
+    """
+    Fill the benchmark database with tickets of a single show.
+
+    Args:
+        tickets (int): Number of tickets.
+    """
+    from theaters_app.models import Performance, Theater, TheaterPerformance, Ticket  # noqa: WPS433
+
+    theater = Theater.objects.create(title='Театр', address='Анархии 12')
+    performance = Performance.objects.create(
+        title='Название', description='Описание', date='2040-02-23',
+    )
+    t_p = TheaterPerformance.objects.create(theater=theater, performance=performance)
+    for start in range(0, tickets, BATCH_SIZE):
+        Ticket.objects.bulk_create(
+            Ticket(price=100, time='19:00', place=str(place), theater_performance=t_p)
+            for place in range(start, min(start + BATCH_SIZE, tickets))
+        )
+
+
+def page_cursors(page_size: int) -> dict[str, str | None]:
+    """
+    Build cursors of the first, middle and last pages of the tickets list.
+
+    Args:
+        page_size (int): Number of tickets on a page.
+
+    Returns:
+        dict[str, str | None]: Cursors by page name.
+    """
+    from theaters_app.models import Ticket  # noqa: WPS433
+    from theaters_app.pagination import NEXT, KeysetPaginator  # noqa: WPS433
+
+    paginator = KeysetPaginator(Ticket.objects.all(), page_size)
+    total = Ticket.objects.count()
+    offsets = {'middle': total // 2, 'last': max(total - page_size - 1, 0)}
+    cursors = {'first': None}
+    for name, offset in offsets.items():
+        cursors[name] = paginator.encode_cursor(paginator.queryset[offset], NEXT)
+    return cursors
+
+
+def measure_pages(client, page_size: int, repeat: int) -> None:
+    """
+    Print the latency of the first, middle and last pages in both serializer modes.
+
+    Args:
+        client (APIClient): Authenticated API client.
+        page_size (int): Number of tickets on a page.
+        repeat (int): Number of requests of every page.
+    """
+    for page, cursor in page_cursors(page_size).items():
+        for compact in (False, True):
+            query = {'page_size': page_size, 'compact': int(compact)}
+            if cursor:
+                query['cursor'] = cursor
+            timings = measure(partial(client.get, '/api/tickets/', query), repeat)
+            mode = 'compact' if compact else 'hyperlinked'
+            write_line(format_timings(f'tickets {page} page, {mode}', timings))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Returns:
+        Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tickets', type=int, default=DEFAULT_TICKETS)
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--keepdb', action='store_true', help='reuse the seeded database')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark and print the report."""
+    args = parse_args()
+    setup_django()
+    from django.contrib.auth.models import User  # noqa: WPS433
+    from rest_framework.test import APIClient  # noqa: WPS433
+
+    from theaters_app.models import Ticket  # noqa: WPS433
+
+    with bench_database(keep=args.keepdb):
+        if Ticket.objects.count() != args.tickets:
+            Ticket.objects.all().delete()
+            seed(args.tickets)
+        client = APIClient()
+        client.force_authenticate(User.objects.get_or_create(username='bench')[0])
+        measure_pages(client, args.page_size, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
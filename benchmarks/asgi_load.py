@@ -0,0 +1,331 @@
+"""
+Load test of the catalog pages served by the WSGI and the ASGI deployments.
+
+Both servers run the same number of worker processes on the benchmark database,
+the pages are requested by concurrent clients with a logged in session.
+
+Usage:
+    python -m benchmarks.asgi_load --concurrency 64 --duration 20 --keepdb
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess  # noqa: S404
+import sys
+import time
+from contextlib import contextmanager
+from http import HTTPStatus
+
+from benchmarks.base import P99, bench_database, setup_django, write_line
+
+BENCH_DB_NAME = 'bench_load_db'
+HOST = '127.0.0.1'
+THEATERS = 50
+PERFORMANCES = 20
+PLACES = 200
+STARTUP_TIMEOUT = 30
+POLL_INTERVAL = 0.2
+DEFAULT_CONCURRENCY = 64
+DEFAULT_DURATION = 20
+DEFAULT_PORT = 8765
+
+
+def server_commands(port: int, workers: int, threads: int) -> dict[str, list[str]]:
+    """
+    Build the commands starting the compared deployments.
+
+    Args:
+        port (int): Port to listen.
+        workers (int): Number of worker processes.
+        threads (int): Number of threads of a WSGI worker.
+
+    Returns:
+        dict[str, list[str]]: Commands by deployment name.
+    """
+    return {
+        'wsgi': [
+            sys.executable, '-m', 'gunicorn', 'theaters.wsgi:application',
+            '--bind', f'{HOST}:{port}', '--workers', str(workers), '--threads', str(threads),
+            '--log-level', 'warning',
+        ],
+        'asgi': [
+            sys.executable, '-m', 'uvicorn', 'theaters.asgi:application',
+            '--host', HOST, '--port', str(port), '--workers', str(workers),
+            '--log-level', 'warning',
+        ],
+    }
+
+
+def seed() -> list[str]:
+    """
+    Fill the benchmark database with a catalog of shows.
+
+    Returns:
+        list[str]: Paths of the pages to request.
+    """
+    from theaters_app.models import Performance, Theater, TheaterPerformance, Ticket  # noqa: WPS433
+
+    theaters = Theater.objects.bulk_create(
+        Theater(title=f'Театр {num}', address='Анархии 12', rating=num % 5)
+        for num in range(THEATERS)
+    )
+    performances = Performance.objects.bulk_create(
+        Performance(title=f'Спектакль {num}', description='Описание', date='2040-02-23')
+        for num in range(PERFORMANCES)
+    )
+    shows = TheaterPerformance.objects.bulk_create(
+        TheaterPerformance(theater=theater, performance=performances[num % PERFORMANCES])
+        for num, theater in enumerate(theaters)
+    )
+    for show in shows:
+        Ticket.objects.bulk_create(
+            Ticket(price=100, time='19:00', place=f'A-{place}', theater_performance=show)
+            for place in range(PLACES)
+        )
+    return page_paths()
+
+
+def page_paths() -> list[str]:
+    """
+    List the pages of the load test.
+
+    Returns:
+        list[str]: Paths of the pages.
+    """
+    from theaters_app.models import Performance, Theater  # noqa: WPS433
+
+    theaters = Theater.objects.values_list('id', flat=True)[:10]
+    performances = Performance.objects.values_list('id', flat=True)[:10]
+    return [
+        '/', '/theaters/', '/performances/',
+        *(f'/theater/{pk}' for pk in theaters),
+        *(f'/performance/{pk}' for pk in performances),
+    ]
+
+
+def session_cookie() -> str:
+    """
+    Log in the benchmark user and get its session cookie.
+
+    Returns:
+        str: Cookie header value.
+    """
+    from django.contrib.auth.models import User  # noqa: WPS433
+    from django.test import Client as HttpClient  # noqa: WPS433
+
+    from theaters_app.models import Client  # noqa: WPS433
+
+    user, created = User.objects.get_or_create(username='bench')
+    if created:
+        Client.objects.create(user=user)
+    client = HttpClient()
+    client.force_login(user)
+    cookies = [f'{name}={morsel.value}' for name, morsel in client.cookies.items()]
+    return '; '.join(cookies)
+
+
+async def fetch(port: int, path: str, cookie: str) -> int:
+    """
+    Request the page over a new connection.
+
+    Args:
+        port (int): Port of the server.
+        path (str): Path of the page.
+        cookie (str): Cookie header value.
+
+    Returns:
+        int: HTTP status of the response.
+    """
+    reader, writer = await asyncio.open_connection(HOST, port)
+    headers = f'Host: {HOST}\r\nCookie: {cookie}\r\nConnection: close\r\n'
+    writer.write(f'GET {path} HTTP/1.1\r\n{headers}\r\n'.encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(response.split(b' ', 2)[1])
+
+
+async def load(port: int, paths: list[str], cookie: str, concurrency: int, duration: float):
+    """
+    Request the pages from concurrent clients during the given time.
+
+    Args:
+        port (int): Port of the server.
+        paths (list[str]): Paths of the pages, requested in turn.
+        cookie (str): Cookie header value.
+        concurrency (int): Number of concurrent clients.
+        duration (float): Duration of the load in seconds.
+
+    Returns:
+        tuple[list[float], int]: Latencies in milliseconds and number of failed requests.
+    """
+    deadline = time.perf_counter() + duration
+    clients = await asyncio.gather(*(
+        run_client(port, paths, cookie, offset, deadline) for offset in range(concurrency)
+    ))
+    timings = [timing for client_timings, _ in clients for timing in client_timings]
+    return timings, sum(errors for _, errors in clients)
+
+
+async def run_client(port: int, paths: list[str], cookie: str, offset: int, deadline: float):
+    """
+    Request the pages one after another until the deadline.
+
+    Args:
+        port (int): Port of the server.
+        paths (list[str]): Paths of the pages, requested in turn.
+        cookie (str): Cookie header value.
+        offset (int): Index of the first requested page.
+        deadline (float): End of the load, from time.perf_counter().
+
+    Returns:
+        tuple[list[float], int]: Latencies in milliseconds and number of failed requests.
+    """
+    timings, errors = [], 0
+    num = offset
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            status = await fetch(port, paths[num % len(paths)], cookie)
+        except (OSError, ValueError, IndexError):
+            status = 0
+        timings.append((time.perf_counter() - start) * 1000)
+        errors += status != HTTPStatus.OK
+        num += 1
+    return timings, errors
+
+
+def wait_for_port(port: int, process: subprocess.Popen) -> None:
+    """
+    Wait until the server accepts connections.
+
+    Args:
+        port (int): Port of the server.
+        process (subprocess.Popen): Server process.
+
+    Raises:
+        RuntimeError: If the server exits or does not start in time.
+    """
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+        except OSError:
+            time.sleep(POLL_INTERVAL)
+        else:
+            return
+    raise RuntimeError('server did not start in time')
+
+
+def report(name: str, timings: list[float], errors: int, duration: float) -> str:
+    """
+    Describe the throughput and the latency of the deployment.
+
+    Args:
+        name (str): Name of the deployment.
+        timings (list[float]): Latencies in milliseconds.
+        errors (int): Number of failed requests.
+        duration (float): Duration of the load in seconds.
+
+    Returns:
+        str: Report line.
+    """
+    throughput = len(timings) / duration
+    median = statistics.median(timings)
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    p99 = percentiles[P99 - 1]
+    return ' '.join((
+        f'{name:<6}',
+        f'{throughput:8.1f} req/s',
+        f'p50={median:.1f}ms',
+        f'p99={p99:.1f}ms',
+        f'errors={errors}',
+    ))
+
+
+@contextmanager
+def serving(command: list[str], env: dict[str, str]):
+    """
+    Run the server while the block runs.
+
+    Args:
+        command (list[str]): Command starting the server.
+        env (dict[str, str]): Environment of the server.
+
+    Yields:
+        subprocess.Popen: Server process.
+    """
+    with subprocess.Popen(command, env=env) as process:  # noqa: S603
+        try:
+            yield process
+        finally:
+            process.terminate()
+
+
+def run_load(
+    command: list[str],
+    env: dict[str, str],
+    args: argparse.Namespace,
+    paths: list[str],
+    cookie: str,
+) -> tuple[list[float], int]:
+    """
+    Start the server, load it with the requests of the pages and stop it.
+
+    Args:
+        command (list[str]): Command starting the server.
+        env (dict[str, str]): Environment of the server.
+        args (Namespace): Parsed arguments with the port, concurrency and duration.
+        paths (list[str]): Paths of the pages.
+        cookie (str): Cookie header value.
+
+    Returns:
+        tuple[list[float], int]: Latencies in milliseconds and number of failed requests.
+    """
+    with serving(command, env) as process:
+        wait_for_port(args.port, process)
+        return asyncio.run(load(args.port, paths, cookie, args.concurrency, args.duration))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Returns:
+        Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='threads of a WSGI worker')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--keepdb', action='store_true', help='reuse the seeded database')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the load test against both deployments and print the report."""
+    args = parse_args()
+    setup_django()
+    from theaters_app.models import Theater  # noqa: WPS433
+
+    with bench_database(BENCH_DB_NAME, keep=args.keepdb) as name:
+        paths = page_paths() if Theater.objects.count() == THEATERS else seed()
+        cookie = session_cookie()
+        commands = server_commands(args.port, args.workers, args.threads)
+        for deployment, command in commands.items():
+            timings, errors = run_load(
+                command, {**os.environ, 'PG_DBNAME': name}, args, paths, cookie,
+            )
+            write_line(report(deployment, timings, errors, args.duration))
+
+
+if __name__ == '__main__':
+    main()
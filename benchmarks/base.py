@@ -0,0 +1,112 @@
+"""Common helpers of the benchmarks: Django setup, benchmark database and timing."""
+
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from types import MethodType
+
+BENCH_DB_NAME = 'bench_db'
+P95 = 95
+P99 = 99
+
+
+def setup_django() -> None:
+    """Configure Django to run outside of the development server."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'theaters.settings')
+    import django  # noqa: WPS433
+    from django.test.utils import setup_test_environment  # noqa: WPS433
+
+    django.setup()
+    # allows the test client and disables DEBUG, which would keep every query in memory
+    setup_test_environment()
+
+
+@contextmanager
+def bench_database(name: str = BENCH_DB_NAME, keep: bool = False):
+    """
+    Create a dedicated database for the benchmark, so the development data is not touched.
+
+    Args:
+        name (str): Name of the benchmark database.
+        keep (bool): Keep the database and its data between runs.
+
+    Yields:
+        str: Name of the benchmark database.
+    """
+    from django.db import connection  # noqa: WPS433
+
+    from tests.runner import prepare_db  # noqa: WPS433
+
+    connection.prepare_database = MethodType(prepare_db, connection)
+    old_name = connection.settings_dict['NAME']
+    connection.settings_dict['TEST'] = {**connection.settings_dict['TEST'], 'NAME': name}
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keep)
+    try:
+        yield name
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keep)
+
+
+def measure(func, repeat: int) -> dict[str, float]:
+    """
+    Call the function several times and describe its latency.
+
+    Args:
+        func (Callable): Function to measure.
+        repeat (int): Number of calls.
+
+    Returns:
+        dict[str, float]: Mean, median, 95th and 99th percentiles in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return describe(timings)
+
+
+def describe(timings: list[float]) -> dict[str, float]:
+    """
+    Describe the latency distribution.
+
+    Args:
+        timings (list[float]): Latencies in milliseconds, at least two.
+
+    Returns:
+        dict[str, float]: Mean, median, 95th and 99th percentiles in milliseconds.
+    """
+    percentiles = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'mean': statistics.fmean(timings),
+        'p50': statistics.median(timings),
+        'p95': percentiles[P95 - 1],
+        'p99': percentiles[P99 - 1],
+    }
+
+
+def format_timings(name: str, timings: dict[str, float]) -> str:
+    """
+    Format the latency description as a report line.
+
+    Args:
+        name (str): Name of the measured case.
+        timings (dict[str, float]): Result of measure().
+
+    Returns:
+        str: Report line.
+    """
+    columns = [f'{key}={timing:.2f}ms' for key, timing in timings.items()]
+    return '{0:<40} {1}'.format(name, ' '.join(columns))
+
+
+def write_line(line: str) -> None:
+    """
+    Print a line of the report.
+
+    Args:
+        line (str): Report line.
+    """
+    sys.stdout.write(f'{line}\n')
@@ -0,0 +1,115 @@
+"""
+Latency of buying several tickets with one basket purchase against sequential single buys.
+
+Usage:
+    python -m benchmarks.basket --sizes 1 2 5 10 20 --repeat 50
+"""
+
+import argparse
+from functools import partial
+from itertools import islice
+from typing import Iterator
+from uuid import UUID
+
+from benchmarks.base import bench_database, format_timings, measure, setup_django, write_line
+from benchmarks.datagen import BENCH_PASSWORD
+
+BENCH_DB_NAME = 'bench_basket_db'
+BATCH_SIZE = 10000
+DEFAULT_SIZES = (1, 2, 5, 10, 20)
+DEFAULT_REPEAT = 50
+
+
+def seed(tickets: int):
+    """
+    Fill the benchmark database with free tickets of a single show and a rich client.
+
+    Args:
+        tickets (int): Number of tickets.
+
+    Returns:
+        tuple[UUID, list[UUID]]: ID of the client and IDs of the tickets.
+    """
+    from django.contrib.auth.models import User  # noqa: WPS433
+
+    from theaters_app.models import (  # noqa: WPS433
+        Client,
+        Performance,
+        Theater,
+        TheaterPerformance,
+        Ticket,
+    )
+
+    theater = Theater.objects.create(title='Театр', address='Анархии 12')
+    performance = Performance.objects.create(
+        title='Название', description='Описание', date='2040-02-23',
+    )
+    t_p = TheaterPerformance.objects.create(theater=theater, performance=performance)
+    for start in range(0, tickets, BATCH_SIZE):
+        Ticket.objects.bulk_create(
+            Ticket(price=100, time='19:00', place=str(place), theater_performance=t_p)
+            for place in range(start, min(start + BATCH_SIZE, tickets))
+        )
+    client = Client.objects.create(
+        user=User.objects.create(username='bench', password=BENCH_PASSWORD), money=10 ** 7,
+    )
+    return client.id, list(Ticket.objects.values_list('id', flat=True))
+
+
+def buy_sequentially(client_id: UUID, free: Iterator[UUID], size: int) -> None:
+    """
+    Buy the next free tickets one by one.
+
+    Args:
+        client_id (UUID): ID of the buyer.
+        free (Iterator[UUID]): IDs of the free tickets.
+        size (int): Number of the bought tickets.
+    """
+    from theaters_app import purchase  # noqa: WPS433
+
+    for ticket_id in islice(free, size):
+        purchase.purchase_ticket(client_id, ticket_id)
+
+
+def buy_basket(client_id: UUID, free: Iterator[UUID], size: int) -> None:
+    """
+    Buy the next free tickets with one basket purchase.
+
+    Args:
+        client_id (UUID): ID of the buyer.
+        free (Iterator[UUID]): IDs of the free tickets.
+        size (int): Number of the bought tickets.
+    """
+    from theaters_app import purchase  # noqa: WPS433
+
+    purchase.purchase_tickets(client_id, list(islice(free, size)))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Returns:
+        Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark and print the report."""
+    args = parse_args()
+    setup_django()
+    with bench_database(BENCH_DB_NAME):
+        client_id, ticket_ids = seed(2 * args.repeat * sum(args.sizes))
+        free = iter(ticket_ids)
+        for size in args.sizes:
+            for name, buy in (('sequential', buy_sequentially), ('basket', buy_basket)):
+                timings = measure(partial(buy, client_id, free, size), args.repeat)
+                write_line(format_timings(f'{size} tickets, {name}', timings))
+
+
+if __name__ == '__main__':
+    main()
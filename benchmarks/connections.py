@@ -0,0 +1,113 @@
+"""
+Overhead of opening a Postgres connection per request against persistent ones.
+
+First measures opening a connection against a query on an open one, then serves the
+catalog pages by gunicorn with every connection mode configured through the PG_*
+environment variables.
+
+Usage:
+    python -m benchmarks.connections --concurrency 8 --duration 10 --keepdb
+"""
+
+import argparse
+import os
+from functools import partial
+from types import MappingProxyType
+
+from benchmarks import asgi_load
+from benchmarks.base import bench_database, format_timings, measure, setup_django, write_line
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 10
+DEFAULT_REPEAT = 200
+MODES = MappingProxyType({
+    'per request': {'PG_CONN_MAX_AGE': '0'},
+    'persistent': {'PG_CONN_MAX_AGE': '60', 'PG_CONN_HEALTH_CHECKS': '1'},
+})
+
+
+def reconnect(connection) -> None:
+    """
+    Close the connection and open a new one.
+
+    Args:
+        connection (BaseDatabaseWrapper): The database connection.
+    """
+    connection.close()
+    connection.ensure_connection()
+
+
+def select_one(connection) -> None:
+    """
+    Run the cheapest query on the open connection.
+
+    Args:
+        connection (BaseDatabaseWrapper): The database connection.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def connection_setup(repeat: int) -> None:
+    """
+    Print the latency of opening a connection and of a query on an open one.
+
+    Args:
+        repeat (int): Number of measured calls.
+    """
+    from django.db import connection  # noqa: WPS433
+
+    for name, func in (('open a connection', reconnect), ('SELECT 1 on an open one', select_one)):
+        write_line(format_timings(name, measure(partial(func, connection), repeat)))
+
+
+def serve_modes(args: argparse.Namespace, database: str, paths: list[str], cookie: str) -> None:
+    """
+    Print the load report of gunicorn with every connection mode.
+
+    Args:
+        args (Namespace): Parsed arguments.
+        database (str): Name of the seeded database.
+        paths (list[str]): Paths of the pages.
+        cookie (str): Cookie header value.
+    """
+    command = asgi_load.server_commands(args.port, args.workers, args.threads)['wsgi']
+    for mode, variables in MODES.items():
+        env = {**os.environ, **variables, 'PG_DBNAME': database}
+        timings, errors = asgi_load.run_load(command, env, args, paths, cookie)
+        write_line(asgi_load.report(mode, timings, errors, args.duration))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Returns:
+        Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='threads of a WSGI worker')
+    parser.add_argument('--port', type=int, default=asgi_load.DEFAULT_PORT)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--keepdb', action='store_true', help='reuse the seeded database')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the benchmark and print the report."""
+    args = parse_args()
+    setup_django()
+    from theaters_app.models import Theater  # noqa: WPS433
+
+    with bench_database(asgi_load.BENCH_DB_NAME, keep=args.keepdb) as name:
+        connection_setup(args.repeat)
+        seeded = Theater.objects.count() == asgi_load.THEATERS
+        paths = asgi_load.page_paths() if seeded else asgi_load.seed()
+        serve_modes(args, name, paths, asgi_load.session_cookie())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Reproducible generator of the benchmark data: theaters, performances, shows, tickets and clients.
+
+The same sizes and seed always produce the same catalog, so the results of different
+commits are comparable.
+
+Usage:
+    python -m benchmarks.datagen --theaters 100 --performances 500 --tickets 200000
+"""
+
+import argparse
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import date
+
+from benchmarks.base import bench_database, setup_django, write_line
+
+BATCH_SIZE = 10000
+BENCH_PASSWORD = 'bench'  # noqa: S105
+YEAR = 2040
+MONTHS = 12
+# the days every month has
+MONTH_DAYS = 28
+BALANCE = 10 ** 6
+PRICES = (500, 1000, 1500, 3000)
+
+
+@dataclass(frozen=True)
+class Sizes:
+    """Sizes of the generated data."""
+
+    theaters: int = 100
+    performances: int = 500
+    tickets: int = 200000
+    clients: int = 100
+    sold: float = 0.3
+    seed: int = 0
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the size arguments to the command line parser.
+
+    Args:
+        parser (ArgumentParser): Parser of a benchmark script.
+    """
+    defaults = Sizes()
+    for name, default in asdict(defaults).items():
+        parser.add_argument(f'--{name}', type=type(default), default=default)
+
+
+def sizes_from(args: argparse.Namespace) -> Sizes:
+    """
+    Get the sizes from the parsed arguments.
+
+    Args:
+        args (Namespace): Parsed arguments.
+
+    Returns:
+        Sizes: The sizes.
+    """
+    return Sizes(**{name: getattr(args, name) for name in asdict(Sizes())})
+
+
+def is_generated(sizes: Sizes) -> bool:
+    """
+    Check that the database already holds the data of these sizes.
+
+    Args:
+        sizes (Sizes): Expected sizes.
+
+    Returns:
+        bool: True if the counts match.
+    """
+    from theaters_app.models import Client, Performance, Theater, Ticket
+
+    return (
+        Theater.objects.count(),
+        Performance.objects.count(),
+        Ticket.objects.count(),
+        Client.objects.count(),
+    ) == (sizes.theaters, sizes.performances, sizes.tickets, sizes.clients)
+
+
+def clear() -> None:
+    """Delete the catalog, the tickets and the benchmark users and clear the cache."""
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.db import connection
+
+    from theaters_app.models import Client, Performance, Theater, TheaterPerformance, Ticket
+
+    # TRUNCATE skips the per row delete signals, which would load every ticket
+    tables = ', '.join(
+        model._meta.db_table
+        for model in (Ticket, TheaterPerformance, Performance, Theater, Client)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'TRUNCATE {tables} CASCADE')
+    User.objects.filter(username__startswith='bench').delete()
+    cache.clear()
+
+
+def generate_catalog(sizes: Sizes, rng: random.Random) -> list:
+    """
+    Create the theaters and the performances, every performance is shown in one to three theaters.
+
+    Args:
+        sizes (Sizes): Sizes of the data.
+        rng (Random): Random generator of the data.
+
+    Returns:
+        list: The shows.
+    """
+    from theaters_app.models import Performance, Theater, TheaterPerformance
+
+    theaters = Theater.objects.bulk_create(
+        Theater(
+            title=f'Theater {num}',
+            address=f'Street {num}',
+            rating=rng.randint(0, 5),
+        )
+        for num in range(sizes.theaters)
+    )
+    performances = Performance.objects.bulk_create(
+        Performance(
+            title=f'Performance {num}',
+            description=f'Description of the performance {num}',
+            date=date(YEAR, rng.randint(1, MONTHS), rng.randint(1, MONTH_DAYS)),
+        )
+        for num in range(sizes.performances)
+    )
+    return TheaterPerformance.objects.bulk_create(
+        TheaterPerformance(theater=theater, performance=performance)
+        for performance in performances
+        for theater in rng.sample(theaters, min(rng.randint(1, 3), len(theaters)))
+    )
+
+
+def generate(sizes: Sizes) -> None:
+    """
+    Replace the data of the database with the generated one.
+
+    The tickets are spread over the shows evenly and the given share of them is sold
+    to random clients.
+
+    Args:
+        sizes (Sizes): Sizes of the data.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.contrib.auth.models import User
+
+    from theaters_app import inventory
+    from theaters_app.models import Client, Ticket
+
+    rng = random.Random(sizes.seed)
+    clear()
+    password = make_password(BENCH_PASSWORD)
+    users = User.objects.bulk_create(
+        User(username=f'bench{num}', password=password) for num in range(sizes.clients)
+    )
+    clients = Client.objects.bulk_create(Client(user=user, money=BALANCE) for user in users)
+    shows = generate_catalog(sizes, rng)
+    batch = []
+    for num in range(sizes.tickets):
+        sold = rng.random() < sizes.sold
+        batch.append(Ticket(
+            price=rng.choice(PRICES),
+            time='19:00',
+            place=str(num // len(shows)),
+            theater_performance=shows[num % len(shows)],
+            client=rng.choice(clients) if sold else None,
+        ))
+        if len(batch) == BATCH_SIZE:
+            Ticket.objects.bulk_create(batch)
+            batch = []
+    Ticket.objects.bulk_create(batch)
+    inventory.reconcile()
+
+
+def main() -> None:
+    """Generate the data in the benchmark database and keep it."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    parser.add_argument('--database', default='bench_suite_db')
+    args = parser.parse_args()
+
+    setup_django()
+    with bench_database(args.database, keep=True):
+        start = time.perf_counter()
+        generate(sizes_from(args))
+        elapsed = time.perf_counter() - start
+        write_line(f'generated in {elapsed:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
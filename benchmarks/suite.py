@@ -0,0 +1,553 @@
+"""
+Benchmark suite of the main user flows on generated data.
+
+Every scenario is run by the test client in process and reports the throughput,
+the latency percentiles and the number of queries per request. The results may be
+saved as JSON together with the commit and the data sizes and compared with a
+result of another commit.
+
+Usage:
+    python -m benchmarks.suite --tickets 200000 --json HEAD.json
+    python -m benchmarks.suite --tickets 200000 --compare HEAD.json
+"""
+
+import argparse
+import json
+import logging
+import random
+import subprocess  # noqa: S404
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from itertools import cycle
+from types import MappingProxyType
+from typing import Callable
+from uuid import UUID
+
+from benchmarks import datagen
+from benchmarks.base import bench_database, describe, setup_django, write_line
+
+BENCH_DB_NAME = 'bench_suite_db'
+PAGE_SIZE = 50
+PAGES = 20
+PERFORMANCES = 200
+DEFAULT_REPEAT = 200
+DEFAULT_WARMUP = 20
+SUCCESS_STATUSES = frozenset((200, 302, 304))
+COMPARED = ('throughput', 'p95', 'queries')
+PERCENTILES = ('p50', 'p95', 'p99')
+# purchase rush scenarios by the ticket lock mode, see theaters_app.purchase.LOCK_MODES
+RUSHES = MappingProxyType({
+    'purchase rush nowait': 'nowait', 'purchase rush skip_locked': 'skip_locked',
+})
+
+
+@dataclass
+class Measurements:
+    """Measurements of one scenario."""
+
+    seconds: float = 0
+    statuses: list[int] = field(default_factory=list)
+    timings: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+
+    def record(self, status_code: int, milliseconds: float, queries: int) -> None:
+        """
+        Record a request.
+
+        Args:
+            status_code (int): Status of the response.
+            milliseconds (float): Latency of the request.
+            queries (int): Number of the queries made by the request.
+        """
+        self.statuses.append(status_code)
+        self.timings.append(milliseconds)
+        self.queries.append(queries)
+
+    def extend(self, other: 'Measurements') -> None:
+        """
+        Add the requests measured by another worker.
+
+        Args:
+            other (Measurements): Measurements of the worker.
+        """
+        self.statuses.extend(other.statuses)
+        self.timings.extend(other.timings)
+        self.queries.extend(other.queries)
+
+    def summary(self) -> dict[str, float]:
+        """
+        Summarize the measurements.
+
+        Returns:
+            dict[str, float]: Throughput, latency percentiles, queries per request and errors.
+        """
+        requests = len(self.statuses)
+        return {
+            'requests': requests,
+            'throughput': requests / self.seconds if self.seconds else 0,
+            **describe(self.timings),
+            'queries': sum(self.queries) / requests,
+            'errors': sum(status not in SUCCESS_STATUSES for status in self.statuses),
+        }
+
+
+def timed(request: Callable, measured: Measurements) -> None:
+    """
+    Make the request and record its latency and queries.
+
+    Args:
+        request (Callable): Function making one request.
+        measured (Measurements): Measurements of the scenario.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    queries = CaptureQueriesContext(connection)
+    with queries:
+        start = time.perf_counter()
+        response = request()
+        milliseconds = (time.perf_counter() - start) * 1000
+    measured.record(response.status_code, milliseconds, len(queries))
+
+
+def page_cursors(queryset, per_page: int, limit: int) -> list[str | None]:
+    """
+    Collect the cursors of the first pages of the queryset.
+
+    Args:
+        queryset (QuerySet): Paginated queryset.
+        per_page (int): Number of objects on a page.
+        limit (int): Maximum number of pages.
+
+    Returns:
+        list[str | None]: Cursors, None for the first page.
+    """
+    from theaters_app.pagination import KeysetPaginator
+
+    paginator = KeysetPaginator(queryset, per_page)
+    cursors = [None]
+    while len(cursors) < limit:
+        cursor = paginator.get_page(cursors[-1]).next_cursor
+        if cursor is None:
+            break
+        cursors.append(cursor)
+    return cursors
+
+
+def round_robin(sequence: list) -> Callable:
+    """
+    Make a function returning the elements of the sequence one by one in a loop.
+
+    Args:
+        sequence (list): The elements.
+
+    Returns:
+        Callable: Function returning the next element.
+    """
+    return partial(next, cycle(sequence))
+
+
+def get_page(client, path: str, next_cursor: Callable, query: dict):
+    """
+    Request the page of the next cursor.
+
+    Args:
+        client (Client): Logged in test client.
+        path (str): Path of the paginated list.
+        next_cursor (Callable): Function returning the next cursor, None for the first page.
+        query (dict): Other query parameters.
+
+    Returns:
+        HttpResponse: The response.
+    """
+    cursor = next_cursor()
+    return client.get(path, {**query, 'cursor': cursor} if cursor else query)
+
+
+def homepage(client) -> Callable:
+    """
+    Request the home page.
+
+    Args:
+        client (Client): Logged in test client.
+
+    Returns:
+        Callable: Function making one request.
+    """
+    return lambda: client.get('/')
+
+
+def catalog_paging(client) -> Callable:
+    """
+    Walk the pages of the theaters catalog.
+
+    Args:
+        client (Client): Logged in test client.
+
+    Returns:
+        Callable: Function making one request.
+    """
+    from theaters_app.models import Theater
+    from theaters_app.views import TheaterListView
+
+    cursors = page_cursors(Theater.objects.all(), TheaterListView.paginate_by, limit=PAGES)
+    return partial(get_page, client, '/theaters/', round_robin(cursors), {})
+
+
+def performance_page(client) -> Callable:
+    """
+    Open the pages of random performances.
+
+    Args:
+        client (Client): Logged in test client.
+
+    Returns:
+        Callable: Function making one request.
+    """
+    from theaters_app.models import Performance
+
+    ids = list(Performance.objects.order_by('pk').values_list('id', flat=True)[:PERFORMANCES])
+    next_id = round_robin(random.Random(0).sample(ids, len(ids)))
+    return lambda: client.get(f'/performance/{next_id()}')
+
+
+def profile(client) -> Callable:
+    """
+    Open the profile with the bought tickets.
+
+    Args:
+        client (Client): Logged in test client.
+
+    Returns:
+        Callable: Function making one request.
+    """
+    return lambda: client.get('/profile/')
+
+
+def api_listing(client) -> Callable:
+    """
+    Walk the pages of the tickets API.
+
+    Args:
+        client (Client): Logged in test client.
+
+    Returns:
+        Callable: Function making one request.
+    """
+    from theaters_app.models import Ticket
+
+    next_cursor = round_robin(page_cursors(Ticket.objects.all(), PAGE_SIZE, limit=PAGES))
+    return partial(get_page, client, '/api/tickets/', next_cursor, {'page_size': PAGE_SIZE})
+
+
+# scenarios get the logged in test client and return a function making one request
+SCENARIOS = MappingProxyType({
+    'homepage': homepage,
+    'catalog paging': catalog_paging,
+    'performance page': performance_page,
+    'profile': profile,
+    'api listing': api_listing,
+})
+
+
+def run_scenario(make_request: Callable, client, warmup: int, repeat: int) -> Measurements:
+    """
+    Run the scenario sequentially.
+
+    Args:
+        make_request (Callable): Scenario.
+        client (Client): Logged in test client.
+        warmup (int): Number of the requests made before measuring.
+        repeat (int): Number of the measured requests.
+
+    Returns:
+        Measurements: Measurements.
+    """
+    request = make_request(client)
+    for _ in range(warmup):
+        request()
+    measured = Measurements()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        timed(request, measured)
+    measured.seconds = time.perf_counter() - start
+    return measured
+
+
+def free_tickets(limit: int) -> list[UUID]:
+    """
+    Find the free tickets of the show with the most of them.
+
+    Args:
+        limit (int): Maximum number of tickets.
+
+    Returns:
+        list[UUID]: IDs of the tickets in a stable order.
+    """
+    from django.db import models
+
+    from theaters_app.models import TheaterPerformance, Ticket
+
+    show = TheaterPerformance.objects.filter(ticket__client=None).annotate(
+        free=models.Count('ticket'),
+    ).order_by('-free', 'id').first()
+    tickets = Ticket.objects.filter(theater_performance=show, client=None).order_by('place', 'pk')
+    return list(tickets.values_list('pk', flat=True)[:limit])
+
+
+def buy_tickets(
+    user,
+    tickets: list[UUID],
+    barrier: threading.Barrier,
+    measured: Measurements,
+    lock: threading.Lock,
+) -> None:
+    """
+    Try to buy the tickets one by one as the user once all the buyers are ready.
+
+    Args:
+        user (User): The buyer.
+        tickets (list[UUID]): IDs of the tickets.
+        barrier (Barrier): Barrier of the buyers.
+        measured (Measurements): Measurements of all the buyers.
+        lock (Lock): Lock of the measurements.
+    """
+    from django.db import connection
+    from django.test import Client as TestClient
+
+    client = TestClient()
+    client.force_login(user)
+    attempts = Measurements()
+    barrier.wait()
+    for ticket_id in tickets:
+        timed(partial(client.post, f'/buy/{ticket_id}'), attempts)
+    connection.close()
+    with lock:
+        measured.extend(attempts)
+
+
+def purchase_rush(users: list, workers: int, repeat: int, lock_mode: str) -> Measurements:
+    """
+    Let concurrent buyers race for the same free seats of one show.
+
+    Every worker tries to buy the same tickets in the same order, so most attempts
+    meet a locked or sold seat and are counted as errors. The sold tickets and the
+    balances are restored afterwards, so the data stays the same between the runs.
+
+    Args:
+        users (list): Users of the buyers, one per worker.
+        workers (int): Number of concurrent buyers.
+        repeat (int): Number of the purchase attempts of every buyer.
+        lock_mode (str): Ticket lock mode of the purchases.
+
+    Returns:
+        Measurements: Measurements.
+    """
+    from django.test import override_settings
+
+    tickets = free_tickets(repeat)
+    measured = Measurements()
+    buy = partial(
+        buy_tickets, tickets=tickets, barrier=threading.Barrier(workers),
+        measured=measured, lock=threading.Lock(),
+    )
+    with override_settings(TICKET_LOCK_MODE=lock_mode):
+        measured.seconds = run_threads(
+            [threading.Thread(target=buy, args=(user,)) for user in users[:workers]],
+        )
+    restore(tickets)
+    return measured
+
+
+def run_threads(threads: list[threading.Thread]) -> float:
+    """
+    Start the threads and wait until all of them finish.
+
+    Args:
+        threads (list[Thread]): The threads.
+
+    Returns:
+        float: Seconds from the start of the first thread.
+    """
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for joined in threads:
+        joined.join()
+    return time.perf_counter() - start
+
+
+def restore(tickets: list[UUID]) -> None:
+    """
+    Make the tickets free again and refund the buyers.
+
+    Args:
+        tickets (list[UUID]): IDs of the tickets bought by the rush.
+    """
+    from django.db import models, transaction
+
+    from theaters_app import inventory
+    from theaters_app.models import Client, Ticket
+
+    with transaction.atomic():
+        sold = Ticket.objects.filter(id__in=tickets).exclude(client=None)
+        spent = sold.values('client').annotate(spent=models.Sum('price'))
+        for row in spent:
+            refund = models.F('money') + row['spent']
+            Client.objects.filter(id=row['client']).update(money=refund)
+        sold.update(client=None)
+    inventory.reconcile()
+
+
+def current_commit() -> str:
+    """
+    Get the commit of the working tree.
+
+    Returns:
+        str: Hash of the commit or 'unknown' outside of a git checkout.
+    """
+    try:
+        return subprocess.run(  # noqa: S603, S607
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, check=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def format_summary(name: str, summary: dict[str, float]) -> str:
+    """
+    Format the summary of the scenario as a report line.
+
+    Args:
+        name (str): Name of the scenario.
+        summary (dict[str, float]): Result of Measurements.summary().
+
+    Returns:
+        str: Report line.
+    """
+    line = [f'{name:<26}', '{0:>8.1f} req/s'.format(summary['throughput'])]
+    line.extend(f'{key}={summary[key]:.2f}ms' for key in PERCENTILES)
+    line.append('queries={0:.1f} errors={1}'.format(summary['queries'], summary['errors']))
+    return ' '.join(line)
+
+
+def format_comparison(name: str, summary: dict, baseline: dict) -> str:
+    """
+    Format the relative change of the scenario against the baseline.
+
+    Args:
+        name (str): Name of the scenario.
+        summary (dict): Current summary.
+        baseline (dict): Summary of the same scenario from the baseline run.
+
+    Returns:
+        str: Report line.
+    """
+    changes = []
+    for key in COMPARED:
+        old, new = baseline[key], summary[key]
+        change = (new - old) / old * 100 if old else 0
+        changes.append('{0} {1:.2f} -> {2:.2f} ({3:+.1f}%)'.format(key, old, new, change))
+    return '{0:<26} {1}'.format(name, ', '.join(changes))
+
+
+def run(args: argparse.Namespace) -> dict[str, dict]:
+    """
+    Generate the data if needed and run the selected scenarios.
+
+    Args:
+        args (Namespace): Parsed arguments.
+
+    Returns:
+        dict[str, dict]: Summaries by scenario name.
+    """
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.test import Client as TestClient
+
+    # the lost races of the purchase rush would log a warning each
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    sizes = datagen.sizes_from(args)
+    if not datagen.is_generated(sizes):
+        datagen.generate(sizes)
+    cache.clear()
+    users = list(User.objects.filter(username__startswith='bench').order_by('id'))
+    client = TestClient()
+    client.force_login(users[0])
+
+    summaries = {}
+    for name in args.scenario or [*SCENARIOS, *RUSHES]:
+        lock_mode = RUSHES.get(name)
+        if lock_mode:
+            measured = purchase_rush(users, args.workers, args.repeat, lock_mode)
+        else:
+            measured = run_scenario(SCENARIOS[name], client, args.warmup, args.repeat)
+        summaries[name] = measured.summary()
+        write_line(format_summary(name, summaries[name]))
+    return summaries
+
+
+def compare(report: dict, path: str) -> None:
+    """
+    Print the changes of the scenarios against the results saved in the file.
+
+    Args:
+        report (dict): Current report.
+        path (str): Path to the saved report of the baseline.
+    """
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline['sizes'] != report['sizes']:
+        write_line('warning: the baseline was measured on other data sizes')
+    write_line(f'compared with {baseline["commit"]}:')
+    for name, summary in report['scenarios'].items():
+        saved = baseline['scenarios'].get(name)
+        if saved:
+            write_line(format_comparison(name, summary, saved))
+
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Returns:
+        Namespace: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    datagen.add_arguments(parser)
+    parser.add_argument(
+        '--scenario', action='append', choices=[*SCENARIOS, *RUSHES],
+        help='run only this scenario, may be repeated',
+    )
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    parser.add_argument('--workers', type=int, default=8, help='concurrent buyers of the rush')
+    parser.add_argument('--json', help='save the results to this file')
+    parser.add_argument('--compare', help='compare with the results saved in this file')
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Run the suite and print, save or compare the report."""
+    args = parse_args()
+    setup_django()
+    with bench_database(BENCH_DB_NAME, keep=True):
+        summaries = run(args)
+
+    report = {
+        'commit': current_commit(),
+        'sizes': asdict(datagen.sizes_from(args)),
+        'scenarios': summaries,
+    }
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
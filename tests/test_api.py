@@ -6,7 +6,7 @@ from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
-from theaters_app.models import Performance, Theater, Ticket
+from theaters_app.models import Performance, Theater, TheaterPerformance, Ticket
 
 
 def create_apitest(model_class, model_url, creation_attrs):
@@ -127,3 +127,55 @@ TicketApiTest = create_apitest(
     '/api/tickets/',
     {'price': 100, 'time': '11:36:59', 'place': '12'},
 )
+
+
+class TestApiPagination(TestCase):
+    """Test case for the cursor pagination and the compact mode of the API."""
+
+    def setUp(self):
+        """Set up tickets of one show and an authenticated API client."""
+        self.client = APIClient()
+        self.user = User.objects.create(username='abc', password='abc')
+        self.client.force_authenticate(user=self.user)
+        self.theater = Theater.objects.create(title='Название', address='Анархии 12')
+        performance = Performance.objects.create(
+            title='Название', description='Описание', date='2040-02-23',
+        )
+        self.t_p = TheaterPerformance.objects.create(theater=self.theater, performance=performance)
+        for place in range(7):
+            Ticket.objects.create(
+                price=100, time='11:36:59', place=str(place), theater_performance=self.t_p,
+            )
+
+    def test_cursor(self):
+        """Test that following the next links returns every ticket once."""
+        response = self.client.get('/api/tickets/', {'page_size': 3})
+        self.assertIsNone(response.data['previous'])
+        places = []
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            places += [ticket['place'] for ticket in response.data['results']]
+            if response.data['next'] is None:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(places, [str(place) for place in range(7)])
+
+    def test_compact(self):
+        """Test that the compact mode renders relations as plain ids."""
+        response = self.client.get('/api/theaters/', {'compact': 1})
+        theater = response.data['results'][0]
+        self.assertEqual(theater['id'], str(self.theater.id))
+        self.assertEqual(theater['performances'], [self.t_p.performance_id])
+
+        response = self.client.get('/api/theaters/')
+        theater = response.data['results'][0]
+        self.assertNotIn('id', theater)
+        self.assertTrue(theater['performances'][0].startswith('http'))
+
+    def test_prefetched_relations(self):
+        """Test that the theaters list does not query performances per theater."""
+        for num in range(5):
+            Theater.objects.create(title=f'Театр {num}', address='Анархии 12')
+        with self.assertNumQueries(2):
+            self.client.get('/api/theaters/', {'compact': 1})
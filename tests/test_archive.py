@@ -0,0 +1,96 @@
+"""Module for testing the archival of finished performances."""
+
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from theaters_app import archive, holds
+from theaters_app.models import (
+    ArchivedPerformance,
+    ArchivedTicket,
+    Client,
+    Performance,
+    SeatHold,
+    Theater,
+    TheaterPerformance,
+    Ticket,
+)
+
+
+class TestArchive(TestCase):
+    """Test case for the archive command."""
+
+    def setUp(self):
+        """Set up a finished and a future performance with sold and unsold tickets."""
+        theater = Theater.objects.create(title='Театр', address='Анархии 12')
+        owner = Client.objects.create(user=User.objects.create(username='user', password='user'))
+        self.owner = owner
+        self.finished = Performance.objects.create(
+            title='Прошедший', description='Описание', date='2020-01-01',
+        )
+        self.future = Performance.objects.create(
+            title='Будущий', description='Описание', date='2040-01-01',
+        )
+        for performance in (self.finished, self.future):
+            t_p = TheaterPerformance.objects.create(theater=theater, performance=performance)
+            Ticket.objects.bulk_create(
+                Ticket(
+                    price=100, time='19:00', place=str(place), theater_performance=t_p,
+                    client=owner if place < 2 else None,
+                )
+                for place in range(5)
+            )
+
+    def archive(self, *args):
+        """
+        Run the archive command.
+
+        Args:
+            args: Command arguments.
+
+        Returns:
+            str: Output of the command.
+        """
+        stdout = StringIO()
+        call_command('archive_performances', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_archive(self):
+        """Test that the finished performance is moved with its sold tickets only."""
+        unsold = Ticket.objects.get(theater_performance__performance=self.finished, place='4')
+        holds.hold_ticket(self.owner.id, unsold.id)
+        output = self.archive('--batch-size', '1')
+        self.assertIn('1 performances and 2 sold tickets archived', output)
+        self.assertEqual(list(Performance.objects.all()), [self.future])
+        self.assertEqual(Ticket.objects.count(), 5)
+        self.assertFalse(TheaterPerformance.objects.filter(performance=self.finished).exists())
+        self.assertFalse(SeatHold.objects.exists())
+
+        archived = ArchivedPerformance.objects.get(id=self.finished.id)
+        self.assertEqual(archived.title, 'Прошедший')
+        tickets = ArchivedTicket.objects.filter(performance=archived)
+        self.assertEqual([ticket.place for ticket in tickets], ['0', '1'])
+        self.assertEqual(tickets[0].theater_title, 'Театр')
+
+        self.assertIn('0 performances and 0 sold tickets', self.archive())
+
+    def test_before(self):
+        """Test archiving the performances before the given date."""
+        self.assertIn('0 performances', self.archive('--before', '2020-01-01'))
+        self.assertIn('1 performances', self.archive('--before', '2020-01-02'))
+        self.assertEqual(list(Performance.objects.all()), [self.future])
+        self.assertEqual(ArchivedTicket.objects.count(), 2)
+        with self.assertRaises(CommandError):
+            self.archive('--before', 'yesterday')
+
+    def test_future_date(self):
+        """Test that a date after today is refused, the upcoming shows stay."""
+        with self.assertRaises(CommandError):
+            self.archive('--before', '2040-01-02')
+        self.assertEqual(Performance.objects.count(), 2)
+        list(archive.archive_finished(date.fromisoformat('2040-01-02')))
+        self.assertEqual(list(Performance.objects.all()), [self.future])
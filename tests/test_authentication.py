@@ -0,0 +1,87 @@
+"""Module for testing the cached token authentication of the API."""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from theaters_app import authentication
+
+URL = '/api/theaters/'
+
+
+@override_settings(AUTH_TOKEN_CACHE_TTL=60)
+class TestCachedTokenAuthentication(TestCase):
+    """Test case for caching the API tokens with their users."""
+
+    def setUp(self):
+        """Set up a user with a token and a client sending it."""
+        cache.clear()
+        self.user = User.objects.create(username='partner', password='partner')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Token {0}'.format(self.token.key))
+
+    def get(self, expected=status.HTTP_200_OK):
+        """
+        Request the API with the token.
+
+        Args:
+            expected (int): Expected status of the response.
+        """
+        self.assertEqual(self.client.get(URL).status_code, expected)
+
+    def test_cached(self):
+        """Test that the repeated requests do not look up the token."""
+        with self.assertNumQueries(2):
+            self.get()
+        with self.assertNumQueries(1):
+            self.get()
+        self.assertEqual(authentication.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_token_deleted(self):
+        """Test that a deleted token is not accepted from the cache."""
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.token.delete()
+        self.get(status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_changed(self):
+        """Test that a change of the user drops its cached tokens, a login does not."""
+        self.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=['last_login'])
+        self.get()
+        self.assertEqual(authentication.stats()['hits'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.get(status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE_TTL=0)
+    def test_disabled(self):
+        """Test that the token is looked up on every request without the cache."""
+        self.get()
+        with self.assertNumQueries(2):
+            self.get()
+        self.assertEqual(authentication.stats(), {'hits': 0, 'misses': 0, 'hit_rate': 0})
+
+    def test_stats_view(self):
+        """Test that only the staff sees and resets the counters."""
+        self.get()
+        self.assertEqual(
+            self.client.get(reverse('auth-cache')).status_code, status.HTTP_403_FORBIDDEN,
+        )
+        User.objects.filter(id=self.user.id).update(is_staff=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            authentication.invalidate(self.token.key)
+        response = self.client.get(reverse('auth-cache'))
+        self.assertEqual((response.data['hits'], response.data['misses']), (1, 2))
+        response = self.client.delete(reverse('auth-cache'))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(authentication.stats()['misses'], 0)
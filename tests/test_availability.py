@@ -0,0 +1,102 @@
+"""Module for testing cached seat availability of the shows."""
+
+import base64
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import availability, purchase
+from theaters_app.models import Client, Performance, Theater, TheaterPerformance, Ticket
+
+PLACES = 10
+
+
+class TestAvailability(TestCase):
+    """Test case for the seat availability bitmaps."""
+
+    def setUp(self):
+        """Set up a show with free tickets and an authenticated client."""
+        cache.clear()
+        theater = Theater.objects.create(title='Название', address='Анархии 12')
+        performance = Performance.objects.create(
+            title='Название', description='Описание', date='2040-02-23',
+        )
+        self.t_p = TheaterPerformance.objects.create(theater=theater, performance=performance)
+        self.tickets = Ticket.objects.bulk_create(
+            Ticket(price=100, time='19:00', place=f'A-{place:02}', theater_performance=self.t_p)
+            for place in range(PLACES)
+        )
+        self.user = User.objects.create(username='user', password='user')
+        self.buyer = Client.objects.create(user=self.user, money=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('availability', args=(self.t_p.id,))
+
+    def get_free(self, **params):
+        """
+        Request the availability of the show and decode the bitmap.
+
+        Args:
+            params: Query parameters.
+
+        Returns:
+            tuple: Response data and the list of free seat indexes.
+        """
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        free = base64.b64decode(response.data['free'])
+        seats = range(response.data['seats'])
+        return response.data, [seat for seat in seats if free[seat >> 3] & (1 << (seat & 7))]
+
+    def test_build(self):
+        """Test that the bitmap marks sold tickets as taken."""
+        Ticket.objects.filter(place__in=['A-01', 'A-09']).update(client=self.buyer)
+        data, free = self.get_free(layout=1)
+        self.assertEqual(data['seats'], PLACES)
+        self.assertEqual(data['free_count'], PLACES - 2)
+        self.assertEqual(free, [0, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(data['places'][9], 'A-09')
+        self.assertEqual(data['tickets'][9], str(self.tickets[9].id))
+
+    def test_cached(self):
+        """Test that polling does not touch the database."""
+        self.get_free()
+        with self.assertNumQueries(0):
+            self.get_free()
+
+    def test_missing_show(self):
+        """Test that an unknown show is not found and not cached."""
+        url = reverse('availability', args=(self.buyer.id,))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIsNone(cache.get(availability.cache_key(self.buyer.id)))
+
+    def test_show_without_tickets(self):
+        """Test that a show without tickets has an empty bitmap."""
+        Ticket.objects.all().delete()
+        data, free = self.get_free()
+        self.assertEqual((data['seats'], free), (0, []))
+
+    def test_purchase_updates_bitmap(self):
+        """Test that a purchase clears the seat bit without rebuilding the bitmap."""
+        self.get_free()
+        with self.captureOnCommitCallbacks(execute=True):
+            purchase.purchase_ticket(self.buyer.id, self.tickets[3].id)
+        with self.assertNumQueries(0):
+            data, free = self.get_free()
+        self.assertNotIn(3, free)
+        self.assertEqual(data['free_count'], PLACES - 1)
+
+    def test_ticket_change_invalidates(self):
+        """Test that saving a ticket drops the cached bitmap."""
+        self.get_free()
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                price=100, time='19:00', place='B-01', theater_performance=self.t_p,
+            )
+        self.assertIsNone(cache.get(availability.cache_key(self.t_p.id)))
+        data, _ = self.get_free()
+        self.assertEqual(data['seats'], PLACES + 1)
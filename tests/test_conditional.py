@@ -0,0 +1,184 @@
+"""Module for testing the conditional GET requests and the modified timestamps."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import purchase
+from theaters_app.models import Client, Performance, Theater, TheaterPerformance, Ticket
+
+PAST = datetime.fromisoformat('2020-01-01T00:00:00+00:00')
+
+
+class TestModified(TestCase):
+    """Test case for bumping the modified timestamps."""
+
+    def setUp(self):
+        """Set up a theater and a performance modified in the past."""
+        self.theater = Theater.objects.create(title='Театр', address='Анархии 12', modified=PAST)
+        self.performance = Performance.objects.create(
+            title='Спектакль', description='Описание', date='2040-02-23', modified=PAST,
+        )
+
+    def test_created(self):
+        """Test that the modified time of a new record is kept."""
+        self.theater.refresh_from_db()
+        self.assertEqual(self.theater.modified, PAST)
+
+    def test_save(self):
+        """Test that saving bumps the modified time, also with the updated fields."""
+        self.theater.title = 'Новый театр'
+        self.theater.save()
+        self.theater.refresh_from_db()
+        self.assertGreater(self.theater.modified, PAST)
+        self.performance.title = 'Новый спектакль'
+        self.performance.save(update_fields=['title'])
+        self.performance.refresh_from_db()
+        self.assertGreater(self.performance.modified, PAST)
+
+    def test_shows(self):
+        """Test that adding and removing shows bumps both sides."""
+        changes = (
+            lambda: self.theater.performances.add(self.performance),
+            lambda: self.performance.theaters.clear(),
+            lambda: TheaterPerformance.objects.create(
+                theater=self.theater, performance=self.performance,
+            ),
+            lambda: self.theater.performances.remove(self.performance),
+        )
+        for change in changes:
+            Theater.objects.update(modified=PAST)
+            Performance.objects.update(modified=PAST)
+            change()
+            self.theater.refresh_from_db()
+            self.performance.refresh_from_db()
+            self.assertGreater(self.theater.modified, PAST)
+            self.assertGreater(self.performance.modified, PAST)
+
+
+class TestConditionalViews(TestCase):
+    """Test case for the ETag and Last-Modified validators of the views."""
+
+    def setUp(self):
+        """Set up a show with a ticket and a logged in client."""
+        self.theater = Theater.objects.create(title='Театр', address='Анархии 12')
+        self.performance = Performance.objects.create(
+            title='Спектакль', description='Описание', date='2040-02-23',
+        )
+        self.t_p = TheaterPerformance.objects.create(
+            theater=self.theater, performance=self.performance,
+        )
+        self.ticket = Ticket.objects.create(
+            price=100, time='19:00', place='A-1', theater_performance=self.t_p,
+        )
+        user = User.objects.create(username='user', password='user')
+        self.buyer = Client.objects.create(user=user, money=Decimal(1000))
+        self.client = APIClient()
+        self.client.force_login(user)
+
+    def assert_fresh(self, url):
+        """
+        Check that the page has validators and the repeated conditional requests get 304.
+
+        Args:
+            url (str): URL of the page.
+
+        Returns:
+            HttpResponse: The first response.
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header('Last-Modified'))
+        repeated = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(repeated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(repeated['ETag'], response['ETag'])
+        self.assertFalse(repeated.content)
+        repeated = self.client.get(url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(repeated.status_code, status.HTTP_304_NOT_MODIFIED)
+        return response
+
+    def assert_changed(self, url, response):
+        """
+        Check that the page is sent again for the old ETag.
+
+        Args:
+            url (str): URL of the page.
+            response (HttpResponse): The old response.
+        """
+        repeated = self.client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(repeated.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(repeated['ETag'], response['ETag'])
+
+    def test_theater_page(self):
+        """Test that the theater page changes with its performances."""
+        url = reverse('theater', args=(self.theater.id,))
+        response = self.assert_fresh(url)
+        self.performance.title = 'Новый спектакль'
+        self.performance.save()
+        self.assert_changed(url, response)
+
+    def test_performance_page(self):
+        """Test that the performance page changes when its ticket is sold."""
+        url = reverse('performance', args=(self.performance.id,))
+        response = self.assert_fresh(url)
+        purchase.purchase_ticket(self.buyer.id, self.ticket.id)
+        self.assert_changed(url, response)
+
+    def test_user(self):
+        """Test that the pages of other users have other ETags."""
+        url = reverse('theater', args=(self.theater.id,))
+        response = self.assert_fresh(url)
+        other = User.objects.create(username='other', password='other')
+        self.client.force_login(other)
+        self.assert_changed(url, response)
+
+    def test_missing(self):
+        """Test that missing records have no validators."""
+        response = self.client.get(reverse('theater', args=(self.performance.id,)))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_list_page(self):
+        """Test that the list page changes when one of its records is saved."""
+        url = reverse('theaters')
+        response = self.assert_fresh(url)
+        self.theater.rating = 4
+        self.theater.save()
+        self.assert_changed(url, response)
+
+    def test_api_detail(self):
+        """Test the conditional requests of the API details."""
+        url = reverse('theater-detail', args=(self.theater.id,))
+        response = self.assert_fresh(url)
+        self.theater.refresh_from_db()
+        self.assertEqual(response['Last-Modified'], http_date(self.theater.modified.timestamp()))
+        self.theater.rating = 4
+        self.theater.save(update_fields=['rating'])
+        self.assert_changed(url, response)
+
+    def test_api_list(self):
+        """Test the conditional requests of the API lists."""
+        url = reverse('ticket-list')
+        response = self.assert_fresh(url)
+        self.assert_fresh(f'{url}?compact=1')
+        purchase.purchase_ticket(self.buyer.id, self.ticket.id)
+        self.assert_changed(url, response)
+        url = reverse('performance-upcoming')
+        response = self.assert_fresh(url)
+        Performance.objects.create(title='Другой', description='Описание', date='2040-03-01')
+        self.assert_changed(url, response)
+
+    def test_api_next_page(self):
+        """Test that the API list page changes when a record is added after it."""
+        list_url = reverse('theater-list')
+        url = f'{list_url}?page_size=1'
+        response = self.assert_fresh(url)
+        self.assertIsNone(response.data['next'])
+        Theater.objects.create(title='Юность', address='Ленина 1')
+        self.assert_changed(url, response)
@@ -0,0 +1,77 @@
+"""Module for testing cached homepage counters."""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import counters
+from theaters_app.models import Performance, Theater, Ticket
+
+theater_attrs = {'title': 'Название', 'address': 'Анархии 12', 'rating': 4}
+ticket_attrs = {'price': 100, 'time': '11:36:59', 'place': '12'}
+
+
+class TestCounters(TestCase):
+    """Test case for the homepage counters."""
+
+    def setUp(self):
+        """Drop the counters cached by other tests."""
+        cache.clear()
+        self.client = APIClient()
+
+    def homepage_counts(self):
+        """
+        Request the homepage and get the displayed counters.
+
+        Returns:
+            tuple: Number of theaters, performances and tickets.
+        """
+        response = self.client.get('/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return tuple(response.context[key] for key in ('theaters', 'performances', 'tickets'))
+
+    def test_cached(self):
+        """Test that the counters are not recounted on every request."""
+        Theater.objects.create(**theater_attrs)
+        self.assertEqual(self.homepage_counts(), (1, 0, 0))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.homepage_counts(), (1, 0, 0))
+
+    def test_created_and_deleted(self):
+        """Test that signals keep the cached counters up to date."""
+        self.assertEqual(self.homepage_counts(), (0, 0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = Ticket.objects.create(**ticket_attrs)
+            Theater.objects.create(**theater_attrs)
+        self.assertEqual(self.homepage_counts(), (1, 0, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket.delete()
+        self.assertEqual(self.homepage_counts(), (1, 0, 0))
+
+    def test_invalidate(self):
+        """Test that bulk operations can drop the cached counter."""
+        self.assertEqual(self.homepage_counts(), (0, 0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.bulk_create([Ticket(**ticket_attrs), Ticket(**ticket_attrs)])
+            counters.invalidate(Ticket)
+        self.assertEqual(self.homepage_counts(), (0, 0, 2))
+
+    def test_estimate(self):
+        """Test that the planner estimate of a table can be read."""
+        self.assertGreaterEqual(counters.estimate(Ticket), 0)
+
+    @override_settings(COUNTERS_ESTIMATE_THRESHOLD=1000)
+    def test_large_table_estimated(self):
+        """Test that large tables are estimated instead of counted."""
+        with mock.patch.object(counters, 'estimate', return_value=10**6):
+            self.assertEqual(counters.counts(Ticket, Performance), [10**6, 10**6])
+
+    @override_settings(COUNTERS_ESTIMATE_THRESHOLD=1000)
+    def test_small_table_counted(self):
+        """Test that small tables are counted exactly."""
+        Ticket.objects.create(**ticket_attrs)
+        with mock.patch.object(counters, 'estimate', return_value=10):
+            self.assertEqual(counters.counts(Ticket), [1])
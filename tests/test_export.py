@@ -0,0 +1,125 @@
+"""Module for testing the streaming export of the tickets."""
+
+import csv
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import export
+from theaters_app.models import Client, Performance, Theater, TheaterPerformance, Ticket
+
+URL = reverse('ticket-export')
+
+
+class TestExport(TestCase):
+    """Test case for the ticket export."""
+
+    def setUp(self):
+        """Set up two theaters with a show each and some sold tickets."""
+        self.theater = Theater.objects.create(title='Театр', address='Анархии 12')
+        other = Theater.objects.create(title='Другой театр', address='Ленина 1')
+        self.user = User.objects.create(username='finance', password='finance', is_staff=True)
+        buyer = Client.objects.create(user=self.user)
+        for theater, day in ((self.theater, '2040-02-23'), (other, '2040-03-01')):
+            performance = Performance.objects.create(
+                title=f'Спектакль {day}', description='Описание', date=day,
+            )
+            show = TheaterPerformance.objects.create(theater=theater, performance=performance)
+            Ticket.objects.bulk_create(
+                Ticket(
+                    price=100 + place, time='19:00', place=f'A-{place}',
+                    theater_performance=show, client=buyer if place < 2 else None,
+                )
+                for place in range(3)
+            )
+        self.client = APIClient()
+        self.client.force_login(self.user)
+
+    def test_chunks(self):
+        """Test that the rows are fetched by a server-side cursor in chunks."""
+        with self.assertNumQueries(1):
+            rows = list(export.stream(export.tickets(), chunk_size=2))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(
+            [row[-4] for row in rows], sorted(row[-4] for row in rows),
+        )
+
+    def test_filters(self):
+        """Test filtering by the date range, the theater and the sales."""
+        self.assertEqual(export.tickets(start='2040-03-01').count(), 3)
+        self.assertEqual(export.tickets(end='2040-02-28').count(), 3)
+        self.assertEqual(export.tickets(theater=self.theater.id, sold=True).count(), 2)
+
+    def test_csv(self):
+        """Test the streamed CSV export."""
+        response = self.client.get(URL, {'sold': 'true', 'start': '2040-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['theater'], 'Театр')
+        self.assertEqual(rows[0]['username'], 'finance')
+
+    def test_ndjson(self):
+        """Test the streamed NDJSON export."""
+        response = self.client.get(
+            URL, {'output': 'ndjson', 'theater': self.theater.id, 'chunk_size': 1},
+        )
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record['place'] for record in records], ['A-0', 'A-1', 'A-2'])
+        self.assertEqual(records[2]['price'], '102.00')
+        self.assertIsNone(records[2]['username'])
+
+    async def test_asgi(self):
+        """Test that the export is served by an asynchronous iterator under ASGI."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(URL, {'output': 'ndjson', 'chunk_size': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(json.loads(lines[0])['theater'], 'Театр')
+
+    def test_wsgi(self):
+        """Test that the export is served by a synchronous iterator under WSGI."""
+        response = self.client.get(URL)
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 7)
+
+    def test_invalid(self):
+        """Test that the filters are validated and only the staff may export."""
+        response = self.client.get(URL, {'output': 'xml', 'start': '2040-03-01', 'end': '2040'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'output', 'end'})
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(URL).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        """Test exporting to a file and to stdout with the command."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = f'{directory}/tickets.csv'
+            stderr = StringIO()
+            call_command('export_tickets', '--file', path, '--sold', stderr=stderr)
+            with open(path, encoding='utf-8') as export_file:
+                self.assertEqual(len(export_file.read().splitlines()), 5)
+            self.assertIn('5 lines exported', stderr.getvalue())
+        stdout = StringIO()
+        call_command(
+            'export_tickets', '--output', 'ndjson', '--end', '2040-02-23',
+            stdout=stdout, stderr=StringIO(),
+        )
+        self.assertEqual(len(stdout.getvalue().splitlines()), 3)
+        with self.assertRaises(CommandError):
+            call_command('export_tickets', '--theater', 'theater', stderr=StringIO())
@@ -0,0 +1,187 @@
+"""Module for testing the seat holds."""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import availability, holds, purchase
+from theaters_app.models import (
+    Client,
+    Performance,
+    SeatHold,
+    Theater,
+    TheaterPerformance,
+    Ticket,
+    get_datetime,
+)
+
+
+class TestHolds(TestCase):
+    """Test case for holding the tickets before buying them."""
+
+    def setUp(self):
+        """Set up a show with two free tickets and two rich clients."""
+        theater = Theater.objects.create(title='Театр', address='Анархии 12')
+        performance = Performance.objects.create(
+            title='Спектакль', description='Описание', date='2040-02-23',
+        )
+        self.show = TheaterPerformance.objects.create(theater=theater, performance=performance)
+        self.ticket = Ticket.objects.create(
+            price=100, time='19:00', place='A-1', theater_performance=self.show,
+        )
+        self.other_ticket = Ticket.objects.create(
+            price=100, time='19:00', place='A-2', theater_performance=self.show,
+        )
+        self.user = User.objects.create(username='user', password='user')
+        self.buyer = Client.objects.create(user=self.user, money=1000)
+        self.rival = Client.objects.create(
+            user=User.objects.create(username='rival', password='rival'), money=1000,
+        )
+
+    def expire(self):
+        """Move the expiry of all holds to the past."""
+        SeatHold.objects.update(expires=get_datetime() - timedelta(seconds=1))
+
+    def test_hold(self):
+        """Test that a held ticket is bought only by its holder."""
+        hold = holds.hold_ticket(self.buyer.id, self.ticket.id, minutes=5)
+        self.assertAlmostEqual(
+            hold.expires, get_datetime() + timedelta(minutes=5), delta=timedelta(seconds=5),
+        )
+        with self.assertRaises(purchase.SeatHeldError):
+            holds.hold_ticket(self.rival.id, self.ticket.id)
+        with self.assertRaises(purchase.SeatHeldError):
+            purchase.purchase_ticket(self.rival.id, self.ticket.id)
+        purchase.purchase_ticket(self.buyer.id, self.ticket.id)
+        self.assertFalse(SeatHold.objects.exists())
+        with self.assertRaises(purchase.SeatTakenError):
+            holds.hold_ticket(self.rival.id, self.ticket.id)
+
+    def test_renew(self):
+        """Test that holding the ticket again extends the hold."""
+        first = holds.hold_ticket(self.buyer.id, self.ticket.id, minutes=1)
+        second = holds.hold_ticket(self.buyer.id, self.ticket.id, minutes=10)
+        self.assertEqual(first.id, second.id)
+        self.assertGreater(second.expires, first.expires)
+
+    def test_expired(self):
+        """Test that an expired hold does not block other clients."""
+        holds.hold_ticket(self.buyer.id, self.ticket.id)
+        self.expire()
+        holds.hold_ticket(self.rival.id, self.ticket.id)
+        self.assertEqual(SeatHold.objects.get().client_id, self.rival.id)
+        self.expire()
+        purchase.purchase_ticket(self.buyer.id, self.ticket.id)
+
+    def test_release(self):
+        """Test that only the holder releases the hold."""
+        holds.hold_ticket(self.buyer.id, self.ticket.id)
+        self.assertFalse(holds.release(self.rival.id, self.ticket.id))
+        self.assertTrue(holds.release(self.buyer.id, self.ticket.id))
+        purchase.purchase_ticket(self.rival.id, self.ticket.id)
+
+    def test_availability(self):
+        """Test that held seats are not free and the cached bitmap is updated in place."""
+        availability.get(self.show.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            holds.hold_ticket(self.buyer.id, self.ticket.id)
+            holds.hold_ticket(self.buyer.id, self.other_ticket.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(availability.get(self.show.id)['free'], bytes([0]))
+        self.expire()
+        with self.captureOnCommitCallbacks(execute=True):
+            list(holds.reap(batch_size=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            holds.hold_ticket(self.rival.id, self.ticket.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(availability.get(self.show.id)['free'], bytes([0b10]))
+        with self.captureOnCommitCallbacks(execute=True):
+            holds.release(self.rival.id, self.ticket.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(availability.get(self.show.id)['free'], bytes([0b11]))
+        self.assertEqual(availability.build(self.show.id)['free'], bytes([0b11]))
+
+    @override_settings(SEAT_HOLD_MAX_PER_CLIENT=1)
+    def test_limit(self):
+        """Test that the holds of a client are limited, renewals and expired do not count."""
+        holds.hold_ticket(self.buyer.id, self.ticket.id)
+        holds.hold_ticket(self.buyer.id, self.ticket.id)
+        with self.assertRaises(purchase.HoldLimitError):
+            holds.hold_ticket(self.buyer.id, self.other_ticket.id)
+        self.expire()
+        holds.hold_ticket(self.buyer.id, self.other_ticket.id)
+
+    def test_reap(self):
+        """Test that the command deletes only the expired holds in batches."""
+        holds.hold_ticket(self.buyer.id, self.ticket.id)
+        holds.hold_ticket(self.buyer.id, self.other_ticket.id)
+        self.expire()
+        active = holds.hold_ticket(self.rival.id, self.ticket.id)
+        self.assertEqual(list(holds.reap(batch_size=1)), [1])
+        stdout = StringIO()
+        call_command('reap_seat_holds', stdout=stdout)
+        self.assertIn('0 expired holds reaped', stdout.getvalue())
+        self.assertEqual(list(SeatHold.objects.values_list('id', flat=True)), [active.id])
+
+    def test_buy_view(self):
+        """Test that only posting the hold form of the buy page holds the ticket."""
+        client = APIClient()
+        client.force_login(self.user)
+        url = reverse('buy', args=(self.ticket.id,))
+        self.assertContains(client.get(url), 'Hold it')
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertContains(client.post(url, {'hold': '1'}), 'held for you')
+        self.assertEqual(SeatHold.objects.get().client_id, self.buyer.id)
+
+        client.force_login(self.rival.user)
+        response = client.post(url, {'hold': '1'})
+        self.assertContains(response, 'held by another user', status_code=status.HTTP_409_CONFLICT)
+        self.assertNotContains(response, 'Buy it', status_code=status.HTTP_409_CONFLICT)
+        response = client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    @override_settings(TICKET_LOCK_MODE=purchase.LOCK_SKIP_LOCKED)
+    def test_buy_view_locked(self):
+        """Test that holding a ticket being bought by another client is refused."""
+        client = APIClient()
+        client.force_login(self.user)
+        # the skip locked mode skips the row locked by the other buyer
+        with mock.patch.object(holds, 'lock_ticket', return_value=None):
+            response = client.post(reverse('buy', args=(self.ticket.id,)), {'hold': '1'})
+        self.assertContains(response, 'taken by another', status_code=status.HTTP_409_CONFLICT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    @override_settings(SEAT_HOLD_MAX_PER_CLIENT=1)
+    def test_limit_views(self):
+        """Test that the buy page and the API refuse holds over the limit."""
+        holds.hold_ticket(self.buyer.id, self.ticket.id)
+        client = APIClient()
+        client.force_login(self.user)
+        response = client.post(reverse('buy', args=(self.other_ticket.id,)), {'hold': '1'})
+        self.assertContains(response, 'too many tickets', status_code=status.HTTP_409_CONFLICT)
+        client.force_authenticate(self.user)
+        response = client.post(reverse('ticket-hold', args=(self.other_ticket.id,)))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(SeatHold.objects.count(), 1)
+
+    def test_api(self):
+        """Test holding and releasing the ticket through the API."""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('ticket-hold', args=(self.ticket.id,))
+        response = client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['ticket'], self.ticket.id)
+        client.force_authenticate(self.rival.user)
+        self.assertEqual(client.post(url).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        client.force_authenticate(self.user)
+        self.assertEqual(client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
@@ -0,0 +1,156 @@
+"""Module checking that hot view queries are served by indexes."""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app.models import Client, Performance, Theater, TheaterPerformance, Ticket
+
+SHOWS = 50
+PLACES = 100
+
+
+def plan_nodes(plan):
+    """
+    Iterate over all nodes of a query plan.
+
+    Args:
+        plan (dict): Plan node from EXPLAIN (FORMAT JSON).
+
+    Yields:
+        dict: Plan nodes.
+    """
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from plan_nodes(child)
+
+
+def explain(sql):
+    """
+    Get the nodes of the query plan.
+
+    Args:
+        sql (str): Executed SQL with the parameters inlined.
+
+    Returns:
+        list[dict]: Plan nodes.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+        return list(plan_nodes(cursor.fetchone()[0][0]['Plan']))
+
+
+def table_plans(queries, table):
+    """
+    Get the plan nodes of the captured reads of the table.
+
+    Args:
+        queries (list[dict]): Captured queries.
+        table (str): Name of the table.
+
+    Returns:
+        list[tuple[str, dict]]: SQL of the query and a node of its plan.
+    """
+    reads = [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT') and f'."{table}"' in query['sql']
+    ]
+    return [(sql, node) for sql in reads for node in explain(sql)]
+
+
+def create_index_test(url_name, table, index, args=(), api=False):
+    """
+    Create a test checking the queries of a view on the table with EXPLAIN.
+
+    Sequential scans are disabled for the test transaction, so the planner only falls
+    back to them when no index can serve the query.
+
+    Args:
+        url_name (str): Name of the view URL.
+        table (str): Table which must not be scanned sequentially.
+        index (str): Index expected in the plan of at least one query.
+        args (tuple): Names of the test case attributes passed as URL arguments.
+        api (bool): Authenticate as an API client instead of logging in.
+
+    Returns:
+        function: The test method.
+    """
+    def test(self):
+        """
+        Test that the view queries on the table use the index.
+
+        Args:
+            self: The test case instance.
+        """
+        url = reverse(url_name, args=[getattr(self, arg) for arg in args])
+        with CaptureQueriesContext(connection) as context:
+            response = self.api_client.get(url) if api else self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        nodes = table_plans(context.captured_queries, table)
+        for sql, node in nodes:
+            if node.get('Relation Name') == table:
+                self.assertNotEqual(node['Node Type'], 'Seq Scan', sql)
+        # bitmap index scans name the index, but not the relation
+        self.assertIn(index, {node.get('Index Name') for _, node in nodes})
+
+    return test
+
+
+class TestHotQueryIndexes(TestCase):
+    """Test case checking the plans of the hot view queries."""
+
+    def setUp(self):
+        """Set up shows with sold and unsold tickets and logged in clients."""
+        self.client = APIClient()
+        self.api_client = APIClient()
+        user = User.objects.create(username='user', password='user')
+        owner = Client.objects.create(user=user)
+        self.client.force_login(user)
+        self.api_client.force_authenticate(user=user)
+
+        theater = Theater.objects.create(title='Название', address='Анархии 12')
+        shows = []
+        for num in range(SHOWS):
+            performance = Performance.objects.create(
+                title=f'Название {num}', description='Описание', date='2040-02-23',
+            )
+            shows.append(
+                TheaterPerformance.objects.create(theater=theater, performance=performance),
+            )
+        self.performance_id = shows[0].performance_id
+        Ticket.objects.bulk_create(
+            Ticket(
+                price=100, time='11:36:59', place=str(place), theater_performance=t_p,
+                client=owner if place % 2 else None,
+            )
+            for t_p in shows
+            for place in range(PLACES)
+        )
+        with connection.cursor() as cursor:
+            for table in ('ticket', 'theater_performance', 'performance', 'theater'):
+                cursor.execute(f'ANALYZE "api_data"."{table}"')
+
+    test_performance_page = create_index_test(
+        'performance', 'ticket', 'ticket_unsold_idx', args=('performance_id',),
+    )
+    test_performance_state = create_index_test(
+        'performance', 'ticket', 'ticket_show_modified_idx', args=('performance_id',),
+    )
+    test_profile = create_index_test('profile', 'ticket', 'ticket_client_place_idx')
+    test_theaters_catalog = create_index_test('theaters', 'theater', 'theater_ordering_idx')
+    test_performances_catalog = create_index_test(
+        'performances', 'performance', 'performance_ordering_idx',
+    )
+    test_tickets_api = create_index_test(
+        'ticket-list', 'ticket', 'ticket_ordering_idx', api=True,
+    )
+    test_upcoming_api = create_index_test(
+        'performance-upcoming', 'performance', 'performance_date_idx', api=True,
+    )
@@ -0,0 +1,152 @@
+"""Module for testing the denormalized ticket statistics of the shows."""
+
+from datetime import time
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from theaters_app import purchase, seating
+from theaters_app.models import Client, Performance, Theater, TheaterPerformance, Ticket
+
+PRICE = Decimal('300')
+LOW_PRICE = Decimal('150.50')
+SHOW_HOUR = 19
+EVENING = time(SHOW_HOUR)
+MANY_SEATS = 20
+
+
+class TestInventory(TestCase):
+    """Test case for the show ticket statistics."""
+
+    def setUp(self):
+        """Set up a show with generated tickets and a client."""
+        self.theater = Theater.objects.create(title='Театр', address='Анархии 12')
+        self.performance = Performance.objects.create(
+            title='Название', description='Описание', date='2040-02-23',
+        )
+        self.t_p = TheaterPerformance.objects.create(
+            theater=self.theater, performance=self.performance,
+        )
+        seats = [('A-1', PRICE), ('A-2', PRICE), ('B-1', LOW_PRICE)]
+        list(seating.generate_tickets(self.t_p.id, seats, EVENING))
+        self.user = User.objects.create(username='user', password='user')
+        self.buyer = Client.objects.create(user=self.user, money=1000)
+
+    def assert_stats(self, total, sold, min_price, max_price):
+        """
+        Check the statistics of the show.
+
+        Args:
+            total (int): Expected number of tickets.
+            sold (int): Expected number of sold tickets.
+            min_price (Decimal | None): Expected lowest price.
+            max_price (Decimal | None): Expected highest price.
+        """
+        self.t_p.refresh_from_db()
+        self.assertEqual(
+            (self.t_p.tickets_total, self.t_p.tickets_sold, self.t_p.min_price, self.t_p.max_price),
+            (total, sold, min_price, max_price),
+        )
+
+    def test_bulk_creation(self):
+        """Test that generated tickets are counted with their price range."""
+        self.assert_stats(3, 0, LOW_PRICE, PRICE)
+        self.assertEqual(self.t_p.tickets_available, 3)
+
+    def test_purchase(self):
+        """Test that a purchase counts the sold ticket."""
+        ticket = Ticket.objects.get(place='A-1')
+        purchase.purchase_ticket(self.buyer.id, ticket.id)
+        self.assert_stats(3, 1, LOW_PRICE, PRICE)
+
+    def test_api_update(self):
+        """Test that a ticket moved to another show or client through the API is counted."""
+        other = TheaterPerformance.objects.create(
+            theater=Theater.objects.create(title='Другой', address='Ленина 1'),
+            performance=self.performance,
+        )
+        ticket = Ticket.objects.get(place='A-1')
+        client = APIClient()
+        client.force_login(User.objects.create(username='staff', is_superuser=True))
+        url = '{0}?compact=1'.format(reverse('ticket-detail', args=(ticket.id,)))
+        fields = {
+            'price': PRICE, 'time': '19:00', 'place': 'A-1',
+            'theater_performance': self.t_p.id, 'client': self.buyer.id,
+        }
+        response = client.put(url, fields)
+        self.assertEqual(response.data['client'], self.buyer.id)
+        self.assert_stats(3, 1, LOW_PRICE, PRICE)
+        client.put(url, {**fields, 'theater_performance': other.id, 'price': '500.00'})
+        self.assert_stats(2, 0, LOW_PRICE, PRICE)
+        other.refresh_from_db()
+        self.assertEqual((other.tickets_total, other.tickets_sold), (1, 1))
+        self.assertEqual(other.max_price, Decimal('500'))
+
+    def test_single_ticket(self):
+        """Test that tickets created and deleted one by one are counted."""
+        ticket = Ticket.objects.create(
+            price=1000, time='19:00', place='C-1', theater_performance=self.t_p,
+            client=self.buyer,
+        )
+        self.assert_stats(4, 1, LOW_PRICE, Decimal(1000))
+        ticket.delete()
+        Ticket.objects.get(place='A-1').delete()
+        self.assert_stats(2, 0, LOW_PRICE, Decimal(1000))
+
+    def test_show_deleted(self):
+        """Test that the tickets of a deleted show are not uncounted one by one."""
+        list(seating.generate_tickets(
+            self.t_p.id, [(f'C-{seat}', Decimal(100)) for seat in range(MANY_SEATS)], EVENING,
+        ))
+        other = TheaterPerformance.objects.create(
+            theater=Theater.objects.create(title='Другой', address='Ленина 1'),
+            performance=self.performance,
+        )
+        list(seating.generate_tickets(other.id, [('A-1', Decimal(100))], EVENING))
+        for deleted in (self.t_p, self.performance):
+            with CaptureQueriesContext(connection) as context:
+                with self.captureOnCommitCallbacks() as callbacks:
+                    deleted.delete()
+            self.assertFalse([
+                query
+                for query in context.captured_queries
+                if query['sql'].startswith('UPDATE "api_data"."theater_performance"')
+            ])
+            self.assertLess(len(callbacks), 10)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_reconcile(self):
+        """Test that the command reports the drift and fixes it."""
+        Ticket.objects.filter(place='A-1').update(client=self.buyer)
+        Ticket.objects.filter(place='B-1').delete()
+        TheaterPerformance.objects.filter(id=self.t_p.id).update(tickets_total=4)
+        empty = Performance.objects.create(title='Пусто', description='Описание', date='2040-02-23')
+        TheaterPerformance.objects.create(theater=self.theater, performance=empty)
+        stdout = StringIO()
+        call_command('reconcile_show_stats', '--dry-run', stdout=stdout)
+        self.assertIn('1 of 2 shows found', stdout.getvalue())
+        self.assertIn('drift: 2 tickets, 1 sold', stdout.getvalue())
+        self.assert_stats(4, 0, LOW_PRICE, PRICE)
+
+        call_command('reconcile_show_stats', stdout=stdout)
+        self.assert_stats(2, 1, PRICE, PRICE)
+        stdout = StringIO()
+        call_command('reconcile_show_stats', stdout=stdout)
+        self.assertIn('0 of 2 shows fixed', stdout.getvalue())
+
+    def test_performance_page(self):
+        """Test that the performance page shows the availability of every show."""
+        Ticket.objects.filter(place='A-1').update(client=self.buyer)
+        call_command('reconcile_show_stats', stdout=StringIO())
+        client = APIClient()
+        client.force_login(self.user)
+        response = client.get(reverse('performance', args=(self.performance.id,)))
+        self.assertContains(response, '2 of 3 tickets left')
+        self.assertContains(response, 'price 150.50 - 300.00')
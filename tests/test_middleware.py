@@ -0,0 +1,147 @@
+"""Module for testing the query instrumentation middleware."""
+
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app.middleware import QueryCollector, QueryInstrumentationMiddleware
+from theaters_app.models import Client, Theater, Ticket
+
+LOGGER = 'theaters_app.queries'
+
+
+class TestQueryCollector(TestCase):
+    """Test case for the query statistics."""
+
+    def test_duplicates(self):
+        """Test detecting repeated and similar queries."""
+        collector = QueryCollector()
+        executed = []
+        for sql, params in (('a', (1,)), ('a', (1,)), ('a', (2,)), ('b', ())):
+            with collector.timing(sql, params):
+                executed.append(sql)
+        self.assertEqual(collector.count, 4)
+        self.assertEqual(collector.duplicates(), 1)
+        self.assertEqual(collector.similar(), 3)
+
+
+@override_settings(QUERY_LOG_SAMPLE_RATE=1, SLOW_REQUEST_MS=10**6, SERVER_TIMING_HEADER=True)
+class TestQueryInstrumentation(TestCase):
+    """Test case for the query instrumentation middleware."""
+
+    def setUp(self):
+        """Set up a logged in client."""
+        self.client = APIClient()
+        self.user = User.objects.create(username='user', password='user')
+        Client.objects.create(user=self.user)
+        self.client.force_login(self.user)
+
+    def get_profile(self):
+        """
+        Request the profile page.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_log_line(self):
+        """Test that the request statistics are logged."""
+        with self.assertLogs(LOGGER, 'INFO') as logs:
+            self.get_profile()
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'profile')
+        self.assertEqual(record['status'], status.HTTP_200_OK)
+        self.assertGreater(record['queries'], 0)
+        self.assertGreaterEqual(record['sql_ms'], 0)
+
+    def test_server_timing(self):
+        """Test that the Server-Timing header is sent."""
+        with self.assertLogs(LOGGER, 'INFO'):
+            response = self.get_profile()
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries"')
+
+    @override_settings(SLOW_REQUEST_MS=0)
+    def test_slow_request(self):
+        """Test that slow requests are logged as warnings."""
+        with self.assertLogs(LOGGER, 'INFO') as logs:
+            self.get_profile()
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+
+    async def test_async(self):
+        """Test that the queries of an asynchronous view are recorded."""
+        async def view(request):
+            await Theater.objects.acount()
+            await User.objects.filter(id=self.user.id).aexists()
+            return HttpResponse()
+
+        middleware = QueryInstrumentationMiddleware(view)
+        with self.assertLogs(LOGGER, 'INFO') as logs:
+            response = await middleware(RequestFactory().get('/'))
+        self.assertEqual(json.loads(logs.records[0].getMessage())['queries'], 2)
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+    @override_settings(QUERY_LOG_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        """Test that requests out of the sample are not instrumented."""
+        with self.assertNoLogs(LOGGER):
+            response = self.get_profile()
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class TestClientMiddleware(TestCase):
+    """Test case for the lazy client of the request."""
+
+    def setUp(self):
+        """Set up a logged in client with a ticket."""
+        self.client = APIClient()
+        self.user = User.objects.create(username='user', password='user', first_name='Имя')
+        self.buyer = Client.objects.create(user=self.user, money=100)
+        self.ticket = Ticket.objects.create(
+            price=100, time='19:00', place='A-1', client=self.buyer,
+        )
+        self.client.force_login(self.user)
+
+    def test_profile(self):
+        """Test that the user is loaded by the query of the client."""
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('profile'))
+        self.assertContains(response, 'Имя')
+        self.assertEqual(response.context['client'].id, self.buyer.id)
+        self.assertEqual(response.context['user'].id, self.user.id)
+
+    def test_one_query(self):
+        """Test that the user and the client are loaded by one query."""
+        url = reverse('ticket', args=(self.ticket.id,))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.context['client'].id, self.buyer.id)
+        tables = [query['sql'] for query in context.captured_queries if 'auth_user' in query['sql']]
+        self.assertEqual(len(tables), 1)
+        self.assertIn('"client"', tables[0])
+
+    def test_changed_user(self):
+        """Test that the session of a deactivated user or after a password change is not trusted."""
+        User.objects.filter(id=self.user.id).update(is_active=False)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_302_FOUND)
+        User.objects.filter(id=self.user.id).update(is_active=True)
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_200_OK)
+        self.user.set_password('other')
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_302_FOUND)
+
+    def test_no_client(self):
+        """Test that the views answer 404 to the users without a client."""
+        self.client.force_login(User.objects.create(username='staff', password='staff'))
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
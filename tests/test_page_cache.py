@@ -0,0 +1,143 @@
+"""Module for testing the cached theater and performance pages."""
+
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import page_cache
+from theaters_app.models import Client, Performance, Theater, TheaterPerformance, get_datetime
+
+
+class TestPageCache(TestCase):
+    """Test case for the page cache and its invalidation."""
+
+    def setUp(self):
+        """Set up a theater showing a performance and a logged in client."""
+        cache.clear()
+        self.theater = Theater.objects.create(title='Театр', address='Анархии 12')
+        self.performance = Performance.objects.create(
+            title='Спектакль', description='Описание', date='2040-02-23',
+        )
+        TheaterPerformance.objects.create(theater=self.theater, performance=self.performance)
+        self.user = User.objects.create(username='user', password='user')
+        Client.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.force_login(self.user)
+        self.theater_url = reverse('theater', args=(self.theater.id,))
+        self.performance_url = reverse('performance', args=(self.performance.id,))
+
+    def get(self, url):
+        """
+        Request the page.
+
+        Args:
+            url (str): URL of the page.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def catalog_queries(self, url):
+        """
+        Request the page and collect the queries on the theater and performance tables.
+
+        Args:
+            url (str): URL of the page.
+
+        Returns:
+            list[str]: SQL of the queries.
+        """
+        with CaptureQueriesContext(connection) as context:
+            self.get(url)
+        return [
+            query['sql'] for query in context.captured_queries
+            if '"theater"' in query['sql'] or '"performance"' in query['sql']
+        ]
+
+    def test_theater_cached(self):
+        """Test that a repeated theater page request only queries the validators."""
+        self.assertGreater(len(self.catalog_queries(self.theater_url)), 1)
+        self.assertEqual(len(self.catalog_queries(self.theater_url)), 1)
+        version = self.get(self.theater_url).context['page_version']
+        self.assertIsNotNone(cache.get(page_cache.fragment_key(Theater, self.theater.id, version)))
+
+    def test_performance_cached(self):
+        """Test that the performance is loaded from the cache."""
+        version = self.get(self.performance_url).context['page_version']
+        key = page_cache.cache_key(Performance, self.performance.id, version)
+        self.assertIsNotNone(cache.get(key))
+        key = page_cache.fragment_key(Performance, self.performance.id, version)
+        self.assertIsNotNone(cache.get(key))
+
+    def test_not_found(self):
+        """Test that unknown objects are not found."""
+        response = self.client.get(reverse('theater', args=(self.user.client.id,)))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_theater_changed(self):
+        """Test that saving the theater resets its page."""
+        self.get(self.theater_url)
+        self.theater.title = 'Новый театр'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.theater.save()
+        self.assertContains(self.get(self.theater_url), 'Новый театр')
+
+    def test_changed_elsewhere(self):
+        """Test that a change without the signals, as by another process, is seen at once."""
+        etag = self.get(self.theater_url)['ETag']
+        self.get(self.performance_url)
+        Performance.objects.filter(id=self.performance.id).update(
+            title='Новый спектакль', modified=get_datetime(),
+        )
+        response = self.get(self.theater_url)
+        self.assertContains(response, 'Новый спектакль')
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(self.get(self.performance_url), 'Новый спектакль')
+
+    def test_performance_changed(self):
+        """Test that saving the performance resets its page and the theater page."""
+        self.get(self.theater_url)
+        self.get(self.performance_url)
+        self.performance.title = 'Новый спектакль'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.performance.save()
+        self.assertContains(self.get(self.theater_url), 'Новый спектакль')
+        self.assertContains(self.get(self.performance_url), 'Новый спектакль')
+
+    def test_shows_changed(self):
+        """Test that adding and removing shows resets the theater page."""
+        other = Performance.objects.create(
+            title='Другой', description='Описание', date='2040-02-23',
+        )
+        self.get(self.theater_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.theater.performances.add(other)
+        self.assertContains(self.get(self.theater_url), 'Другой')
+        with self.captureOnCommitCallbacks(execute=True):
+            TheaterPerformance.objects.get(performance=other).delete()
+        self.assertNotContains(self.get(self.theater_url), 'Другой')
+        with self.captureOnCommitCallbacks(execute=True):
+            other.theaters.add(self.theater)
+        self.assertContains(self.get(self.theater_url), 'Другой')
+
+    def test_file_backend(self):
+        """Test that the pages work with the file based cache."""
+        with tempfile.TemporaryDirectory() as location:
+            backend = {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }
+            with override_settings(CACHES={'default': backend}):
+                self.get(self.theater_url)
+                self.assertEqual(len(self.catalog_queries(self.theater_url)), 1)
+                self.assertContains(self.get(self.theater_url), 'Спектакль')
@@ -0,0 +1,152 @@
+"""Module for testing keyset pagination of the catalog."""
+
+import base64
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app.models import Client, Theater, Ticket
+from theaters_app.pagination import KeysetPaginator
+
+THEATERS = 25
+PAGE_SIZE = 10
+# payloads of the crafted cursors: not a list, wrong length and wrong types of the values
+CRAFTED = (
+    {'n': []},
+    'n',
+    ['n'],
+    ['n', [1, 'a']],
+    ['n', [1, 'a', 'b', 'c', 'd']],
+    ['n', 'abcd'],
+    [['n'], [1, 'a', 'b', 'c']],
+    ['n', ['x', 'a', 'b', 'c']],
+    ['n', [{}, 'a', 'b', 'c']],
+    ['n', [1, 'a', 'b', 'not a uuid']],
+    ['n', [None, 'a', 'b', 'c']],
+    ['n', [1e400, 'a', 'b', 'c']],
+    ['p', [1, 'a\x00', 'b', 'c']],
+)
+
+
+def craft(payload) -> str:
+    """
+    Encode a cursor with an arbitrary payload.
+
+    Args:
+        payload: JSON payload of the cursor.
+
+    Returns:
+        str: Cursor token.
+    """
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class TestKeysetPaginator(TestCase):
+    """Test case for the keyset paginator."""
+
+    def setUp(self):
+        """Set up theaters with repeated ordering values."""
+        for num in range(THEATERS):
+            Theater.objects.create(
+                title='Театр {0}'.format(num % 3), address='Анархии 12', rating=num % 5,
+            )
+        self.expected = list(Theater.objects.order_by('rating', 'title', 'address', 'id'))
+        self.paginator = KeysetPaginator(Theater.objects.all(), PAGE_SIZE)
+
+    def test_forward(self):
+        """Test that walking forward returns every object once and in order."""
+        page = self.paginator.get_page(None)
+        self.assertFalse(page.has_previous())
+        seen = list(page)
+        while page.has_next():
+            page = self.paginator.get_page(page.next_cursor)
+            seen += list(page)
+        self.assertEqual(seen, self.expected)
+
+    def test_backward(self):
+        """Test that walking back from the last page returns every object in order."""
+        page = self.paginator.get_page(None)
+        while page.has_next():
+            page = self.paginator.get_page(page.next_cursor)
+        seen = list(page)
+        while page.has_previous():
+            page = self.paginator.get_page(page.previous_cursor)
+            seen = list(page) + seen
+        self.assertEqual(seen, self.expected)
+
+    def test_descending(self):
+        """Test pagination over a descending ordering."""
+        paginator = KeysetPaginator(Ticket.objects.all(), 2, ['-place'])
+        for place in range(5):
+            Ticket.objects.create(price=100, time='11:36:59', place=str(place))
+        first = paginator.get_page(None)
+        second = paginator.get_page(first.next_cursor)
+        self.assertEqual([ticket.place for ticket in first], ['4', '3'])
+        self.assertEqual([ticket.place for ticket in second], ['2', '1'])
+
+    def test_invalid_cursor(self):
+        """Test that an invalid cursor falls back to the first page."""
+        for cursor in ('abc', 'W10', '!!!'):
+            self.assertEqual(list(self.paginator.get_page(cursor)), self.expected[:PAGE_SIZE])
+
+    def test_crafted_cursor(self):
+        """Test that a well encoded cursor with a wrong payload falls back to the first page."""
+        for payload in CRAFTED:
+            with self.subTest(payload=payload):
+                page = self.paginator.get_page(craft(payload))
+                self.assertEqual(list(page), self.expected[:PAGE_SIZE])
+
+
+class TestCatalogPagination(TestCase):
+    """Test case for the paginated catalog pages."""
+
+    def setUp(self):
+        """Set up theaters and a logged in user."""
+        for num in range(THEATERS):
+            Theater.objects.create(title=f'Театр {num:02}', address='Анархии 12')
+        self.client = APIClient()
+        self.user = User.objects.create(username='user', password='user')
+        Client.objects.create(user=self.user)
+        self.client.force_login(self.user)
+
+    def get(self, cursor=None):
+        """
+        Request a page of the theaters catalog and capture executed queries.
+
+        Args:
+            cursor (str | None): Cursor of the page.
+
+        Returns:
+            tuple: The page and the captured queries.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('theaters'), {'cursor': cursor} if cursor else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.context['page_obj'], context.captured_queries
+
+    def test_no_count(self):
+        """Test that the pages are built without COUNT queries and at a constant cost."""
+        page, first_queries = self.get()
+        self.assertEqual(len(page), PAGE_SIZE)
+        while page.has_next():
+            page, queries = self.get(page.next_cursor)
+            self.assertEqual(len(queries), len(first_queries))
+            self.assertFalse([query for query in queries if 'COUNT' in query['sql']])
+        self.assertEqual(len(page), THEATERS % PAGE_SIZE)
+
+    def test_crafted_cursor(self):
+        """Test that the catalog page and the API return the first page for crafted cursors."""
+        self.client.force_authenticate(user=self.user)
+        for payload in CRAFTED:
+            with self.subTest(payload=payload):
+                page, _ = self.get(craft(payload))
+                self.assertFalse(page.has_previous())
+                response = self.client.get('/api/theaters/', {'cursor': craft(payload)})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertIsNone(response.data['previous'])
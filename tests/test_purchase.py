@@ -0,0 +1,303 @@
+"""Module for testing the ticket purchase service."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import availability, purchase
+from theaters_app.models import (
+    Client,
+    Performance,
+    SeatHold,
+    Theater,
+    TheaterPerformance,
+    Ticket,
+    get_datetime,
+)
+
+BUYERS = 16
+WORKERS = 8
+PRICE = 100
+BALANCE = 150
+BASKET_BALANCE = 250
+ticket_attrs = {'price': PRICE, 'time': '11:36:59', 'place': '12'}
+
+
+class TestPurchase(TestCase):
+    """Test case for buying a single ticket."""
+
+    def setUp(self):
+        """Set up a client with some money and a free ticket."""
+        self.user = User.objects.create(username='user', password='user')
+        self.buyer = Client.objects.create(user=self.user, money=BALANCE)
+        self.ticket = Ticket.objects.create(**ticket_attrs)
+
+    def successful(self, lock_mode):
+        """
+        Test that the ticket is sold and the balance is debited.
+
+        Args:
+            lock_mode (str): Row lock mode.
+        """
+        purchase.purchase_ticket(self.buyer.id, self.ticket.id, lock_mode)
+        self.ticket.refresh_from_db()
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.ticket.client_id, self.buyer.id)
+        self.assertEqual(self.buyer.money, BALANCE - PRICE)
+
+    def test_successful_nowait(self):
+        """Test buying a ticket in nowait mode."""
+        self.successful(purchase.LOCK_NOWAIT)
+
+    def test_successful_skip_locked(self):
+        """Test buying a ticket in skip locked mode."""
+        self.successful(purchase.LOCK_SKIP_LOCKED)
+
+    def test_insufficient_funds(self):
+        """Test that nothing changes if the client can not pay."""
+        Client.objects.filter(id=self.buyer.id).update(money=PRICE - 1)
+        with self.assertRaises(purchase.InsufficientFundsError):
+            purchase.purchase_ticket(self.buyer.id, self.ticket.id)
+        self.ticket.refresh_from_db()
+        self.buyer.refresh_from_db()
+        self.assertIsNone(self.ticket.client_id)
+        self.assertEqual(self.buyer.money, PRICE - 1)
+
+    def test_sold_ticket(self):
+        """Test that a sold ticket can not be bought again."""
+        purchase.purchase_ticket(self.buyer.id, self.ticket.id)
+        with self.assertRaises(purchase.SeatTakenError):
+            purchase.purchase_ticket(self.buyer.id, self.ticket.id)
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.money, BALANCE - PRICE)
+
+    def test_unknown_lock_mode(self):
+        """Test that an unknown lock mode is rejected."""
+        with self.assertRaises(ValueError):
+            purchase.purchase_ticket(self.buyer.id, self.ticket.id, 'wait')
+
+    def test_view(self):
+        """Test the buy view redirects on success and answers with a conflict afterwards."""
+        api_client = APIClient()
+        api_client.force_login(self.user)
+        url = reverse('buy', args=(self.ticket.id,))
+
+        response = api_client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+
+        response = api_client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+
+def create_show(title: str) -> TheaterPerformance:
+    """
+    Create a show of a new theater and performance.
+
+    Args:
+        title (str): Title of the theater and the performance.
+
+    Returns:
+        TheaterPerformance: The show.
+    """
+    return TheaterPerformance.objects.create(
+        theater=Theater.objects.create(title=title, address='Анархии 12'),
+        performance=Performance.objects.create(
+            title=title, description='Описание', date='2040-02-23',
+        ),
+    )
+
+
+class TestBasket(TestCase):
+    """Test case for buying several tickets of a show at once."""
+
+    def setUp(self):
+        """Set up a client with some money and three free tickets of a show."""
+        self.user = User.objects.create(username='user', password='user')
+        self.buyer = Client.objects.create(user=self.user, money=BASKET_BALANCE)
+        self.show = create_show('Спектакль')
+        self.tickets = [
+            Ticket.objects.create(**{**ticket_attrs, 'place': place}, theater_performance=self.show)
+            for place in ('A-1', 'A-2', 'A-3')
+        ]
+        self.ids = [ticket.id for ticket in self.tickets]
+
+    def assert_unsold(self, money):
+        """
+        Assert that no ticket is sold and the balance did not change.
+
+        Args:
+            money (int): Expected balance.
+        """
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.money, money)
+        self.assertFalse(Ticket.objects.exclude(client=None).exists())
+
+    def test_successful(self):
+        """Test that all tickets are sold with a single debit."""
+        availability.get(self.show.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(8):
+                sold = purchase.purchase_tickets(self.buyer.id, self.ids[:2] + self.ids[:1])
+        self.assertEqual([ticket.id for ticket in sold], sorted(self.ids[:2]))
+        self.buyer.refresh_from_db()
+        self.show.refresh_from_db()
+        self.assertEqual(self.buyer.money, BASKET_BALANCE - 2 * PRICE)
+        self.assertEqual(
+            set(Ticket.objects.filter(client=self.buyer).values_list('id', flat=True)),
+            set(self.ids[:2]),
+        )
+        self.assertEqual(self.show.tickets_sold, 2)
+        self.assertEqual(availability.get(self.show.id)['free'], bytes([0b100]))
+
+    def test_all_or_none(self):
+        """Test that nothing is sold if any ticket of the basket is not available."""
+        purchase.purchase_ticket(self.buyer.id, self.ids[2])
+        with self.assertRaises(purchase.SeatTakenError):
+            purchase.purchase_tickets(self.buyer.id, self.ids)
+        self.buyer.refresh_from_db()
+        self.assertEqual(self.buyer.money, BASKET_BALANCE - PRICE)
+        self.assertEqual(Ticket.objects.exclude(client=None).count(), 1)
+
+    def test_insufficient_funds(self):
+        """Test that the whole basket must be affordable."""
+        with self.assertRaises(purchase.InsufficientFundsError):
+            purchase.purchase_tickets(self.buyer.id, self.ids)
+        self.assert_unsold(BASKET_BALANCE)
+
+    def test_held(self):
+        """Test that a ticket held by another client blocks the basket."""
+        rival = Client.objects.create(
+            user=User.objects.create(username='rival', password='rival'), money=1000,
+        )
+        SeatHold.objects.create(
+            ticket=self.tickets[1], client=rival, expires=get_datetime() + timedelta(minutes=5),
+        )
+        with self.assertRaises(purchase.SeatHeldError):
+            purchase.purchase_tickets(self.buyer.id, self.ids[:2])
+        self.assert_unsold(BASKET_BALANCE)
+
+    def test_mixed_shows(self):
+        """Test that the tickets must belong to one show."""
+        other = Ticket.objects.create(**ticket_attrs, theater_performance=create_show('Другой'))
+        with self.assertRaises(purchase.MixedShowsError):
+            purchase.purchase_tickets(self.buyer.id, [self.ids[0], other.id])
+        with self.assertRaises(ValueError):
+            purchase.purchase_tickets(self.buyer.id, [])
+        self.assert_unsold(BASKET_BALANCE)
+
+    def test_api(self):
+        """Test the basket endpoint answers with the sold tickets and then with a conflict."""
+        api_client = APIClient()
+        api_client.force_authenticate(self.user)
+        url = reverse('ticket-basket')
+        response = api_client.post(url, {'tickets': self.ids[:2]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['tickets'], sorted(self.ids[:2]))
+        self.assertEqual(float(response.data['total']), 2 * PRICE)
+
+        response = api_client.post(url, {'tickets': self.ids[1:]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = api_client.post(url, {'tickets': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestPurchaseConcurrency(TransactionTestCase):
+    """Test buying the same tickets from many threads at once, benchmarks.suite times it."""
+
+    # flushing with cascade is needed for tables in the api_data schema
+    available_apps = [
+        'theaters_app',
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'django.contrib.sessions',
+    ]
+    # the reads outside of transactions go to the replica aliases when they are set
+    databases = '__all__'
+
+    def setUp(self):
+        """Set up many rich clients and one free ticket."""
+        self.buyers = [
+            Client.objects.create(
+                user=User.objects.create(username=f'user{num}', password='user'),
+                money=1000,
+            ).id
+            for num in range(BUYERS)
+        ]
+
+    def buy(self, client_id, ticket_id, lock_mode):
+        """
+        Try to buy the ticket in a separate thread.
+
+        Args:
+            client_id (UUID): ID of the buying client.
+            ticket_id (UUID): ID of the ticket.
+            lock_mode (str): Row lock mode.
+
+        Returns:
+            bool: True if the ticket was bought.
+        """
+        try:
+            purchase.purchase_ticket(client_id, ticket_id, lock_mode)
+        except purchase.SeatTakenError:
+            return False
+        finally:
+            connection.close()
+        return True
+
+    def hammer(self, lock_mode):
+        """
+        Buy one ticket from all clients concurrently.
+
+        Args:
+            lock_mode (str): Row lock mode.
+        """
+        ticket = Ticket.objects.create(**ticket_attrs)
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            results = list(executor.map(
+                lambda client_id: self.buy(client_id, ticket.id, lock_mode),
+                self.buyers,
+            ))
+
+        ticket.refresh_from_db()
+        self.assertEqual(results.count(True), 1)
+        self.assertIn(ticket.client_id, self.buyers)
+        spent = sum(1000 - buyer.money for buyer in Client.objects.all())
+        self.assertEqual(spent, ticket.price)
+
+    def test_nowait(self):
+        """Test that exactly one client buys the ticket in nowait mode."""
+        self.hammer(purchase.LOCK_NOWAIT)
+
+    def test_skip_locked(self):
+        """Test that exactly one client buys the ticket in skip locked mode."""
+        self.hammer(purchase.LOCK_SKIP_LOCKED)
+
+    def test_overlapping_baskets(self):
+        """Test that overlapping baskets never sell a ticket twice."""
+        show = create_show('Спектакль')
+        tickets = [
+            Ticket.objects.create(**{**ticket_attrs, 'place': str(place)}, theater_performance=show)
+            for place in range(4)
+        ]
+
+        def buy_basket(num):
+            basket = [tickets[num % 4].id, tickets[(num + 1) % 4].id]
+            try:
+                purchase.purchase_tickets(self.buyers[num], reversed(basket))
+            except purchase.SeatTakenError:
+                return 0
+            finally:
+                connection.close()
+            return len(basket)
+
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            sold = sum(executor.map(buy_basket, range(BUYERS)))
+        self.assertEqual(sold, Ticket.objects.exclude(client=None).count())
+        spent = sum(1000 - buyer.money for buyer in Client.objects.all())
+        self.assertEqual(spent, sum(ticket.price for ticket in Ticket.objects.exclude(client=None)))
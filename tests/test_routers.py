@@ -0,0 +1,132 @@
+"""Module for testing the read replica routing."""
+
+import time
+from importlib import import_module
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework import status
+
+from theaters_app import routers
+from theaters_app.middleware import PRIMARY_UNTIL_KEY, ReplicaRoutingMiddleware
+from theaters_app.models import Theater
+
+REPLICA = 'replica1'
+SessionStore = import_module('django.contrib.sessions.backends.signed_cookies').SessionStore
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class TestReplicaRouter(SimpleTestCase):
+    """Test case for choosing the database of the queries."""
+
+    def setUp(self):
+        """Set up the router."""
+        self.router = routers.ReplicaRouter()
+
+    def test_reads(self):
+        """Test that the reads go to the replica unless the primary is pinned."""
+        self.assertEqual(self.router.db_for_read(Theater), REPLICA)
+        self.assertEqual(self.router.db_for_read(Session), 'default')
+        with routers.primary():
+            with routers.primary(enabled=False):
+                self.assertEqual(self.router.db_for_read(Theater), 'default')
+        with routers.primary(enabled=False):
+            self.assertEqual(self.router.db_for_read(Theater), REPLICA)
+
+    def test_writes(self):
+        """Test that the writes and the migrations go to the primary."""
+        self.assertEqual(self.router.db_for_write(Theater), 'default')
+        self.assertTrue(self.router.allow_migrate('default', 'theaters_app'))
+        self.assertFalse(self.router.allow_migrate(REPLICA, 'theaters_app'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test that everything goes to the primary without replicas."""
+        self.assertEqual(self.router.db_for_read(Theater), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_STICKY_SECONDS=60)
+class TestReplicaRoutingMiddleware(SimpleTestCase):
+    """Test case for keeping the reads of a session on the primary after its writes."""
+
+    def setUp(self):
+        """Set up a session and a view recording the database of its reads."""
+        self.session = SessionStore()
+        self.reads = []
+        self.status_code = status.HTTP_200_OK
+
+    def view(self, request):
+        """
+        Record the database of the reads.
+
+        Args:
+            request (HttpRequest): The request.
+
+        Returns:
+            HttpResponse: Response with the configured status.
+        """
+        self.reads.append(routers.ReplicaRouter().db_for_read(Theater))
+        return HttpResponse(status=self.status_code)
+
+    async def aview(self, request):
+        """
+        Record the database of the reads in the asynchronous mode.
+
+        Args:
+            request (HttpRequest): The request.
+
+        Returns:
+            HttpResponse: Response with the configured status.
+        """
+        return self.view(request)
+
+    def request(self, method, cookie=True):
+        """
+        Build a request of the session.
+
+        Args:
+            method (str): HTTP method.
+            cookie (bool): Send the session cookie.
+
+        Returns:
+            HttpRequest: The request.
+        """
+        request = getattr(RequestFactory(), method)('/')
+        if cookie:
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = 'session'
+        request.session = self.session
+        return request
+
+    def test_sticky(self):
+        """Test that a successful write keeps the reads of the session on the primary."""
+        middleware = ReplicaRoutingMiddleware(self.view)
+        middleware(self.request('get'))
+        middleware(self.request('post'))
+        middleware(self.request('get'))
+        middleware(self.request('get', cookie=False))
+        self.session[PRIMARY_UNTIL_KEY] = time.time() - 1
+        middleware(self.request('get'))
+        self.assertEqual(self.reads, [REPLICA, 'default', 'default', REPLICA, REPLICA])
+
+    def test_failed_write(self):
+        """Test that a failed write or a write without a session cookie is not sticky."""
+        middleware = ReplicaRoutingMiddleware(self.view)
+        self.status_code = status.HTTP_409_CONFLICT
+        middleware(self.request('post'))
+        self.status_code = status.HTTP_200_OK
+        middleware(self.request('post', cookie=False))
+        self.assertNotIn(PRIMARY_UNTIL_KEY, self.session)
+        middleware(self.request('get'))
+        self.assertEqual(self.reads, ['default', 'default', REPLICA])
+
+    async def test_async(self):
+        """Test the stickiness in the asynchronous mode."""
+        middleware = ReplicaRoutingMiddleware(self.aview)
+        self.assertTrue(iscoroutinefunction(middleware))
+        await middleware(self.request('get'))
+        await middleware(self.request('post'))
+        await middleware(self.request('get'))
+        self.assertEqual(self.reads, [REPLICA, 'default', 'default'])
@@ -0,0 +1,80 @@
+"""Module for testing the feed of the upcoming performances."""
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app.models import Performance, Theater, TheaterPerformance
+
+URL = reverse('performance-upcoming')
+
+
+class TestUpcoming(TestCase):
+    """Test case for the upcoming performances feed."""
+
+    def setUp(self):
+        """Set up past and future performances in two theaters."""
+        self.first = Theater.objects.create(title='Первый', address='Анархии 12')
+        self.second = Theater.objects.create(title='Второй', address='Анархии 13')
+        shows = (
+            ('Прошедший', '2020-01-01', (self.first,)),
+            ('Январь', '2040-01-10', (self.first,)),
+            ('Раньше', '2040-01-05', (self.second,)),
+            ('Февраль', '2040-02-01', (self.first, self.second)),
+        )
+        for title, date, theaters in shows:
+            performance = Performance.objects.create(title=title, description='Описание', date=date)
+            for theater in theaters:
+                TheaterPerformance.objects.create(theater=theater, performance=performance)
+        self.user = User.objects.create(username='user', password='user')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def titles(self, **params):
+        """
+        Request the feed through the API.
+
+        Args:
+            params: Query parameters.
+
+        Returns:
+            list[str]: Titles of the performances.
+        """
+        response = self.client.get(URL, {'compact': 1, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [performance['title'] for performance in response.data['results']]
+
+    def test_feed(self):
+        """Test that past performances are excluded and the soonest are first."""
+        self.assertEqual(self.titles(), ['Раньше', 'Январь', 'Февраль'])
+        self.assertEqual(self.titles(start='2000-01-01'), ['Раньше', 'Январь', 'Февраль'])
+
+    def test_date_range(self):
+        """Test filtering by the date range."""
+        self.assertEqual(self.titles(start='2040-01-06', end='2040-01-31'), ['Январь'])
+        response = self.client.get(URL, {'start': '2040-02-01', 'end': '2040-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_theater(self):
+        """Test filtering by the theater."""
+        self.assertEqual(self.titles(theater=self.second.id), ['Раньше', 'Февраль'])
+
+    def test_pagination(self):
+        """Test that the feed is paginated by a cursor."""
+        response = self.client.get(URL, {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['title'] for row in response.data['results']], ['Февраль'])
+
+    def test_page(self):
+        """Test the HTML feed keeps the filters in the pagination links."""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('upcoming'), {'theater': self.first.id})
+        self.assertEqual(
+            [performance.title for performance in response.context['performances']],
+            ['Январь', 'Февраль'],
+        )
+        response = self.client.get(reverse('upcoming'), {'start': 'tomorrow'})
+        self.assertContains(response, 'No performances found')
@@ -0,0 +1,116 @@
+"""Module for testing the full-text search over the catalog."""
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tests.test_indexes import explain
+from theaters_app import search
+from theaters_app.models import Performance, Theater
+
+URL = reverse('search-api')
+
+
+class TestSearch(TestCase):
+    """Test case for the catalog search."""
+
+    def setUp(self):
+        """Set up a catalog and an authenticated user."""
+        Theater.objects.create(title='Bolshoi Theatre', address='Theatre Square 1')
+        Theater.objects.create(title='Workshop', address='Theatrical Street 5')
+        Performance.objects.create(
+            title='Swan Lake', description='Ballet by Tchaikovsky', date='2040-02-23',
+        )
+        Performance.objects.create(
+            title='Ballet Giselle', description='Romantic performance', date='2040-03-01',
+        )
+        Performance.objects.create(
+            title='Hamlet', description='Tragedy by Shakespeare', date='2040-04-01',
+        )
+        self.user = User.objects.create(username='user', password='user')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def titles(self, **params):
+        """
+        Search through the API.
+
+        Args:
+            params: Query parameters.
+
+        Returns:
+            dict[str, list[str]]: Titles of the found theaters and performances.
+        """
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {
+            key: [record['title'] for record in records]
+            for key, records in response.data.items()
+        }
+
+    def test_stemming(self):
+        """Test that word forms are matched and other records are not."""
+        self.assertEqual(
+            self.titles(q='theatres'), {'theaters': ['Bolshoi Theatre'], 'performances': []},
+        )
+
+    def test_ranking(self):
+        """Test that title matches are ranked above description matches."""
+        self.assertEqual(self.titles(q='ballet')['performances'], ['Ballet Giselle', 'Swan Lake'])
+
+    def test_websearch_syntax(self):
+        """Test the web search syntax of the query."""
+        self.assertEqual(self.titles(q='ballet -lake')['performances'], ['Ballet Giselle'])
+
+    def test_prefix(self):
+        """Test that the typeahead mode matches word beginnings."""
+        self.assertEqual(self.titles(q='swa')['performances'], [])
+        self.assertEqual(self.titles(q='swa', prefix=1)['performances'], ['Swan Lake'])
+        self.assertEqual(
+            self.titles(q='theat', prefix=1)['theaters'], ['Bolshoi Theatre', 'Workshop'],
+        )
+
+    def test_limit(self):
+        """Test limiting the number of results."""
+        self.assertEqual(len(self.titles(q='ballet', limit=1)['performances']), 1)
+
+    def test_invalid_query(self):
+        """Test queries which can not be searched."""
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.titles(q='!!! & |'), {'theaters': [], 'performances': []})
+
+    def test_typos(self):
+        """Test that titles with typos are found by the trigram similarity."""
+        if not search.trigram_enabled():
+            self.skipTest('pg_trgm is not installed')
+        self.assertEqual(self.titles(q='Hamlett')['performances'], ['Hamlet'])
+
+    def test_cyrillic(self):
+        """Test that Russian word forms are matched."""
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW server_encoding')
+            if cursor.fetchone()[0] != 'UTF8':
+                self.skipTest('the text search parser needs a UTF8 database for Cyrillic')
+        Theater.objects.create(title='Малый театр', address='Театральная площадь 1')
+        self.assertEqual(self.titles(q='театры')['theaters'], ['Малый театр'])
+
+    def test_search_index(self):
+        """Test that the search is served by the GIN index."""
+        with CaptureQueriesContext(connection) as context:
+            self.titles(q='ballet')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = explain(context.captured_queries[-1]['sql'])
+        self.assertIn('performance_search_idx', {node.get('Index Name') for node in plan})
+
+    async def test_page(self):
+        """Test the HTML search page."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('search'), {'q': 'hamlet'})
+        self.assertContains(response, 'Hamlet')
+        self.assertContains(response, 'No theaters found')
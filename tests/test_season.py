@@ -0,0 +1,167 @@
+"""Module for testing the bulk import of a season."""
+
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from uuid import uuid4
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from theaters_app import season
+from theaters_app.models import Performance, Theater, TheaterPerformance
+
+THEATERS_CSV = """id,title,address,rating
+,Bolshoi,Theatre Square 1,4.9
+,Maly,Theatre Square 2,
+,Broken,Nowhere,7
+"""
+
+
+class TestSeason(TestCase):
+    """Test case for the season import."""
+
+    def setUp(self):
+        """Set up the directory of the season files."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        """Remove the season files."""
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        """
+        Write a season file.
+
+        Args:
+            name (str): Name of the file.
+            content (str | list): Text of the file or the JSON rows.
+
+        Returns:
+            str: Path to the file.
+        """
+        if not isinstance(content, str):
+            content = json.dumps(content)
+        path = self.path / name
+        path.write_text(content, encoding='utf-8')
+        return str(path)
+
+    def call(self, *args):
+        """
+        Run the command.
+
+        Args:
+            args: Command arguments.
+
+        Returns:
+            tuple[str, str]: Output and error output.
+        """
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_season', *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_clean_rows(self):
+        """Test that the field validators reject the rows without queries."""
+        with CaptureQueriesContext(connection) as context:
+            valid, rejected = season.clean_rows(Performance, [
+                {'title': 'Swan Lake', 'description': 'Ballet', 'date': '2040-02-23'},
+                {'title': 'Past', 'description': 'Ballet', 'date': '2000-01-01'},
+                {'id': 'x', 'title': '', 'description': 'Ballet', 'date': 'soon'},
+            ])
+        self.assertEqual(context.captured_queries, [])
+        self.assertEqual([row['title'] for row in valid.values()], ['Swan Lake'])
+        self.assertEqual(set(rejected), {2, 3})
+        self.assertEqual(set(rejected[3]), {'id', 'title', 'date'})
+
+    def test_import(self):
+        """Test importing the theaters, performances and shows."""
+        existing = Performance.objects.create(
+            title='Hamlet', description='Old', date='2040-04-01',
+        )
+        stdout, stderr = self.call(
+            '--theaters', self.write('theaters.csv', THEATERS_CSV),
+            '--performances', self.write('performances.json', [
+                {'title': 'Swan Lake', 'description': 'Ballet', 'date': '2040-02-23'},
+                {'title': 'Hamlet', 'description': 'Tragedy', 'date': '2040-04-01'},
+            ]),
+            '--shows', self.write('shows.csv', '\n'.join((
+                'theater,performance',
+                'Bolshoi,Swan Lake',
+                f'Bolshoi,{existing.id}',
+                'Maly,Hamlet',
+                'Nowhere,Hamlet',
+                f'{uuid4()},Hamlet',
+                '',
+            ))),
+            '--batch-size', '1',
+        )
+        self.assertIn('theaters: 2 of 3 rows imported, 1 rejected', stdout)
+        self.assertIn('performances: 2 of 2 rows imported', stdout)
+        self.assertIn('shows: 3 of 5 rows imported, 2 rejected', stdout)
+        self.assertIn('theaters row 3 rejected', stderr)
+        self.assertIn("'Nowhere' does not exist", stderr)
+        self.assertEqual(Theater.objects.get(title='Maly').rating, Decimal(5))
+        existing.refresh_from_db()
+        self.assertEqual(existing.description, 'Tragedy')
+        self.assertEqual(Performance.objects.count(), 2)
+        self.assertEqual(TheaterPerformance.objects.count(), 3)
+
+    def test_repeated(self):
+        """Test that importing the same files again updates the records."""
+        theater_id = uuid4()
+        theaters = self.write('theaters.json', [
+            {'id': str(theater_id), 'title': 'Bolshoi', 'address': 'Square 1', 'rating': 4},
+        ])
+        shows = self.write('shows.json', [{'theater': 'Bolshoi', 'performance': 'Hamlet'}])
+        performances = self.write('performances.csv', (
+            'title,description,date\nHamlet,Tragedy,2040-04-01\n'
+        ))
+        for _ in range(2):
+            self.call('--theaters', theaters, '--performances', performances, '--shows', shows)
+        self.assertEqual(Theater.objects.get().id, theater_id)
+        self.assertEqual(Performance.objects.count(), 1)
+        self.assertEqual(TheaterPerformance.objects.count(), 1)
+
+        self.call('--theaters', self.write('theaters.json', [
+            {'id': str(theater_id), 'title': 'Bolshoi', 'address': 'Square 1', 'rating': 3},
+            {'id': str(theater_id), 'title': 'Copy', 'address': 'Square 1', 'rating': 3},
+        ]))
+        self.assertEqual(Theater.objects.get().rating, 3)
+
+    def test_repeated_natural_key(self):
+        """Test that the later rows repeating a natural key or an id are rejected."""
+        existing = Theater.objects.create(title='Maly', address='Square 2')
+        stdout, stderr = self.call('--theaters', self.write('theaters.json', [
+            {'title': 'Bolshoi', 'address': 'Square 1', 'rating': 4},
+            {'title': 'Bolshoi', 'address': 'Square 1', 'rating': 3},
+            {'title': 'Maly', 'address': 'Square 2', 'rating': 5},
+            {'id': str(existing.id), 'title': 'Maly', 'address': 'Square 3'},
+            {'id': str(uuid4()), 'title': 'Bolshoi', 'address': 'Square 1'},
+        ]))
+        self.assertIn('theaters: 2 of 5 rows imported, 3 rejected', stdout)
+        self.assertIn('row 2 rejected', stderr)
+        self.assertIn('duplicate of row 3', stderr)
+        self.assertEqual(
+            dict(Theater.objects.values_list('title', 'rating')),
+            {'Bolshoi': Decimal(4), 'Maly': Decimal(5)},
+        )
+
+    def test_dry_run(self):
+        """Test that the dry run saves nothing."""
+        stdout, _ = self.call('--theaters', self.write('theaters.csv', THEATERS_CSV), '--dry-run')
+        self.assertIn('theaters: 2 of 3 rows imported', stdout)
+        self.assertFalse(Theater.objects.exists())
+
+    def test_invalid_files(self):
+        """Test the errors of the files."""
+        with self.assertRaises(CommandError):
+            self.call()
+        with self.assertRaises(CommandError):
+            self.call('--theaters', self.write('theaters.txt', 'title'))
+        with self.assertRaises(CommandError):
+            self.call('--theaters', self.write('theaters.json', {'title': 'Bolshoi'}))
@@ -0,0 +1,111 @@
+"""Module for testing the bulk generation of show tickets."""
+
+import json
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from theaters_app import seating
+from theaters_app.models import Performance, Theater, TheaterPerformance, Ticket
+
+URL = '/api/tickets/generate/'
+VIP_PRICE = 3000
+HALL_ROWS = 50
+ROW_SEATS = 100
+
+
+class TestSeating(TestCase):
+    """Test case for the tickets generation."""
+
+    def setUp(self):
+        """Set up a show and an authenticated superuser."""
+        theater = Theater.objects.create(title='Название', address='Анархии 12')
+        performance = Performance.objects.create(
+            title='Название', description='Описание', date='2040-02-23',
+        )
+        self.t_p = TheaterPerformance.objects.create(theater=theater, performance=performance)
+        self.data = {
+            'theater_performance': str(self.t_p.id),
+            'time': '19:00',
+            'seat_map': [
+                {'row': 'A', 'seats': 3, 'tier': 'vip'},
+                {'row': 'B', 'seats': 4, 'tier': 'standard'},
+            ],
+            'price_tiers': {'vip': str(VIP_PRICE), 'standard': '1000.50'},
+            'batch_size': 2,
+        }
+        self.client = APIClient()
+        superuser = User.objects.create(username='def', password='def', is_superuser=True)
+        self.client.force_authenticate(user=superuser)
+
+    def generate(self):
+        """
+        Post the seat map to the API.
+
+        Returns:
+            dict: Result of the generation.
+        """
+        response = self.client.post(URL, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.json()
+
+    def test_seat_places(self):
+        """Test expanding the seat map into places."""
+        places = seating.seat_places(
+            [{'row': 'A', 'seats': 2, 'tier': 'vip'}], {'vip': Decimal(10)},
+        )
+        self.assertEqual(places, [('A-1', Decimal(10)), ('A-2', Decimal(10))])
+
+    def test_generate(self):
+        """Test that all tickets are created in batches with the tier prices."""
+        self.assertEqual(self.generate(), {'created': 7, 'total': 7, 'skipped': 0})
+        extra = [(f'C-{seat}', Decimal(1)) for seat in range(5)]
+        progress = seating.generate_tickets(self.t_p.id, extra, '19:00', 2)
+        self.assertEqual([line['created'] for line in progress], [2, 4, 5])
+        tickets = Ticket.objects.filter(theater_performance=self.t_p)
+        seats = sum(row['seats'] for row in self.data['seat_map'])
+        self.assertEqual(tickets.count(), seats + len(extra))
+        self.assertEqual(tickets.get(place='A-3').price, VIP_PRICE)
+        self.assertEqual(tickets.get(place='B-4').price, Decimal('1000.50'))
+
+    def test_existing_places_skipped(self):
+        """Test that repeating the generation only adds the new places."""
+        self.generate()
+        self.data['seat_map'].append({'row': 'C', 'seats': 1, 'tier': 'vip'})
+        self.assertEqual(self.generate(), {'created': 1, 'total': 1, 'skipped': 7})
+        self.assertEqual(Ticket.objects.count(), 8)
+
+    def test_unknown_tier(self):
+        """Test that rows with unknown price tiers are rejected."""
+        self.data['seat_map'][0]['tier'] = 'balcony'
+        response = self.client.post(URL, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_regular_user(self):
+        """Test that regular users can not generate tickets."""
+        self.client.force_authenticate(user=User.objects.create(username='abc', password='abc'))
+        response = self.client.post(URL, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command(self):
+        """Test generating the tickets with the management command."""
+        self.data['seat_map'] = [
+            {'row': str(row), 'seats': ROW_SEATS, 'tier': 'vip'} for row in range(HALL_ROWS)
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as seat_map_file:
+            json.dump(self.data, seat_map_file)
+            seat_map_file.flush()
+            call_command(
+                'generate_tickets', str(self.t_p.id), seat_map_file.name, stdout=StringIO(),
+            )
+            with self.assertRaises(CommandError):
+                call_command('generate_tickets', 'abc', seat_map_file.name, stdout=StringIO())
+        self.assertEqual(Ticket.objects.count(), HALL_ROWS * ROW_SEATS)
@@ -1,12 +1,16 @@
 """Module of testing views."""
 
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from theaters_app.models import Client, Performance, Theater, Ticket
+from theaters_app.models import Client, Performance, Theater, TheaterPerformance, Ticket
+
+MANY_TICKETS = 30
 
 
 def create_test_with_auth(url, page_name, template, auth=True):
@@ -148,3 +152,165 @@ instances_pages = (
     ),
     ('/ticket/', Ticket),
 )
+
+
+class TestPerformanceQueries(TestCase):
+    """Test that the performance page runs a fixed number of queries."""
+
+    def setUp(self):
+        """Set up a performance shown in several theaters and a logged in user."""
+        self.client = APIClient()
+        self.user = User.objects.create(username='user', password='user')
+        self.buyer = Client.objects.create(user=self.user)
+        self.client.force_login(self.user)
+        self.performance = Performance.objects.create(
+            title='Название', description='Описание', date='2040-02-23',
+        )
+        self.theater_performances = [
+            TheaterPerformance.objects.create(
+                theater=Theater.objects.create(title=f'Театр {num}', address='Анархии 12'),
+                performance=self.performance,
+            )
+            for num in range(3)
+        ]
+        self.url = reverse('performance', args=(self.performance.id,))
+
+    def create_tickets(self, count):
+        """
+        Create tickets for every theater showing the performance.
+
+        Args:
+            count (int): Number of tickets per theater.
+        """
+        Ticket.objects.bulk_create(
+            Ticket(price=100, time='11:36:59', place=str(place), theater_performance=t_p)
+            for t_p in self.theater_performances
+            for place in range(count)
+        )
+
+    def count_queries(self):
+        """
+        Request the performance page with the page cache filled and count executed queries.
+
+        Returns:
+            int: Number of executed queries.
+        """
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_fixed_query_count(self):
+        """Test that the number of queries does not depend on the number of tickets."""
+        self.create_tickets(1)
+        few_tickets = self.count_queries()
+        self.create_tickets(MANY_TICKETS)
+        self.assertEqual(self.count_queries(), few_tickets)
+
+    def test_sold_tickets_hidden(self):
+        """Test that only free tickets are listed."""
+        self.create_tickets(2)
+        Ticket.objects.filter(place='0').update(client=self.buyer)
+        response = self.client.get(self.url)
+        places = {ticket.place for ticket in response.context['tickets']}
+        self.assertEqual(places, {'1'})
+
+
+class TestProfileQueries(TestCase):
+    """Test that the profile page runs a fixed number of queries."""
+
+    def setUp(self):
+        """Set up a logged in client owning no tickets yet."""
+        self.client = APIClient()
+        self.user = User.objects.create(username='user', password='user')
+        self.owner = Client.objects.create(user=self.user)
+        self.client.force_login(self.user)
+        self.performance = Performance.objects.create(
+            title='Название', description='Описание', date='2040-02-23',
+        )
+
+    def create_tickets(self, count):
+        """
+        Create tickets of the client, each one in a separate theater.
+
+        Args:
+            count (int): Number of tickets.
+        """
+        for num in range(count):
+            t_p = TheaterPerformance.objects.create(
+                theater=Theater.objects.create(title=f'Театр {num}', address='Анархии 12'),
+                performance=self.performance,
+            )
+            Ticket.objects.create(
+                price=100, time='11:36:59', place=str(num), theater_performance=t_p,
+                client=self.owner,
+            )
+
+    def count_queries(self):
+        """
+        Request the profile page and count executed queries.
+
+        Returns:
+            int: Number of executed queries.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries)
+
+    def test_fixed_query_count(self):
+        """Test that the number of queries does not depend on the number of tickets."""
+        self.create_tickets(1)
+        few_tickets = self.count_queries()
+        self.create_tickets(MANY_TICKETS)
+        self.assertEqual(self.count_queries(), few_tickets)
+
+    def test_ticket_details(self):
+        """Test that the ticket list shows theater and performance of every ticket."""
+        self.create_tickets(2)
+        response = self.client.get(reverse('profile'))
+        self.assertContains(response, 'Театр 1')
+        self.assertContains(response, 'Название', count=2)
+
+
+class TestAsyncViews(TestCase):
+    """Test the asynchronous catalog views through the ASGI handler."""
+
+    def setUp(self):
+        """Set up a theater showing a performance with a free ticket."""
+        self.user = User.objects.create(username='user', password='user')
+        Client.objects.create(user=self.user)
+        self.theater = Theater.objects.create(title='Театр', address='Анархии 12')
+        self.performance = Performance.objects.create(
+            title='Спектакль', description='Описание', date='2040-02-23',
+        )
+        t_p = TheaterPerformance.objects.create(theater=self.theater, performance=self.performance)
+        Ticket.objects.create(price=100, time='19:00', place='A-1', theater_performance=t_p)
+        self.urls = (
+            reverse('theaters'),
+            reverse('performances'),
+            reverse('theater', args=(self.theater.id,)),
+            reverse('performance', args=(self.performance.id,)),
+        )
+
+    async def test_pages(self):
+        """Test that the catalog pages are rendered without synchronous queries."""
+        await self.async_client.aforce_login(self.user)
+        for url in self.urls:
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertContains(response, 'user')
+        response = await self.async_client.get(reverse('theater', args=(self.theater.id,)))
+        self.assertContains(response, 'Спектакль')
+        response = await self.async_client.get(reverse('homepage'))
+        self.assertEqual(response.context['theaters'], 1)
+
+    async def test_login_required(self):
+        """Test that anonymous users are redirected to the login page."""
+        login_url = reverse('login')
+        for url in self.urls:
+            response = await self.async_client.get(url)
+            self.assertRedirects(
+                response, f'{login_url}?next={url}', fetch_redirect_response=False,
+            )
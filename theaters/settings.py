@@ -32,24 +32,30 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'theaters_app.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly',
-    ]
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'theaters_app.pagination.KeysetAPIPagination',
+    'PAGE_SIZE': int(getenv('API_PAGE_SIZE', '50')),
 }
 
 MIDDLEWARE = [
+    'theaters_app.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'theaters_app.middleware.ReplicaRoutingMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'theaters_app.middleware.ClientMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -78,6 +84,12 @@ WSGI_APPLICATION = 'theaters.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# Connections to Postgres: seconds a connection is kept between requests (0 closes it
+# after every request, 'none' never does) and whether it is checked before reuse.
+CONN_MAX_AGE_ENV = getenv('PG_CONN_MAX_AGE', '0')
+CONN_MAX_AGE = None if CONN_MAX_AGE_ENV.lower() == 'none' else int(CONN_MAX_AGE_ENV)
+CONN_HEALTH_CHECKS = getenv('PG_CONN_HEALTH_CHECKS', '1') == '1'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -87,12 +99,33 @@ DATABASES = {
         'HOST': getenv('PG_HOST'),
         'PORT': getenv('PG_PORT'),
         'OPTIONS': {'options': '-c search_path=public,api_data'},
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': CONN_HEALTH_CHECKS,
         'TEST': {
             'NAME': 'test_db',
         },
     }
 }
 
+# Read replicas: comma separated host[:port] of the Postgres replicas, which have the
+# same database and credentials as the primary and get the replica1, replica2...
+# aliases. The reads go to them except for the writing requests and for
+# REPLICA_STICKY_SECONDS after a write of the session, see theaters_app.routers.
+# Pointing a replica at the primary itself is enough to try the routing locally.
+DATABASE_REPLICAS = []
+for replica_num, replica in enumerate(filter(None, getenv('PG_REPLICA_HOSTS', '').split(',')), 1):
+    replica_host, _, replica_port = replica.strip().partition(':')
+    DATABASE_REPLICAS.append(f'replica{replica_num}')
+    DATABASES[DATABASE_REPLICAS[-1]] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['theaters_app.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(getenv('REPLICA_STICKY_SECONDS', '5'))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -137,3 +170,64 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 TEST_RUNNER = 'tests.runner.PostgresSchemaRunner'
 
 LOGOUT_REDIRECT_URL = '/'
+
+# Cache backend: 'locmem' keeps the cache in the memory of every process, 'file' shares
+# it between the processes through the CACHE_LOCATION directory
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+CACHE_BACKEND = getenv('CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': getenv(
+            'CACHE_LOCATION', str(BASE_DIR / '.cache') if CACHE_BACKEND == 'file' else '',
+        ),
+    },
+}
+
+# Row lock mode used when buying a ticket: 'nowait' or 'skip_locked'
+TICKET_LOCK_MODE = getenv('TICKET_LOCK_MODE', 'nowait')
+
+# Minutes a client holds a ticket before buying it, see theaters_app.holds
+SEAT_HOLD_MINUTES = int(getenv('SEAT_HOLD_MINUTES', '10'))
+# Maximum number of the tickets a client holds at once
+SEAT_HOLD_MAX_PER_CLIENT = int(getenv('SEAT_HOLD_MAX_PER_CLIENT', '10'))
+
+# Homepage counters: cache lifetime in seconds and the number of rows from which
+# pg_class.reltuples estimates replace COUNT(*) (0 disables estimates)
+COUNTERS_TTL = int(getenv('COUNTERS_TTL', '300'))
+COUNTERS_ESTIMATE_THRESHOLD = int(getenv('COUNTERS_ESTIMATE_THRESHOLD', '0'))
+
+# Lifetime in seconds of the cached API tokens with their users (0 disables the cache)
+AUTH_TOKEN_CACHE_TTL = int(getenv('AUTH_TOKEN_CACHE_TTL', '60'))
+
+# Lifetime in seconds of the cached seat availability bitmaps of the shows
+AVAILABILITY_TTL = int(getenv('AVAILABILITY_TTL', '30'))
+
+# Lifetime in seconds of the cached theater and performance pages and their fragments
+PAGE_CACHE_TTL = int(getenv('PAGE_CACHE_TTL', '300'))
+
+# Query instrumentation: share of requests logged (0 disables it), duration in ms from
+# which requests are logged as slow, and whether to send the Server-Timing header
+QUERY_LOG_SAMPLE_RATE = float(getenv('QUERY_LOG_SAMPLE_RATE', '0'))
+SLOW_REQUEST_MS = float(getenv('SLOW_REQUEST_MS', '500'))
+SERVER_TIMING_HEADER = getenv('SERVER_TIMING_HEADER', '') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'theaters_app.queries': {
+            'handlers': ['console'],
+            'level': getenv('QUERY_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
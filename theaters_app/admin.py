@@ -1,7 +1,16 @@
 """Admin Panel."""
 from django.contrib import admin
 
-from .models import Client, Performance, Theater, TheaterPerformance, Ticket
+from .models import (
+    ArchivedPerformance,
+    ArchivedTicket,
+    Client,
+    Performance,
+    SeatHold,
+    Theater,
+    TheaterPerformance,
+    Ticket,
+)
 
 
 class TheaterPerformanceInline(admin.TabularInline):
@@ -46,3 +55,24 @@ class TheaterPerformanceAdmin(admin.ModelAdmin):
     """Admin configuration for TheaterPerformance model."""
 
     model = TheaterPerformance
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    """Admin configuration for SeatHold model."""
+
+    model = SeatHold
+
+
+@admin.register(ArchivedPerformance)
+class ArchivedPerformanceAdmin(admin.ModelAdmin):
+    """Admin configuration for ArchivedPerformance model."""
+
+    model = ArchivedPerformance
+
+
+@admin.register(ArchivedTicket)
+class ArchivedTicketAdmin(admin.ModelAdmin):
+    """Admin configuration for ArchivedTicket model."""
+
+    model = ArchivedTicket
@@ -8,3 +8,7 @@ class TheatersAppConfig(AppConfig):
 
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'theaters_app'
+
+    def ready(self):
+        """Connect signal receivers of the application."""
+        from . import signals  # noqa: F401, WPS433
@@ -0,0 +1,156 @@
+"""Moving finished performances and their sold tickets to the archive tables."""
+
+from datetime import date
+from types import MappingProxyType
+from typing import Iterator
+from uuid import UUID
+
+from django.db import connection, transaction
+
+from . import conditional, counters
+from .models import (
+    ArchivedPerformance,
+    ArchivedTicket,
+    Performance,
+    SeatHold,
+    Theater,
+    TheaterPerformance,
+    Ticket,
+    get_datetime,
+)
+
+DEFAULT_BATCH_SIZE = 100
+
+# tables in the SQL statements by their placeholder names
+TABLES = MappingProxyType({
+    'archived_performance': ArchivedPerformance,
+    'archived_ticket': ArchivedTicket,
+    'performance': Performance,
+    'seat_hold': SeatHold,
+    'theater': Theater,
+    'theater_performance': TheaterPerformance,
+    'ticket': Ticket,
+})
+ARCHIVE_PERFORMANCES = """
+    INSERT INTO {archived_performance} (id, title, description, date, created, modified, archived)
+    SELECT id, title, description, date, created, modified, %s
+    FROM {performance} WHERE id = ANY(%s)
+"""
+DELETE_HOLDS = """
+    DELETE FROM {seat_hold} WHERE ticket_id IN (
+        SELECT ticket.id FROM {ticket} AS ticket
+        JOIN {theater_performance} AS tp ON tp.id = ticket.theater_performance_id
+        WHERE tp.performance_id = ANY(%s)
+    )
+"""
+# the deleted rows are returned after waiting for the row locks of the buyers, so
+# a purchase committed in the meantime is archived with its client, not lost
+MOVE_TICKETS = """
+    WITH moved AS (
+        DELETE FROM {ticket} WHERE theater_performance_id IN (
+            SELECT id FROM {theater_performance} WHERE performance_id = ANY(%s)
+        )
+        RETURNING *
+    )
+    INSERT INTO {archived_ticket} (
+        id, performance_id, theater_id, theater_title, price, time, place, client_id,
+        created, modified
+    )
+    SELECT
+        moved.id, tp.performance_id, tp.theater_id, theater.title, moved.price,
+        moved.time, moved.place, moved.client_id, moved.created, moved.modified
+    FROM moved
+    JOIN {theater_performance} AS tp ON tp.id = moved.theater_performance_id
+    JOIN {theater} AS theater ON theater.id = tp.theater_id
+    WHERE moved.client_id IS NOT NULL
+"""
+# the rows of the performances are deleted from the referencing tables first
+DELETE_PERFORMANCES = (
+    'DELETE FROM {theater_performance} WHERE performance_id = ANY(%s)',
+    'DELETE FROM {performance} WHERE id = ANY(%s)',
+)
+
+
+def table(model) -> str:
+    """
+    Get the quoted table name of the model.
+
+    Args:
+        model (type): Model class.
+
+    Returns:
+        str: Table name usable in SQL.
+    """
+    return model._meta.db_table
+
+
+def archive_batch(performance_ids: list[UUID]) -> tuple[int, int]:
+    """
+    Move the performances and their sold tickets to the archive in the current transaction.
+
+    The rows are copied and deleted with set-based statements, so neither the tickets
+    nor the shows are loaded into memory. The tickets are deleted and copied by one
+    statement, so no sale slips between the copy and the delete. Unsold tickets are
+    dropped.
+
+    Args:
+        performance_ids (list[UUID]): IDs of the performances.
+
+    Returns:
+        tuple[int, int]: Number of archived performances and tickets.
+    """
+    tables = {name: table(model) for name, model in TABLES.items()}
+    # the theater pages lose the performances, so their modified times move forward
+    theater_ids = TheaterPerformance.objects.filter(
+        performance_id__in=performance_ids,
+    ).values_list('theater_id', flat=True)
+    conditional.touch_shows(theater_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            ARCHIVE_PERFORMANCES.format(**tables), [get_datetime(), performance_ids],
+        )
+        performances = cursor.rowcount
+        cursor.execute(DELETE_HOLDS.format(**tables), [performance_ids])
+        cursor.execute(MOVE_TICKETS.format(**tables), [performance_ids])
+        tickets = cursor.rowcount
+        for statement in DELETE_PERFORMANCES:
+            cursor.execute(statement.format(**tables), [performance_ids])
+    return performances, tickets
+
+
+def archive_finished(
+    before: date | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[dict[str, int]]:
+    """
+    Archive the performances which took place before the date, batch by batch.
+
+    Every batch is a separate transaction, so the locks on the hot tables are short.
+    A date after today is clamped to today, the upcoming shows are never archived.
+
+    Args:
+        before (date | None): Performances before this date are archived, today by default.
+        batch_size (int): Number of performances archived in one transaction.
+
+    Yields:
+        dict[str, int]: Total number of archived 'performances' and 'tickets' so far.
+    """
+    today = get_datetime().date()
+    before = min(before or today, today)
+    progress = {'performances': 0, 'tickets': 0}
+    while True:
+        with transaction.atomic():
+            finished = Performance.objects.filter(date__lt=before).select_for_update(
+                skip_locked=True,
+            )
+            performance_ids = list(
+                finished.order_by('date', 'id').values_list('id', flat=True)[:batch_size],
+            )
+            if not performance_ids:
+                break
+            performances, tickets = archive_batch(performance_ids)
+            progress['performances'] += performances
+            progress['tickets'] += tickets
+            counters.invalidate(Performance)
+            counters.invalidate(Ticket)
+        yield dict(progress)
@@ -0,0 +1,109 @@
+"""Token authentication of the API with the tokens and their users cached for a short time."""
+
+from hashlib import sha256
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+
+KEY_PREFIX = 'auth-token'
+STATS_KEYS = MappingProxyType({
+    'hits': f'{KEY_PREFIX}-stats:hits',
+    'misses': f'{KEY_PREFIX}-stats:misses',
+})
+
+
+def cache_key(key: str) -> str:
+    """
+    Build the cache key of the token, the token itself is not stored in the key.
+
+    Args:
+        key (str): The token.
+
+    Returns:
+        str: Cache key.
+    """
+    digest = sha256(key.encode()).hexdigest()
+    return f'{KEY_PREFIX}:{digest}'
+
+
+def count(name: str) -> None:
+    """
+    Increment the hit or miss counter.
+
+    Args:
+        name (str): Either 'hits' or 'misses'.
+    """
+    key = STATS_KEYS[name]
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # evicted between add() and incr(), losing one count is fine
+        return
+
+
+def stats() -> dict:
+    """
+    Get the counters of the token cache.
+
+    Returns:
+        dict: Numbers of hits and misses and the share of hits.
+    """
+    counters = cache.get_many(STATS_KEYS.values())
+    hits, misses = (counters.get(key, 0) for key in STATS_KEYS.values())
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0}
+
+
+def reset_stats() -> None:
+    """Reset the counters of the token cache."""
+    cache.delete_many(STATS_KEYS.values())
+
+
+def invalidate(*keys: str) -> None:
+    """
+    Drop the cached tokens after the current transaction is committed.
+
+    Args:
+        keys (str): The tokens.
+    """
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many([cache_key(key) for key in keys]))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication keeping the token with its user in the cache.
+
+    Polling clients are authenticated without the token and user query for
+    AUTH_TOKEN_CACHE_TTL seconds, 0 disables the cache. The signal receivers drop
+    the cached token when it is deleted or its user is changed.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Get the user and the token from the cache or the database.
+
+        Unknown tokens and inactive users fail like in TokenAuthentication, so the
+        inactive users are not cached.
+
+        Args:
+            key (str): The token.
+
+        Returns:
+            tuple[User, Token]: The user and the token.
+        """
+        ttl = settings.AUTH_TOKEN_CACHE_TTL
+        if not ttl:
+            return super().authenticate_credentials(key)
+        token = cache.get(cache_key(key))
+        if token is None:
+            count('misses')
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key(key), token, ttl)
+            return user, token
+        count('hits')
+        return token.user, token
@@ -0,0 +1,165 @@
+"""Cached seat availability bitmaps of the shows."""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import TheaterPerformance, Ticket, get_datetime
+
+KEY_PREFIX = 'availability'
+
+
+def cache_key(theater_performance_id) -> str:
+    """
+    Build the cache key of the show availability.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+
+    Returns:
+        str: Cache key.
+    """
+    return f'{KEY_PREFIX}:{theater_performance_id}'
+
+
+def build(theater_performance_id) -> dict | None:
+    """
+    Build the availability of the show from the database.
+
+    Seats are ordered by place and ticket id. Seat i is free when bit i % 8
+    of byte i // 8 of the bitmap is set, sold and held seats are not free.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+
+    Returns:
+        dict | None: Places, ticket ids and the 'free' bitmap of the seats, None if the
+            show does not exist.
+    """
+    now = get_datetime()
+    seats = sorted(
+        (place, str(ticket_id), client_id is None and (expires is None or expires <= now))
+        for place, ticket_id, client_id, expires in Ticket.objects.filter(
+            theater_performance_id=theater_performance_id,
+        ).values_list('place', 'id', 'client_id', 'hold__expires').order_by()
+    )
+    if not seats and not TheaterPerformance.objects.filter(id=theater_performance_id).exists():
+        return None
+    free = bytearray((len(seats) + 7) // 8)
+    for index, (_, _, is_free) in enumerate(seats):
+        if is_free:
+            free[index >> 3] |= 1 << (index & 7)
+    return {
+        'places': [place for place, _, _ in seats],
+        'tickets': [ticket_id for _, ticket_id, _ in seats],
+        'free': bytes(free),
+    }
+
+
+def get(theater_performance_id) -> dict | None:
+    """
+    Get the availability of the show, building it on a cache miss.
+
+    Missing shows are not cached, so unknown IDs do not fill the cache.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+
+    Returns:
+        dict | None: Availability, see build(), None if the show does not exist.
+    """
+    key = cache_key(theater_performance_id)
+    availability = cache.get(key)
+    if availability is None:
+        availability = build(theater_performance_id)
+        if availability is not None:
+            cache.set(key, availability, settings.AVAILABILITY_TTL)
+    return availability
+
+
+def mark(theater_performance_id, ticket_ids, free: bool) -> None:
+    """
+    Set or clear the bits of the tickets in the cached availability.
+
+    Concurrent updates of the same show may overwrite each other; the short TTL bounds
+    how long such a seat is shown wrongly, and buying it fails safely in the database.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        ticket_ids (Iterable[UUID]): IDs of the tickets.
+        free (bool): True sets the bits of the seats, False clears them.
+    """
+    key = cache_key(theater_performance_id)
+    availability = cache.get(key)
+    if availability is None:
+        return
+    seats = bytearray(availability['free'])
+    for ticket_id in ticket_ids:
+        try:
+            index = availability['tickets'].index(str(ticket_id))
+        except ValueError:
+            cache.delete(key)
+            return
+        if free:
+            seats[index >> 3] |= 1 << (index & 7)
+        else:
+            seats[index >> 3] &= ~(1 << (index & 7))
+    availability['free'] = bytes(seats)
+    cache.set(key, availability, settings.AVAILABILITY_TTL)
+
+
+def mark_sold(theater_performance_id, *ticket_ids) -> None:
+    """
+    Clear the bits of the sold or held tickets in the cached availability.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        ticket_ids (UUID): IDs of the tickets.
+    """
+    mark(theater_performance_id, ticket_ids, free=False)
+
+
+def mark_free(theater_performance_id, *ticket_ids) -> None:
+    """
+    Set the bits of the released tickets in the cached availability.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        ticket_ids (UUID): IDs of the tickets.
+    """
+    mark(theater_performance_id, ticket_ids, free=True)
+
+
+def on_sold(theater_performance_id, *ticket_ids) -> None:
+    """
+    Mark the tickets as sold after the current transaction is committed.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        ticket_ids (UUID): IDs of the sold or held tickets.
+    """
+    if theater_performance_id is not None:
+        transaction.on_commit(lambda: mark_sold(theater_performance_id, *ticket_ids))
+
+
+def on_freed(theater_performance_id, *ticket_ids) -> None:
+    """
+    Mark the tickets as free after the current transaction is committed.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        ticket_ids (UUID): IDs of the released tickets.
+    """
+    if theater_performance_id is not None:
+        transaction.on_commit(lambda: mark_free(theater_performance_id, *ticket_ids))
+
+
+def invalidate(theater_performance_id) -> None:
+    """
+    Drop the cached availability of the show after the current transaction is committed.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+    """
+    if theater_performance_id is not None:
+        transaction.on_commit(lambda: cache.delete(cache_key(theater_performance_id)))
@@ -0,0 +1,187 @@
+"""Validators of the conditional GET requests computed from the modified timestamps."""
+
+from datetime import datetime
+from hashlib import sha256
+from typing import Iterable
+from uuid import UUID
+
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Performance, Theater, TheaterPerformance, Ticket, get_datetime
+
+SAFE_METHODS = ('GET', 'HEAD')
+VALIDATED_STATUSES = (200, 304)
+
+
+def touch(model, *ids) -> None:
+    """
+    Bump the modified time of the records, for changes which do not save them.
+
+    Args:
+        model (type): Model class with the modified field.
+        ids (UUID): IDs of the records.
+    """
+    if ids:
+        model.objects.filter(id__in=ids).update(modified=get_datetime())
+
+
+def touch_shows(
+    theater_ids: Iterable[UUID] = (),
+    performance_ids: Iterable[UUID] = (),
+) -> None:
+    """
+    Bump the modified time of the theaters and performances whose shows are changed.
+
+    Args:
+        theater_ids (Iterable[UUID]): IDs of the theaters.
+        performance_ids (Iterable[UUID]): IDs of the performances.
+    """
+    touch(Theater, *theater_ids)
+    touch(Performance, *performance_ids)
+
+
+def make_etag(*parts) -> str:
+    """
+    Hash the parts of the state of a resource into a strong ETag.
+
+    Args:
+        parts: Values the representation depends on.
+
+    Returns:
+        str: Quoted ETag.
+    """
+    state = '|'.join(map(str, parts))
+    return quote_etag(sha256(state.encode()).hexdigest())
+
+
+def latest(*timestamps: datetime | None) -> datetime | None:
+    """
+    Get the latest of the timestamps.
+
+    Args:
+        timestamps (datetime | None): Timestamps, missing ones are skipped.
+
+    Returns:
+        datetime | None: The latest timestamp or None if there are none.
+    """
+    return max(filter(None, timestamps), default=None)
+
+
+def page_state(records: Iterable, *parts) -> tuple[str, datetime | None]:
+    """
+    Compute the validators of a page of records from their IDs and modified times.
+
+    Args:
+        records (Iterable): Records of the page.
+        parts: Other values the representation depends on.
+
+    Returns:
+        tuple[str, datetime | None]: ETag and the last modified time of the page.
+    """
+    rows = [(record.pk, record.modified) for record in records]
+    return make_etag(*parts, *rows), latest(*(modified for _, modified in rows))
+
+
+async def atheater_state(request, theater_id) -> tuple[str | None, datetime | None]:
+    """
+    Compute the validators of the theater page with one query.
+
+    The page shows the theater and the titles of its performances. The last modified
+    time is kept in request.page_version, the cached page is keyed on it.
+
+    Args:
+        request: Request object with the loaded user.
+        theater_id (UUID): Theater ID.
+
+    Returns:
+        tuple[str | None, datetime | None]: ETag and the last modified time,
+            None if the theater does not exist.
+    """
+    rows = Theater.objects.filter(id=theater_id).values_list(
+        'modified', 'performances__id', 'performances__modified',
+    ).order_by('performances__id')
+    rows = [row async for row in rows]
+    request.page_version = None
+    if not rows:
+        return None, None
+    modified = latest(rows[0][0], *(row[2] for row in rows))
+    request.page_version = modified
+    return make_etag(request.user.pk, *rows), modified
+
+
+async def aperformance_state(request, performance_id) -> tuple[str | None, datetime | None]:
+    """
+    Compute the validators of the performance page.
+
+    The page shows the performance, the ticket statistics of its shows with the theaters
+    and a page of the free tickets, which change with the modified time of the tickets.
+    The modified time of the performance is kept in request.page_version, the cached
+    part of the page is keyed on it.
+
+    Args:
+        request: Request object with the loaded user.
+        performance_id (UUID): Performance ID.
+
+    Returns:
+        tuple[str | None, datetime | None]: ETag and the last modified time,
+            None if the performance does not exist.
+    """
+    performance = await Performance.objects.filter(id=performance_id).values_list(
+        'id', 'modified',
+    ).afirst()
+    request.page_version = None
+    if performance is None:
+        return None, None
+    request.page_version = performance[1]
+    # the last ticket change of every show is one backward step of ticket_show_modified_idx
+    tickets_modified = Ticket.objects.filter(
+        theater_performance=OuterRef('pk'),
+    ).order_by('-modified').values('modified')[:1]
+    shows = TheaterPerformance.objects.filter(performance_id=performance_id).annotate(
+        tickets_modified=Subquery(tickets_modified),
+    ).values_list(
+        'id', 'tickets_total', 'tickets_sold', 'min_price', 'max_price',
+        'tickets_modified', 'theater__modified',
+    ).order_by('id')
+    shows = [show async for show in shows]
+    modified = latest(performance[1], *(time for show in shows for time in show[-2:]))
+    return make_etag(request.user.pk, *performance, *shows), modified
+
+
+def not_modified(request, etag: str | None, last_modified: datetime | None):
+    """
+    Answer the conditional request without rendering when the client copy is fresh.
+
+    Args:
+        request: Request object.
+        etag (str | None): Current ETag of the resource.
+        last_modified (datetime | None): Current last modified time of the resource.
+
+    Returns:
+        HttpResponse | None: 304 or 412 response, None if the view has to respond.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def add_validators(request, response, etag: str | None, last_modified: datetime | None):
+    """
+    Add the ETag and Last-Modified headers to the successful response of a safe request.
+
+    Args:
+        request: Request object.
+        response (HttpResponse): The response.
+        etag (str | None): Current ETag of the resource.
+        last_modified (datetime | None): Current last modified time of the resource.
+
+    Returns:
+        HttpResponse: The response.
+    """
+    if request.method in SAFE_METHODS and response.status_code in VALIDATED_STATUSES:
+        if etag:
+            response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+    return response
@@ -2,3 +2,10 @@
 
 MONEY_MAX_DIGITS = 9
 MONEY_DECIMAL_PLACES = 2
+
+TICKETS_PAGE_SIZE = 20
+
+SEARCH_RESULTS_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+BASKET_MAX_TICKETS = 20
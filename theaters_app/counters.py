@@ -0,0 +1,163 @@
+"""Cached record counters shown on the homepage."""
+
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+KEY_PREFIX = 'counters'
+
+
+def cache_key(model) -> str:
+    """
+    Build the cache key of the model counter.
+
+    Args:
+        model (type): Model class.
+
+    Returns:
+        str: Cache key.
+    """
+    label = model._meta.label_lower
+    return f'{KEY_PREFIX}:{label}'
+
+
+def estimate(model) -> int:
+    """
+    Estimate the number of rows in the model table from the planner statistics.
+
+    Args:
+        model (type): Model class.
+
+    Returns:
+        int: Estimated number of rows, 0 if the table was never analyzed.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return max(row[0], 0) if row else 0
+
+
+def count_rows(model) -> int:
+    """
+    Count rows of the model table, using an estimate for very large tables.
+
+    Args:
+        model (type): Model class.
+
+    Returns:
+        int: Number of rows.
+    """
+    threshold = settings.COUNTERS_ESTIMATE_THRESHOLD
+    if threshold:
+        estimated = estimate(model)
+        if estimated >= threshold:
+            return estimated
+    return model.objects.count()
+
+
+def counts(*models) -> list[int]:
+    """
+    Get the counters of the models from the cache, counting the missing ones.
+
+    Args:
+        models (type): Model classes.
+
+    Returns:
+        list[int]: Number of rows of every model in the same order.
+    """
+    keys = [cache_key(model) for model in models]
+    cached = cache.get_many(keys)
+    missing = {
+        key: count_rows(model)
+        for key, model in zip(keys, models)
+        if key not in cached
+    }
+    if missing:
+        cache.set_many(missing, settings.COUNTERS_TTL)
+    cached.update(missing)
+    return [cached[key] for key in keys]
+
+
+async def acount_rows(model) -> int:
+    """
+    Count rows of the model table with the async ORM, see count_rows().
+
+    Args:
+        model (type): Model class.
+
+    Returns:
+        int: Number of rows.
+    """
+    threshold = settings.COUNTERS_ESTIMATE_THRESHOLD
+    if threshold:
+        estimated = await sync_to_async(estimate)(model)
+        if estimated >= threshold:
+            return estimated
+    return await model.objects.acount()
+
+
+async def acounts(*models) -> list[int]:
+    """
+    Get the counters of the models for the async views, see counts().
+
+    Args:
+        models (type): Model classes.
+
+    Returns:
+        list[int]: Number of rows of every model in the same order.
+    """
+    keys = [cache_key(model) for model in models]
+    cached = await cache.aget_many(keys)
+    missing = {
+        key: await acount_rows(model)
+        for key, model in zip(keys, models)
+        if key not in cached
+    }
+    if missing:
+        await cache.aset_many(missing, settings.COUNTERS_TTL)
+    cached.update(missing)
+    return [cached[key] for key in keys]
+
+
+def increment(model, delta: int = 1) -> None:
+    """
+    Change the cached counter of the model after the current transaction is committed.
+
+    Args:
+        model (type): Model class.
+        delta (int): Value added to the counter.
+    """
+    transaction.on_commit(partial(add, cache_key(model), delta))
+
+
+def add(key: str, delta: int) -> None:
+    """
+    Add the value to the cached counter.
+
+    Args:
+        key (str): Cache key of the counter.
+        delta (int): Value added to the counter.
+    """
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # the counter is not cached, it will be counted on the next request
+        return
+
+
+def invalidate(model) -> None:
+    """
+    Drop the cached counter of the model after the current transaction is committed.
+
+    Used by bulk operations, which do not send model signals.
+
+    Args:
+        model (type): Model class.
+    """
+    transaction.on_commit(lambda: cache.delete(cache_key(model)))
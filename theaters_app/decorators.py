@@ -0,0 +1,76 @@
+"""Decorators of the asynchronous views."""
+
+from functools import wraps
+
+from django.contrib.auth.views import redirect_to_login
+
+from . import conditional
+
+
+def aload_user(view_func):
+    """
+    Load the user of the request with the async ORM before calling the async view.
+
+    The lazy request.user would query the database synchronously when the template
+    is rendered, which is not allowed inside the event loop.
+
+    Args:
+        view_func (Callable): Async view function.
+
+    Returns:
+        Callable: Decorated async view function.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+def alogin_required(view_func):
+    """
+    Redirect anonymous users to the login page, async counterpart of login_required.
+
+    Args:
+        view_func (Callable): Async view function.
+
+    Returns:
+        Callable: Decorated async view function.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+
+    return wrapper
+
+
+def acondition(state_func):
+    """
+    Answer conditional requests to the async view, async counterpart of condition.
+
+    condition() of Django 5.0 calls the validator functions synchronously, so they
+    can not use the async ORM. The validators are computed by one awaited function.
+
+    Args:
+        state_func (Callable): Async function called with the view arguments, which
+            returns the ETag and the last modified time of the resource.
+
+    Returns:
+        Callable: Decorator of async view functions.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            etag, last_modified = await state_func(request, *args, **kwargs)
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            return conditional.add_validators(request, response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,222 @@
+"""Streaming export of the tickets and sales in the CSV and NDJSON formats."""
+
+import csv
+import json
+from datetime import date
+from itertools import islice
+from types import MappingProxyType
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from .models import Ticket
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_CHUNK_SIZE = 100000
+COLUMNS = MappingProxyType({
+    'id': 'id',
+    'place': 'place',
+    'time': 'time',
+    'price': 'price',
+    'theater_id': 'theater_performance__theater_id',
+    'theater': 'theater_performance__theater__title',
+    'performance_id': 'theater_performance__performance_id',
+    'performance': 'theater_performance__performance__title',
+    'date': 'theater_performance__performance__date',
+    'client_id': 'client_id',
+    'username': 'client__user__username',
+    'modified': 'modified',
+})
+ORDERING = ('theater_performance__performance__date', 'theater_performance', 'place', 'id')
+
+
+def tickets(
+    start: date | None = None,
+    end: date | None = None,
+    theater=None,
+    sold: bool = False,
+) -> QuerySet:
+    """
+    Get the rows of the exported tickets joined to their show, client and user.
+
+    Args:
+        start (date | None): First performance date of the range, unbounded by default.
+        end (date | None): Last performance date of the range, unbounded by default.
+        theater (Theater | UUID | None): Only the tickets of the theater.
+        sold (bool): Only the sold tickets.
+
+    Returns:
+        QuerySet: Tuples of the COLUMNS values.
+    """
+    rows = Ticket.objects.all()
+    if start is not None:
+        rows = rows.filter(theater_performance__performance__date__gte=start)
+    if end is not None:
+        rows = rows.filter(theater_performance__performance__date__lte=end)
+    if theater is not None:
+        rows = rows.filter(theater_performance__theater=theater)
+    if sold:
+        rows = rows.filter(client__isnull=False)
+    return rows.values_list(*COLUMNS.values()).order_by(*ORDERING)
+
+
+def stream(rows: QuerySet, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[tuple]:
+    """
+    Fetch the rows through a server-side cursor, chunk by chunk.
+
+    Only one chunk is held in memory, however many rows are exported.
+
+    Args:
+        rows (QuerySet): Rows from tickets().
+        chunk_size (int): Number of rows fetched at once.
+
+    Returns:
+        Iterator[tuple]: The rows.
+    """
+    return rows.iterator(chunk_size=chunk_size)
+
+
+async def astream(rows: QuerySet, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[tuple]:
+    """
+    Fetch the rows of stream() chunk by chunk with sync_to_async(), not blocking the event loop.
+
+    QuerySet.aiterator() of Django 5.0 runs the query of values_list() in the event loop,
+    so the chunks of the server-side cursor are fetched in the thread of the ORM here.
+
+    Args:
+        rows (QuerySet): Rows from tickets().
+        chunk_size (int): Number of rows fetched at once.
+
+    Yields:
+        tuple: The rows.
+    """
+    iterator = stream(rows, chunk_size)
+    fetch = sync_to_async(lambda: list(islice(iterator, chunk_size)))
+    while True:
+        chunk = await fetch()
+        if not chunk:
+            break
+        for row in chunk:
+            yield row
+
+
+class Echo:
+    """File-like object returning the written line, for csv.writer."""
+
+    def write(self, line: str) -> str:
+        """
+        Return the line instead of writing it.
+
+        Args:
+            line (str): CSV line.
+
+        Returns:
+            str: The same line.
+        """
+        return line
+
+
+def csv_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    Format the rows as CSV lines with a header.
+
+    Args:
+        rows (Iterable[tuple]): Rows of the COLUMNS values.
+
+    Yields:
+        str: CSV lines.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    yield from map(writer.writerow, rows)
+
+
+async def acsv_lines(rows: AsyncIterable[tuple]) -> AsyncIterator[str]:
+    """
+    Format the rows fetched by the async ORM as CSV lines with a header.
+
+    Args:
+        rows (AsyncIterable[tuple]): Rows of the COLUMNS values.
+
+    Yields:
+        str: CSV lines.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    async for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_line(row: tuple) -> str:
+    """
+    Format the row as a JSON object on its own line.
+
+    Args:
+        row (tuple): Row of the COLUMNS values.
+
+    Returns:
+        str: JSON line.
+    """
+    line = json.dumps(dict(zip(COLUMNS, row)), cls=DjangoJSONEncoder)
+    return f'{line}\n'
+
+
+def ndjson_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    Format the rows as JSON objects, one per line.
+
+    Args:
+        rows (Iterable[tuple]): Rows of the COLUMNS values.
+
+    Yields:
+        str: JSON lines.
+    """
+    yield from map(ndjson_line, rows)
+
+
+async def andjson_lines(rows: AsyncIterable[tuple]) -> AsyncIterator[str]:
+    """
+    Format the rows fetched by the async ORM as JSON objects, one per line.
+
+    Args:
+        rows (AsyncIterable[tuple]): Rows of the COLUMNS values.
+
+    Yields:
+        str: JSON lines.
+    """
+    async for row in rows:
+        yield ndjson_line(row)
+
+
+# synchronous and asynchronous formatters and the content type of the formats
+FORMATS = MappingProxyType({
+    'csv': (csv_lines, acsv_lines, 'text/csv'),
+    'ndjson': (ndjson_lines, andjson_lines, 'application/x-ndjson'),
+})
+
+
+def export(
+    output: str = 'csv',
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    asynchronous: bool = False,
+    **filters,
+) -> tuple[Iterator[str] | AsyncIterator[str], str]:
+    """
+    Export the tickets lazily, nothing is fetched until the lines are iterated.
+
+    Args:
+        output (str): Name of the format from FORMATS.
+        chunk_size (int): Number of rows fetched at once.
+        asynchronous (bool): Fetch the rows with the async ORM, for the ASGI responses.
+        filters: Arguments of tickets().
+
+    Returns:
+        tuple[Iterator[str] | AsyncIterator[str], str]: Lines of the export and their
+            content type.
+    """
+    format_lines, aformat_lines, content_type = FORMATS[output]
+    if asynchronous:
+        return aformat_lines(astream(tickets(**filters), chunk_size)), content_type
+    return format_lines(stream(tickets(**filters), chunk_size)), content_type
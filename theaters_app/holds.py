@@ -0,0 +1,153 @@
+"""Short-lived holds of the tickets, which reserve a seat for a client before buying it."""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Iterator
+from uuid import UUID
+
+from django.conf import settings
+from django.db import transaction
+
+from . import availability
+from .models import Client, SeatHold, Ticket, get_datetime
+from .purchase import HoldLimitError, SeatHeldError, SeatTakenError, lock_ticket
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def hold_ticket(
+    client_id,
+    ticket_id,
+    minutes: int | None = None,
+    lock_mode: str | None = None,
+) -> SeatHold:
+    """
+    Hold the free ticket for the client, holding it again extends the hold.
+
+    The ticket row is locked like in purchase_ticket(), so a hold and a purchase
+    of the same ticket can not interleave. The client row is locked as well, so the
+    concurrent holds of one client can not exceed settings.SEAT_HOLD_MAX_PER_CLIENT.
+
+    Args:
+        client_id (UUID): ID of the client.
+        ticket_id (UUID): ID of the ticket.
+        minutes (int | None): Length of the hold, defaults to settings.SEAT_HOLD_MINUTES.
+        lock_mode (str | None): Lock mode, defaults to settings.TICKET_LOCK_MODE.
+
+    Returns:
+        SeatHold: The hold.
+
+    Raises:
+        SeatTakenError: If the ticket is sold or locked by another buyer.
+        SeatHeldError: If the ticket is held by another client.
+        HoldLimitError: If the client already holds too many tickets.
+    """
+    minutes = minutes or settings.SEAT_HOLD_MINUTES
+    with transaction.atomic():
+        ticket = lock_ticket(ticket_id, lock_mode or settings.TICKET_LOCK_MODE)
+        if ticket is None or ticket.client_id is not None:
+            raise SeatTakenError
+        now = get_datetime()
+        hold = SeatHold.objects.filter(ticket_id=ticket.id).first() or SeatHold(
+            ticket_id=ticket.id, expires=now,
+        )
+        if hold.client_id != client_id and hold.expires > now:
+            raise SeatHeldError
+        if hold.client_id != client_id and at_limit(client_id, now):
+            raise HoldLimitError
+        hold.client_id = client_id
+        hold.expires = now + timedelta(minutes=minutes)
+        hold.save()
+        availability.on_sold(ticket.theater_performance_id, ticket.id)
+    return hold
+
+
+def at_limit(client_id, now: datetime) -> bool:
+    """
+    Lock the client and check if it may not hold one more ticket.
+
+    Args:
+        client_id (UUID): ID of the client.
+        now (datetime): Current time, expired holds are not counted.
+
+    Returns:
+        bool: True if the client holds settings.SEAT_HOLD_MAX_PER_CLIENT tickets.
+    """
+    list(Client.objects.select_for_update().filter(id=client_id).values_list('id'))
+    active = SeatHold.objects.filter(client_id=client_id, expires__gt=now).count()
+    return active >= settings.SEAT_HOLD_MAX_PER_CLIENT
+
+
+def release(client_id, ticket_id) -> bool:
+    """
+    Release the hold of the client on the ticket.
+
+    Args:
+        client_id (UUID): ID of the client.
+        ticket_id (UUID): ID of the ticket.
+
+    Returns:
+        bool: True if the client held the ticket.
+    """
+    with transaction.atomic():
+        seats = list(
+            SeatHold.objects.filter(ticket_id=ticket_id, client_id=client_id).values_list(
+                'ticket__theater_performance_id', 'ticket__client_id',
+            ),
+        )
+        SeatHold.objects.filter(ticket_id=ticket_id, client_id=client_id).delete()
+        for show, buyer in seats:
+            if buyer is None:
+                availability.on_freed(show, ticket_id)
+    return bool(seats)
+
+
+def free_seats(ticket_ids: list[UUID]) -> None:
+    """
+    Mark the seats of the unsold tickets free after their holds are deleted.
+
+    Args:
+        ticket_ids (list[UUID]): IDs of the tickets whose holds are deleted.
+    """
+    tickets = Ticket.objects.filter(id__in=ticket_ids, client__isnull=True).values_list(
+        'theater_performance_id', 'id',
+    )
+    freed = defaultdict(list)
+    for show, ticket_id in tickets:
+        freed[show].append(ticket_id)
+    for freed_show, freed_ids in freed.items():
+        availability.on_freed(freed_show, *freed_ids)
+
+
+def reap(
+    before: datetime | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[int]:
+    """
+    Delete the expired holds batch by batch.
+
+    Every batch is a separate transaction, the holds locked by a concurrent
+    hold or purchase are skipped and reaped by the next run.
+
+    Args:
+        before (datetime | None): Holds which expire before this time are deleted, now by default.
+        batch_size (int): Number of holds deleted in one transaction.
+
+    Yields:
+        int: Total number of the deleted holds so far.
+    """
+    before = before or get_datetime()
+    reaped = 0
+    while True:
+        with transaction.atomic():
+            # no join here, FOR UPDATE would lock the tickets as well
+            expired = SeatHold.objects.filter(expires__lte=before).select_for_update(
+                skip_locked=True,
+            ).order_by('expires')[:batch_size]
+            holds = list(expired.values_list('id', 'ticket_id'))
+            if not holds:
+                break
+            SeatHold.objects.filter(id__in=[hold_id for hold_id, _ in holds]).delete()
+            free_seats([ticket_id for _, ticket_id in holds])
+        reaped += len(holds)
+        yield reaped
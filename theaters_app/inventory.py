@@ -0,0 +1,153 @@
+"""Denormalized ticket statistics of the shows: number of tickets, sold tickets and prices."""
+
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Min, Q, Value
+from django.db.models.functions import Greatest, Least
+
+from .models import TheaterPerformance, Ticket
+
+STATS_FIELDS = ('tickets_total', 'tickets_sold', 'min_price', 'max_price')
+PRICE_FIELD = DecimalField(max_digits=10, decimal_places=2)
+
+
+def add_tickets(
+    theater_performance_id,
+    count: int,
+    min_price: Decimal,
+    max_price: Decimal,
+    sold: int = 0,
+) -> None:
+    """
+    Count new tickets of the show and widen its price range.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        count (int): Number of new tickets.
+        min_price (Decimal): Lowest price of the new tickets.
+        max_price (Decimal): Highest price of the new tickets.
+        sold (int): Number of the new tickets which already have a client.
+    """
+    if theater_performance_id is None or not count:
+        return
+    # LEAST and GREATEST ignore NULL in PostgreSQL, so the first tickets set the range
+    TheaterPerformance.objects.filter(id=theater_performance_id).update(
+        tickets_total=F('tickets_total') + count,
+        tickets_sold=F('tickets_sold') + sold,
+        min_price=Least(F('min_price'), Value(min_price, output_field=PRICE_FIELD)),
+        max_price=Greatest(F('max_price'), Value(max_price, output_field=PRICE_FIELD)),
+    )
+
+
+def remove_tickets(theater_performance_id, count: int, sold: int = 0) -> None:
+    """
+    Uncount deleted tickets of the show, the price range is fixed by reconcile().
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        count (int): Number of deleted tickets.
+        sold (int): Number of the deleted tickets which had a client.
+    """
+    if theater_performance_id is None:
+        return
+    TheaterPerformance.objects.filter(id=theater_performance_id).update(
+        tickets_total=F('tickets_total') - count,
+        tickets_sold=F('tickets_sold') - sold,
+    )
+
+
+def sell(theater_performance_id, count: int = 1) -> None:
+    """
+    Count sold tickets of the show in the current transaction, atomically with the sale.
+
+    The show row stays locked until the purchase commits, so reconcile() waits for the
+    purchases which have counted their sale and sees their tickets.
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        count (int): Number of sold tickets.
+    """
+    if theater_performance_id is None:
+        return
+    TheaterPerformance.objects.filter(id=theater_performance_id).update(
+        tickets_sold=F('tickets_sold') + count,
+    )
+
+
+def move_ticket(ticket: Ticket, theater_performance_id, sold: bool, price: Decimal) -> None:
+    """
+    Move the changed ticket in the statistics from its previous show, client and price.
+
+    Args:
+        ticket (Ticket): The saved ticket.
+        theater_performance_id (UUID | None): ID of the previous show.
+        sold (bool): True if the ticket had a client before the change.
+        price (Decimal): Price before the change.
+    """
+    now_sold = ticket.client_id is not None
+    current = (ticket.theater_performance_id, now_sold, ticket.price)
+    if current == (theater_performance_id, sold, price):
+        return
+    remove_tickets(theater_performance_id, 1, sold=int(sold))
+    add_tickets(
+        ticket.theater_performance_id, 1, ticket.price, ticket.price, sold=int(now_sold),
+    )
+
+
+def actual_stats() -> dict:
+    """
+    Aggregate the ticket statistics of every show from the tickets table.
+
+    Returns:
+        dict: Statistics by show ID, shows without tickets are missing.
+    """
+    rows = Ticket.objects.filter(theater_performance__isnull=False).values(
+        'theater_performance',
+    ).annotate(
+        tickets_total=Count('id'),
+        tickets_sold=Count('id', filter=Q(client__isnull=False)),
+        min_price=Min('price'),
+        max_price=Max('price'),
+    ).order_by()
+    return {row.pop('theater_performance'): row for row in rows}
+
+
+def reconcile(dry_run: bool = False, batch_size: int = 1000) -> dict[str, int]:
+    """
+    Recompute the ticket statistics of all shows and fix the drifted ones.
+
+    Args:
+        dry_run (bool): Only report the drift without saving the statistics.
+        batch_size (int): Number of shows updated by one query.
+
+    Returns:
+        dict[str, int]: Number of 'checked' and 'drifted' shows and the sum of absolute
+            differences of 'tickets_total' and 'tickets_sold'.
+    """
+    empty = dict.fromkeys(STATS_FIELDS)
+    empty.update(tickets_total=0, tickets_sold=0)
+    report = {'checked': 0, 'drifted': 0, 'tickets_total': 0, 'tickets_sold': 0}
+    drifted = []
+    with transaction.atomic():
+        # the shows are locked before the aggregation: the purchases which have counted
+        # their sale hold the show rows, so they commit first and are aggregated; later
+        # ones count their sale after the recomputed values are saved, see sell()
+        shows = list(
+            TheaterPerformance.objects.select_for_update().only('id', *STATS_FIELDS).order_by(),
+        )
+        stats = actual_stats()
+        for show in shows:
+            report['checked'] += 1
+            actual = stats.get(show.id, empty)
+            if all(getattr(show, field) == actual[field] for field in STATS_FIELDS):
+                continue
+            report['drifted'] += 1
+            for counter in ('tickets_total', 'tickets_sold'):
+                report[counter] += abs(getattr(show, counter) - actual[counter])
+            for field in STATS_FIELDS:
+                setattr(show, field, actual[field])
+            drifted.append(show)
+        if not dry_run:
+            TheaterPerformance.objects.bulk_update(drifted, STATS_FIELDS, batch_size=batch_size)
+    return report
@@ -0,0 +1,59 @@
+"""Command moving finished performances to the archive tables."""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from theaters_app import archive
+from theaters_app.models import get_datetime
+
+
+class Command(BaseCommand):
+    """Archive the performances which took place and their sold tickets."""
+
+    help = 'Move the performances before the date and their sold tickets to the archive.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+
+        Args:
+            parser (ArgumentParser): Argument parser.
+        """
+        parser.add_argument('--before', help='date in the YYYY-MM-DD format')
+        parser.add_argument('--batch-size', type=int, default=archive.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        """
+        Archive the performances and print the progress.
+
+        Args:
+            args: Positional arguments.
+            options: Command options.
+
+        Raises:
+            CommandError: If the date is invalid or after today.
+        """
+        before = options['before']
+        if before is not None:
+            try:
+                before = date.fromisoformat(before)
+            except ValueError as error:
+                raise CommandError(f'invalid date: {error}') from error
+            if before > get_datetime().date():
+                raise CommandError('the date is after today, upcoming shows can not be archived')
+
+        start = time.perf_counter()
+        total = {'performances': 0, 'tickets': 0}
+        for progress in archive.archive_finished(before, options['batch_size']):
+            total = progress
+            self.stdout.write('{performances} performances, {tickets} tickets archived'.format(
+                **total,
+            ))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            '{performances} performances and {tickets} sold tickets archived in {0:.2f}s'.format(
+                elapsed, **total,
+            ),
+        ))
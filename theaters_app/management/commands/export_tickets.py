@@ -0,0 +1,85 @@
+"""Command streaming the tickets and sales to a CSV or NDJSON file."""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from theaters_app import export
+from theaters_app.serializers import TicketExportSerializer
+
+
+def write_lines(lines, stream) -> int:
+    """
+    Write the lines to the stream.
+
+    Args:
+        lines (Iterable[str]): Lines ending with a newline.
+        stream: Writable text stream.
+
+    Returns:
+        int: Number of the written lines.
+    """
+    count = 0
+    for line in lines:
+        stream.write(line)
+        count += 1
+    return count
+
+
+class Command(BaseCommand):
+    """Export the tickets with their shows and clients in constant memory."""
+
+    help = 'Export the tickets joined to their theater, performance and client as CSV or NDJSON.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+
+        Args:
+            parser (ArgumentParser): Argument parser.
+        """
+        parser.add_argument('--output', choices=tuple(export.FORMATS), default='csv')
+        parser.add_argument('--file', help='path of the export file, stdout by default')
+        parser.add_argument('--start', help='first performance date in the YYYY-MM-DD format')
+        parser.add_argument('--end', help='last performance date in the YYYY-MM-DD format')
+        parser.add_argument('--theater', help='ID of the theater')
+        parser.add_argument('--sold', action='store_true', help='only the sold tickets')
+        parser.add_argument('--chunk-size', type=int, default=export.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        """
+        Validate the filters and write the export.
+
+        Args:
+            args: Positional arguments.
+            options: Command options.
+
+        Raises:
+            CommandError: If the filters are invalid or the file can not be written.
+        """
+        filters = {
+            name: options[name]
+            for name in ('output', 'start', 'end', 'theater', 'sold', 'chunk_size')
+            if options[name] is not None
+        }
+        serializer = TicketExportSerializer(data=filters)
+        if not serializer.is_valid():
+            raise CommandError(json.dumps(serializer.errors, ensure_ascii=False))
+        lines, _ = export.export(**serializer.validated_data)
+
+        start = time.perf_counter()
+        count = 0
+        try:
+            if options['file']:
+                with open(options['file'], 'w', encoding='utf-8', newline='') as export_file:
+                    count = write_lines(lines, export_file)
+            else:
+                count = write_lines(lines, self.stdout)
+        except OSError as error:
+            raise CommandError(f'can not write the export: {error}') from error
+        elapsed = time.perf_counter() - start
+        # the summary goes to stderr, stdout may be the export itself
+        self.stderr.write(
+            f'{count} lines exported in {elapsed:.2f}s', style_func=self.style.SUCCESS,
+        )
@@ -0,0 +1,75 @@
+"""Command creating all tickets of a show from a seat map file."""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from theaters_app import seating
+from theaters_app.serializers import TicketsGenerationSerializer
+
+
+class Command(BaseCommand):
+    """Create tickets of a show from a JSON seat map in batches."""
+
+    help = 'Create tickets of a show from a JSON seat map file.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+
+        Args:
+            parser (ArgumentParser): Argument parser.
+        """
+        parser.add_argument('show', help='ID of the show')
+        parser.add_argument(
+            'seat_map', help='path to the JSON file with the "time", "seat_map" and "price_tiers"',
+        )
+        parser.add_argument('--batch-size', type=int, default=seating.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        """
+        Validate the seat map and create the tickets.
+
+        Args:
+            args: Positional arguments.
+            options: Command options.
+
+        Raises:
+            CommandError: If the seat map file is invalid.
+        """
+        try:
+            with open(options['seat_map'], encoding='utf-8') as seat_map_file:
+                payload = json.load(seat_map_file)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'can not read the seat map: {error}') from error
+        payload['theater_performance'] = options['show']
+        payload['batch_size'] = options['batch_size']
+        serializer = TicketsGenerationSerializer(data=payload)
+        if not serializer.is_valid():
+            raise CommandError(json.dumps(serializer.errors, ensure_ascii=False))
+        validated = serializer.validated_data
+        self.report(seating.generate_tickets(
+            validated['theater_performance'].id,
+            seating.seat_places(validated['seat_map'], validated['price_tiers']),
+            validated['time'],
+            validated['batch_size'],
+        ))
+
+    def report(self, lines):
+        """
+        Write the progress lines of the generation and its summary.
+
+        Args:
+            lines (Iterator[dict[str, int]]): Progress of the generation.
+        """
+        start = time.perf_counter()
+        progress = {}
+        for line in lines:
+            progress.update(line)
+            self.stdout.write('{created}/{total} tickets created'.format(**progress))
+        elapsed = time.perf_counter() - start
+        rate = progress['created'] / elapsed
+        counts = '{created} tickets created, {skipped} existing places skipped'.format(**progress)
+        summary = f'{counts} in {elapsed:.2f}s ({rate:.0f} tickets/s)'
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,98 @@
+"""Command importing the theaters, performances and shows of a season."""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from theaters_app import season
+
+
+def read_files(options) -> dict[str, list[dict]]:
+    """
+    Read the rows of the given files.
+
+    Args:
+        options: Command options.
+
+    Returns:
+        dict[str, list[dict]]: Rows by kind.
+
+    Raises:
+        CommandError: If no file is given or a file can not be read.
+    """
+    kinds = [kind for kind in ('theaters', 'performances', 'shows') if options[kind]]
+    if not kinds:
+        raise CommandError('give at least one of --theaters, --performances and --shows')
+    rows = {}
+    for kind in kinds:
+        try:
+            rows[kind] = season.read_rows(options[kind])
+        except (OSError, ValueError) as error:
+            raise CommandError(f'can not read the {kind}: {error}') from error
+    return rows
+
+
+class Command(BaseCommand):
+    """Upsert the season from CSV or JSON files in batches."""
+
+    help = 'Import a season from CSV or JSON files, invalid rows are reported and skipped.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+
+        Args:
+            parser (ArgumentParser): Argument parser.
+        """
+        parser.add_argument(
+            '--theaters', help='path to the .csv or .json file with the title, address and rating',
+        )
+        parser.add_argument(
+            '--performances', help='path to the file with the title, description and date',
+        )
+        parser.add_argument(
+            '--shows', help='path to the file with the theater and performance id or title',
+        )
+        parser.add_argument('--batch-size', type=int, default=season.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='only validate the files')
+
+    def handle(self, *args, **options):
+        """
+        Read the files, import them and print the report.
+
+        Args:
+            args: Positional arguments.
+            options: Command options.
+        """
+        report = season.import_season(
+            **read_files(options),
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        for kind, kind_report in report.items():
+            self.write_report(kind, kind_report)
+        if options['dry_run']:
+            self.stdout.write('dry run, nothing is saved')
+
+    def write_report(self, kind: str, kind_report: dict) -> None:
+        """
+        Print the rejected rows and the throughput of the import of one kind.
+
+        Args:
+            kind (str): Kind of the rows.
+            kind_report (dict): Report of the kind from import_season().
+        """
+        for number, errors in kind_report['rejected'].items():
+            rejection = json.dumps(errors, ensure_ascii=False)
+            self.stderr.write(f'{kind} row {number} rejected: {rejection}')
+        seconds = kind_report['seconds']
+        speed = kind_report['rows'] / seconds if seconds else 0
+        message = '{0}: {1} of {2} rows imported, {3} rejected in {4:.2f}s ({5:.0f} rows/s)'
+        self.stdout.write(self.style.SUCCESS(message.format(
+            kind,
+            kind_report['imported'],
+            kind_report['rows'],
+            len(kind_report['rejected']),
+            seconds,
+            speed,
+        )))
@@ -0,0 +1,54 @@
+"""Command deleting the expired seat holds."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from theaters_app import holds
+
+
+class Command(BaseCommand):
+    """Reap the expired seat holds once or periodically."""
+
+    help = 'Delete the expired seat holds in batches, once or every INTERVAL seconds.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+
+        Args:
+            parser (ArgumentParser): Argument parser.
+        """
+        parser.add_argument('--batch-size', type=int, default=holds.DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            '--interval', type=float, default=0, help='seconds between the runs, 0 runs once',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Reap the holds and print the number of the deleted ones.
+
+        Args:
+            args: Positional arguments.
+            options: Command options.
+        """
+        while True:
+            self.reap(options['batch_size'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def reap(self, batch_size: int) -> None:
+        """
+        Reap the holds expired by now.
+
+        Args:
+            batch_size (int): Number of holds deleted in one transaction.
+        """
+        start = time.perf_counter()
+        reaped = 0
+        for progress in holds.reap(batch_size=batch_size):
+            reaped = progress
+            self.stdout.write(f'{reaped} holds reaped')
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'{reaped} expired holds reaped in {elapsed:.2f}s'))
@@ -0,0 +1,48 @@
+"""Command recomputing the denormalized ticket statistics of the shows."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from theaters_app import inventory
+
+
+class Command(BaseCommand):
+    """Recompute the ticket counters and price ranges of all shows and report the drift."""
+
+    help = 'Recompute the ticket statistics of every show and save the drifted ones.'
+
+    def add_arguments(self, parser):
+        """
+        Add command arguments.
+
+        Args:
+            parser (ArgumentParser): Argument parser.
+        """
+        parser.add_argument(
+            '--dry-run', action='store_true', help='only report the drift, save nothing',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        """
+        Reconcile the statistics and print the report.
+
+        Args:
+            args: Positional arguments.
+            options: Command options.
+        """
+        start = time.perf_counter()
+        report = inventory.reconcile(options['dry_run'], options['batch_size'])
+        elapsed = time.perf_counter() - start
+        action = 'found' if options['dry_run'] else 'fixed'
+        message = '{0} of {1} shows {2} in {3:.2f}s, drift: {4} tickets, {5} sold'.format(
+            report['drifted'],
+            report['checked'],
+            action,
+            elapsed,
+            report['tickets_total'],
+            report['tickets_sold'],
+        )
+        style = self.style.WARNING if report['drifted'] else self.style.SUCCESS
+        self.stdout.write(style(message))
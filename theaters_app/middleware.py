@@ -0,0 +1,430 @@
+"""Middleware of the theater application."""
+
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from http import HTTPStatus
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user,
+    load_backend,
+)
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from . import routers
+from .conditional import SAFE_METHODS
+from .models import Client
+
+logger = logging.getLogger('theaters_app.queries')
+
+PRIMARY_UNTIL_KEY = '_primary_until'
+
+_collector = ContextVar('query_collector', default=None)
+
+
+class QueryCollector:
+    """Database execute wrapper counting the executed queries and their duration."""
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.duration = 0
+        self.statements = Counter()
+
+    @contextmanager
+    def timing(self, sql: str, query_params):
+        """
+        Record the query executed inside the block, even if it fails.
+
+        Args:
+            sql (str): Query.
+            query_params: Query parameters.
+
+        Yields:
+            None
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[(sql, repr(query_params))] += 1
+
+    def duplicates(self) -> int:
+        """
+        Count queries repeating an already executed query with the same parameters.
+
+        Returns:
+            int: Number of duplicated queries.
+        """
+        return sum(repeats - 1 for repeats in self.statements.values())
+
+    def similar(self) -> int:
+        """
+        Get the largest number of queries sharing the same SQL, a sign of N+1 queries.
+
+        Returns:
+            int: Largest number of queries with the same SQL.
+        """
+        by_sql = Counter()
+        for (sql, _), repeats in self.statements.items():
+            by_sql[sql] += repeats
+        return max(by_sql.values(), default=0)
+
+
+def collect_queries(execute, sql, query_params, many, context):
+    """
+    Execute the query and record it in the collector of the current request, if any.
+
+    The wrapper is installed on every connection when it is created, see
+    signals.instrument_connection(). The collector is looked up in a context variable, which
+    sync_to_async() copies to its thread, so the queries of the asynchronous views
+    are recorded as well.
+
+    Args:
+        execute (Callable): The next execute function.
+        sql (str): Query.
+        query_params: Query parameters.
+        many (bool): True for executemany.
+        context (dict): Execution context.
+
+    Returns:
+        Any: Result of the execution.
+    """
+    collector = _collector.get()
+    if collector is None:
+        return execute(sql, query_params, many, context)
+    with collector.timing(sql, query_params):
+        return execute(sql, query_params, many, context)
+
+
+@contextmanager
+def collecting():
+    """
+    Collect the queries of the current context, see collect_queries().
+
+    Yields:
+        QueryCollector: Statistics of the queries.
+    """
+    collector = QueryCollector()
+    token = _collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _collector.reset(token)
+
+
+def install_query_collector(connection) -> None:
+    """
+    Install collect_queries() on the database connection once.
+
+    Args:
+        connection (BaseDatabaseWrapper): The connection.
+    """
+    if collect_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(collect_queries)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the number and duration of SQL queries of the sampled requests.
+
+    A structured log line is written for every sampled request, with the WARNING level
+    for requests slower than SLOW_REQUEST_MS. The statistics are also sent in the
+    Server-Timing header when SERVER_TIMING_HEADER is enabled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initialize the middleware.
+
+        Args:
+            get_response (Callable): The next handler.
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Process the request.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        start = time.perf_counter()
+        with collecting() as collector:
+            return self.report(request, self.get_response(request), collector, start)
+
+    async def __acall__(self, request):
+        """
+        Process the request in the asynchronous mode.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        if not self.sampled():
+            return await self.get_response(request)
+        start = time.perf_counter()
+        with collecting() as collector:
+            return self.report(request, await self.get_response(request), collector, start)
+
+    def sampled(self) -> bool:
+        """
+        Decide if the request is instrumented.
+
+        Returns:
+            bool: True for the sampled requests.
+        """
+        sample_rate = settings.QUERY_LOG_SAMPLE_RATE
+        return sample_rate >= 1 or random.random() < sample_rate  # noqa: S311
+
+    def report(self, request, response, collector: QueryCollector, start: float):
+        """
+        Log the statistics of the request and add the Server-Timing header.
+
+        Args:
+            request (HttpRequest): The request.
+            response (HttpResponse): The response.
+            collector (QueryCollector): Statistics of the queries.
+            start (float): Start of the request, from time.perf_counter().
+
+        Returns:
+            HttpResponse: The response.
+        """
+        total_ms = (time.perf_counter() - start) * 1000
+        sql_ms = collector.duration * 1000
+        resolver_match = request.resolver_match
+        record = {
+            'view': resolver_match.view_name if resolver_match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(total_ms, 2),
+            'sql_ms': round(sql_ms, 2),
+            'queries': collector.count,
+            'duplicates': collector.duplicates(),
+            'similar': collector.similar(),
+        }
+        slow = total_ms >= settings.SLOW_REQUEST_MS
+        logger.log(logging.WARNING if slow else logging.INFO, json.dumps(record))
+        if settings.SERVER_TIMING_HEADER:
+            response['Server-Timing'] = (
+                f'db;dur={sql_ms:.2f};desc="{collector.count} queries", app;dur={total_ms:.2f}'
+            )
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Keep the reads of the writing requests and the following ones on the primary.
+
+    The writing methods read from the primary. A successful write of a browser session
+    sends the reads of the session to the primary for REPLICA_STICKY_SECONDS as well, so
+    the client sees its purchase before the replicas catch up. The clients without
+    a session cookie, like the API token clients, get no such window.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initialize the middleware.
+
+        Args:
+            get_response (Callable): The next handler.
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Process the request.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routers.primary(self.writes(request) or self.sticky(request)):
+            response = self.get_response(request)
+        self.stick(request, response)
+        return response
+
+    async def __acall__(self, request):
+        """
+        Process the request in the asynchronous mode.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        # the session is loaded by the sync ORM, later accesses do not query
+        sticky = await sync_to_async(self.sticky)(request)
+        with routers.primary(self.writes(request) or sticky):
+            response = await self.get_response(request)
+        self.stick(request, response)
+        return response
+
+    def sticky(self, request) -> bool:
+        """
+        Check that the session wrote recently, which loads the session.
+
+        Args:
+            request (HttpRequest): The request.
+
+        Returns:
+            bool: True inside the window after a write of the session.
+        """
+        if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            return False
+        return request.session.get(PRIMARY_UNTIL_KEY, 0) > time.time()
+
+    def stick(self, request, response) -> None:
+        """
+        Open the window of the primary reads after a successful write of the session.
+
+        Args:
+            request (HttpRequest): The request.
+            response (HttpResponse): The response.
+        """
+        succeeded = response.status_code < HTTPStatus.BAD_REQUEST
+        if settings.SESSION_COOKIE_NAME in request.COOKIES and self.writes(request) and succeeded:
+            request.session[PRIMARY_UNTIL_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
+
+    def writes(self, request) -> bool:
+        """
+        Check that the request may write.
+
+        Args:
+            request (HttpRequest): The request.
+
+        Returns:
+            bool: True for the writing methods.
+        """
+        return request.method not in SAFE_METHODS
+
+
+def session_verified(request, user) -> bool:
+    """
+    Check the session of the request against the user like django.contrib.auth.get_user().
+
+    Args:
+        request (HttpRequest): The request.
+        user (User): The user of the session user ID.
+
+    Returns:
+        bool: True if the backend of the session accepts the user and the session hash
+            matches; otherwise the auth middleware has to decide.
+    """
+    backend_path = request.session.get(BACKEND_SESSION_KEY)
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return False
+    user_can_authenticate = getattr(load_backend(backend_path), 'user_can_authenticate', None)
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    return bool(
+        user_can_authenticate
+        and user_can_authenticate(user)
+        and session_hash
+        and constant_time_compare(session_hash, user.get_session_auth_hash()),
+    )
+
+
+def load_client(request) -> tuple:
+    """
+    Load the user of the session together with its client by one query.
+
+    The client is selected with its user by the user ID of the session. If the user has
+    no client or the session is not verified, the user is loaded by
+    django.contrib.auth.get_user() instead, so logged out or changed users are
+    handled by Django.
+
+    Args:
+        request (HttpRequest): The request.
+
+    Returns:
+        tuple: The user or AnonymousUser and its client, None for anonymous users and
+            users without a client.
+    """
+    user_id = request.session.get(SESSION_KEY)
+    client = None
+    if user_id is not None:
+        client = Client.objects.select_related('user').filter(user_id=user_id).first()
+    if client is not None and session_verified(request, client.user):
+        return client.user, client
+    user = get_user(request)
+    if client is None or not user.is_authenticated or user.pk != client.user_id:
+        return user, None
+    # Client.username and the other user properties do not query the user again
+    client.user = user
+    return user, client
+
+
+class ClientMiddleware:
+    """
+    Set request.client to the client of the user, loaded on the first access only.
+
+    request.user is replaced by a lazy object loaded by the same query as the client,
+    see load_client(). request.client evaluates to None for anonymous users.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Initialize the middleware.
+
+        Args:
+            get_response (Callable): The next handler.
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Process the request, the coroutine of the next handler is returned in the async mode.
+
+        Args:
+            request (HttpRequest): The incoming request.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        loaded = SimpleLazyObject(partial(load_client, request))
+        request.user = SimpleLazyObject(lambda: loaded[0])
+        request.client = SimpleLazyObject(lambda: loaded[1])
+        return self.get_response(request)
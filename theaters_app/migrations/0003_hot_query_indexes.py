@@ -0,0 +1,37 @@
+# Generated by Django 5.0.4 on 2026-10-17 01:48
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # indexes are built concurrently to keep the ticket table writable
+    atomic = False
+
+    dependencies = [
+        ('theaters_app', '0002_alter_ticket_client_alter_ticket_theater_performance'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='performance',
+            index=models.Index(fields=['title', 'id'], name='performance_ordering_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='theater',
+            index=models.Index(fields=['rating', 'title', 'address', 'id'], name='theater_ordering_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['place', 'id'], name='ticket_ordering_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['client', 'place'], name='ticket_client_place_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('client__isnull', True)), fields=['theater_performance', 'place'], name='ticket_unsold_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.4 on 2026-10-17 02:01
+
+from django.db import migrations, models
+
+
+BACKFILL_SQL = '''
+UPDATE "api_data"."theater_performance" AS tp
+SET tickets_total = stats.total, tickets_sold = stats.sold,
+    min_price = stats.min_price, max_price = stats.max_price
+FROM (
+    SELECT theater_performance_id, count(*) AS total, count(client_id) AS sold,
+           min(price) AS min_price, max(price) AS max_price
+    FROM "api_data"."ticket"
+    WHERE theater_performance_id IS NOT NULL
+    GROUP BY theater_performance_id
+) AS stats
+WHERE stats.theater_performance_id = tp.id
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theaters_app', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='theaterperformance',
+            name='max_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='max price'),
+        ),
+        migrations.AddField(
+            model_name='theaterperformance',
+            name='min_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True, verbose_name='min price'),
+        ),
+        migrations.AddField(
+            model_name='theaterperformance',
+            name='tickets_sold',
+            field=models.IntegerField(default=0, editable=False, verbose_name='tickets sold'),
+        ),
+        migrations.AddField(
+            model_name='theaterperformance',
+            name='tickets_total',
+            field=models.IntegerField(default=0, editable=False, verbose_name='tickets total'),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
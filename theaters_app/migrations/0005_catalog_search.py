@@ -0,0 +1,64 @@
+# Generated by Django 5.0.4 on 2026-10-17 02:03
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+TRIGRAM_INDEXES = (
+    ('performance', django.contrib.postgres.indexes.GinIndex(fields=['title'], name='performance_title_trgm_idx', opclasses=['gin_trgm_ops'])),
+    ('theater', django.contrib.postgres.indexes.GinIndex(fields=['title'], name='theater_title_trgm_idx', opclasses=['gin_trgm_ops'])),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm is a contrib extension, the search works without it, only less fuzzy
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for model_name, index in TRIGRAM_INDEXES:
+        schema_editor.add_index(apps.get_model('theaters_app', model_name), index)
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for _, index in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "api_data"."{index.name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theaters_app', '0004_show_ticket_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performance',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='theater',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('address', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='performance_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='theater',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='theater_search_idx'),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name=model_name, index=index)
+                for model_name, index in TRIGRAM_INDEXES
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.0.4 on 2026-10-17 02:06
+
+import django.db.models.deletion
+import theaters_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theaters_app', '0005_catalog_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPerformance',
+            fields=[
+                ('created', models.DateTimeField(blank=True, default=theaters_app.models.get_datetime, null=True, validators=[theaters_app.models.check_created], verbose_name='created')),
+                ('modified', models.DateTimeField(blank=True, default=theaters_app.models.get_datetime, null=True, validators=[theaters_app.models.check_modified], verbose_name='modified')),
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('title', models.TextField(verbose_name='title')),
+                ('description', models.TextField(verbose_name='description')),
+                ('date', models.DateField(verbose_name='date')),
+                ('archived', models.DateTimeField(default=theaters_app.models.get_datetime, verbose_name='archived')),
+            ],
+            options={
+                'verbose_name': 'archived performance',
+                'verbose_name_plural': 'archived performances',
+                'db_table': '"api_data"."performance_archive"',
+                'ordering': ['-date', 'title'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTicket',
+            fields=[
+                ('created', models.DateTimeField(blank=True, default=theaters_app.models.get_datetime, null=True, validators=[theaters_app.models.check_created], verbose_name='created')),
+                ('modified', models.DateTimeField(blank=True, default=theaters_app.models.get_datetime, null=True, validators=[theaters_app.models.check_modified], verbose_name='modified')),
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('theater_id', models.UUIDField(verbose_name='theater id')),
+                ('theater_title', models.TextField(verbose_name='theater title')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='price')),
+                ('time', models.TimeField(verbose_name='time')),
+                ('place', models.TextField(verbose_name='place')),
+            ],
+            options={
+                'verbose_name': 'archived ticket',
+                'verbose_name_plural': 'archived tickets',
+                'db_table': '"api_data"."ticket_archive"',
+                'ordering': ['place'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['date', 'title', 'id'], name='performance_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedticket',
+            name='client',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='theaters_app.client', verbose_name='client'),
+        ),
+        migrations.AddField(
+            model_name='archivedticket',
+            name='performance',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to='theaters_app.archivedperformance', verbose_name='performance'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.4 on 2026-10-17 02:19
+
+import django.db.models.deletion
+import theaters_app.models
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theaters_app', '0006_performance_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(blank=True, default=theaters_app.models.get_datetime, null=True, validators=[theaters_app.models.check_created], verbose_name='created')),
+                ('expires', models.DateTimeField(db_index=True, verbose_name='expires')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='theaters_app.client', verbose_name='client')),
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='hold', to='theaters_app.ticket', verbose_name='ticket')),
+            ],
+            options={
+                'verbose_name': 'seat hold',
+                'verbose_name_plural': 'seat holds',
+                'db_table': '"api_data"."seat_hold"',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.4 on 2026-10-17 03:13
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # the index is built concurrently to keep the ticket table writable
+    atomic = False
+
+    dependencies = [
+        ('theaters_app', '0007_seat_hold'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['theater_performance', 'modified'], name='ticket_show_modified_idx'),
+        ),
+    ]
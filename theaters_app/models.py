@@ -4,11 +4,16 @@ from datetime import date, datetime, timezone
 from uuid import uuid4
 
 from django.conf.global_settings import AUTH_USER_MODEL
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 
+SEARCH_CONFIG = 'russian'
+
+
 def get_datetime() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -73,6 +78,13 @@ class ModifiedMixin(models.Model):
         default=get_datetime, validators=[check_modified],
     )
 
+    def save(self, *args, update_fields=None, **kwargs) -> None:
+        if not self._state.adding:
+            self.modified = get_datetime()
+            if update_fields is not None:
+                update_fields = {*update_fields, 'modified'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     class Meta:
         abstract = True
 
@@ -93,6 +105,14 @@ class Theater(UUIDMixin, CreatedMixin, ModifiedMixin):
         verbose_name=_('performances'),
         through='TheaterPerformance',
     )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('address', weight='B', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self) -> str:
         return f'"{self.title}", {self.address}, rating - {self.rating}'
@@ -100,6 +120,11 @@ class Theater(UUIDMixin, CreatedMixin, ModifiedMixin):
     class Meta:
         db_table = '"api_data"."theater"'
         ordering = ['rating', 'title', 'address']
+        indexes = [
+            models.Index(fields=['rating', 'title', 'address', 'id'], name='theater_ordering_idx'),
+            GinIndex(fields=['search_vector'], name='theater_search_idx'),
+            GinIndex(fields=['title'], opclasses=['gin_trgm_ops'], name='theater_title_trgm_idx'),
+        ]
         verbose_name = _('theater')
         verbose_name_plural = _('theaters')
 
@@ -114,6 +139,14 @@ class Performance(UUIDMixin, CreatedMixin, ModifiedMixin):
         verbose_name=_('theaters'),
         through='TheaterPerformance',
     )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self) -> str:
         return f'"{self.title}", {self.description}'
@@ -121,6 +154,14 @@ class Performance(UUIDMixin, CreatedMixin, ModifiedMixin):
     class Meta:
         db_table = '"api_data"."performance"'
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['title', 'id'], name='performance_ordering_idx'),
+            models.Index(fields=['date', 'title', 'id'], name='performance_date_idx'),
+            GinIndex(fields=['search_vector'], name='performance_search_idx'),
+            GinIndex(
+                fields=['title'], opclasses=['gin_trgm_ops'], name='performance_title_trgm_idx',
+            ),
+        ]
         verbose_name = _('performance')
         verbose_name_plural = _('performances')
 
@@ -128,6 +169,18 @@ class Performance(UUIDMixin, CreatedMixin, ModifiedMixin):
 class TheaterPerformance(UUIDMixin, CreatedMixin):
     theater = models.ForeignKey(Theater, verbose_name=_('theater'), on_delete=models.CASCADE)
     performance = models.ForeignKey(Performance, verbose_name=_('performance'), on_delete=models.CASCADE)
+    tickets_total = models.IntegerField(_('tickets total'), default=0, editable=False)
+    tickets_sold = models.IntegerField(_('tickets sold'), default=0, editable=False)
+    min_price = models.DecimalField(
+        _('min price'), max_digits=10, decimal_places=2, null=True, blank=True, editable=False,
+    )
+    max_price = models.DecimalField(
+        _('max price'), max_digits=10, decimal_places=2, null=True, blank=True, editable=False,
+    )
+
+    @property
+    def tickets_available(self) -> int:
+        return self.tickets_total - self.tickets_sold
 
     def __str__(self) -> str:
         return f'{self.theater} - {self.performance}'
@@ -215,10 +268,85 @@ class Ticket(UUIDMixin, CreatedMixin, ModifiedMixin):
     class Meta:
         db_table = '"api_data"."ticket"'
         ordering = ['place']
+        indexes = [
+            models.Index(fields=['place', 'id'], name='ticket_ordering_idx'),
+            models.Index(fields=['client', 'place'], name='ticket_client_place_idx'),
+            models.Index(fields=['theater_performance', 'modified'], name='ticket_show_modified_idx'),
+            models.Index(
+                fields=['theater_performance', 'place'],
+                name='ticket_unsold_idx',
+                condition=models.Q(client__isnull=True),
+            ),
+        ]
         verbose_name = _('ticket')
         verbose_name_plural = _('tickets')
 
 
+class SeatHold(UUIDMixin, CreatedMixin):
+    ticket = models.OneToOneField(
+        to=Ticket,
+        verbose_name=_('ticket'),
+        on_delete=models.CASCADE,
+        related_name='hold',
+    )
+    client = models.ForeignKey(to=Client, verbose_name=_('client'), on_delete=models.CASCADE)
+    expires = models.DateTimeField(_('expires'), db_index=True)
+
+    @property
+    def is_active(self) -> bool:
+        return self.expires > get_datetime()
+
+    def __str__(self) -> str:
+        return f'{self.ticket} - {self.client} until {self.expires}'
+
+    class Meta:
+        db_table = '"api_data"."seat_hold"'
+        verbose_name = _('seat hold')
+        verbose_name_plural = _('seat holds')
+
+
+class ArchivedPerformance(CreatedMixin, ModifiedMixin):
+    id = models.UUIDField(primary_key=True, editable=False)
+    title = models.TextField(_('title'), null=False, blank=False)
+    description = models.TextField(_('description'), null=False, blank=False)
+    date = models.DateField(_('date'), null=False, blank=False)
+    archived = models.DateTimeField(_('archived'), default=get_datetime)
+
+    def __str__(self) -> str:
+        return f'"{self.title}", {self.date}'
+
+    class Meta:
+        db_table = '"api_data"."performance_archive"'
+        ordering = ['-date', 'title']
+        verbose_name = _('archived performance')
+        verbose_name_plural = _('archived performances')
+
+
+class ArchivedTicket(CreatedMixin, ModifiedMixin):
+    id = models.UUIDField(primary_key=True, editable=False)
+    performance = models.ForeignKey(
+        to=ArchivedPerformance,
+        verbose_name=_('performance'),
+        on_delete=models.CASCADE,
+        related_name='tickets',
+    )
+    theater_id = models.UUIDField(_('theater id'))
+    theater_title = models.TextField(_('theater title'))
+    price = models.DecimalField(verbose_name=_('price'), max_digits=10, decimal_places=2)
+    time = models.TimeField(_('time'))
+    place = models.TextField(_('place'))
+    client = models.ForeignKey(to=Client, verbose_name=_('client'), on_delete=models.CASCADE)
+
+    def __str__(self) -> str:
+        return f'{self.theater_title}, {self.performance}, {self.price}р., {self.time}, {self.place}'
+
+    class Meta:
+        db_table = '"api_data"."ticket_archive"'
+        ordering = ['place']
+        verbose_name = _('archived ticket')
+        verbose_name_plural = _('archived tickets')
+
+
 # class TicketClient(UUIDMixin, CreatedMixin):
 #     ticket = models.ForeignKey(Ticket, verbose_name=_('ticket'), on_delete=models.CASCADE)
 #     client = models.ForeignKey(Client, verbose_name=_('client'), on_delete=models.CASCADE)
@@ -0,0 +1,82 @@
+"""Cached objects and template fragments of the theater and performance pages."""
+
+from datetime import datetime
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.http import Http404
+
+from .models import Performance, Theater
+
+KEY_PREFIX = 'pages'
+FRAGMENT_NAMES = MappingProxyType({Theater: 'theater', Performance: 'performance'})
+QUERYSETS = MappingProxyType({
+    Theater: lambda: Theater.objects.prefetch_related('performances'),
+    Performance: lambda: Performance.objects.all(),
+})
+
+
+def cache_key(model, object_id, version: datetime | None) -> str:
+    """
+    Build the cache key of the page object.
+
+    Args:
+        model (type): Theater or Performance.
+        object_id (UUID): ID of the object.
+        version (datetime | None): Last modified time of the page.
+
+    Returns:
+        str: Cache key.
+    """
+    name = model._meta.model_name
+    stamp = version.isoformat() if version else ''
+    return f'{KEY_PREFIX}:{name}:{object_id}:{stamp}'
+
+
+def fragment_key(model, object_id, version: datetime | None) -> str:
+    """
+    Build the cache key of the page fragment, see the cache tags of the templates.
+
+    Args:
+        model (type): Theater or Performance.
+        object_id (UUID): ID of the object.
+        version (datetime | None): Last modified time of the page.
+
+    Returns:
+        str: Cache key.
+    """
+    return make_template_fragment_key(FRAGMENT_NAMES[model], [object_id, version])
+
+
+async def aget(model, object_id, version: datetime | None):
+    """
+    Get the page object from the cache, loading it with the async ORM on a miss.
+
+    The version is the last modified time of the page computed with its validators,
+    see conditional.atheater_state(), so the body and the ETag come from one state and
+    a change is seen by every process at once whatever the cache backend. Theaters are
+    cached with their performances prefetched.
+
+    Args:
+        model (type): Theater or Performance.
+        object_id (UUID): ID of the object.
+        version (datetime | None): Last modified time of the page.
+
+    Returns:
+        Theater | Performance: The object.
+
+    Raises:
+        Http404: If the object does not exist.
+    """
+    key = cache_key(model, object_id, version)
+    instance = await cache.aget(key)
+    if instance is None:
+        try:
+            instance = await QUERYSETS[model]().aget(id=object_id)
+        except model.DoesNotExist as error:
+            name = model._meta.object_name
+            raise Http404(f'No {name} matches the given query.') from error
+        await cache.aset(key, instance, settings.PAGE_CACHE_TTL)
+    return instance
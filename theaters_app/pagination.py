@@ -0,0 +1,423 @@
+"""Keyset (cursor) pagination over the model ordering fields."""
+
+import base64
+import json
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+NEXT = 'n'
+PREVIOUS = 'p'
+DESCENDING = '-'
+
+
+class CursorPage:
+    """A page of objects together with the cursors of the neighbouring pages."""
+
+    def __init__(self, object_list: list, next_cursor: str | None, previous_cursor: str | None):
+        """
+        Initialize the page.
+
+        Args:
+            object_list (list): Objects of the page.
+            next_cursor (str | None): Cursor of the next page, None on the last page.
+            previous_cursor (str | None): Cursor of the previous page, None on the first page.
+        """
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        """
+        Iterate over the objects of the page.
+
+        Returns:
+            Iterator: Iterator over the objects.
+        """
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        """
+        Get the number of objects on the page.
+
+        Returns:
+            int: Number of objects.
+        """
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        """
+        Check if there is a next page.
+
+        Returns:
+            bool: True if there is a next page.
+        """
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        """
+        Check if there is a previous page.
+
+        Returns:
+            bool: True if there is a previous page.
+        """
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        """
+        Check if there are other pages.
+
+        Returns:
+            bool: True if there is a next or a previous page.
+        """
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginator filtering by the ordering values of the last seen row instead of OFFSET.
+
+    Pages are fetched with a WHERE clause on the ordering fields, so the cost of a page
+    does not depend on its depth and no COUNT query is needed. The primary key is always
+    appended to the ordering to make it total.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: list[str] | None = None):
+        """
+        Initialize the paginator.
+
+        Args:
+            queryset (QuerySet): Objects to paginate.
+            per_page (int): Maximum number of objects on a page.
+            ordering (list[str] | None): Ordering fields, defaults to the model ordering.
+        """
+        options = queryset.model._meta
+        ordering = list(ordering or queryset.query.order_by or options.ordering)
+        if not {options.pk.name, 'pk'} & {field.lstrip(DESCENDING) for field in ordering}:
+            ordering.append(options.pk.name)
+        self.ordering = ordering
+        names = [field.lstrip(DESCENDING) for field in ordering]
+        self.fields = [options.pk if name == 'pk' else options.get_field(name) for name in names]
+        self.per_page = per_page
+        self.queryset = queryset.order_by(*ordering)
+
+    def encode_cursor(self, instance, direction: str) -> str:
+        """
+        Build an opaque cursor pointing at the instance.
+
+        Args:
+            instance (Model): The first or the last object of a page.
+            direction (str): NEXT or PREVIOUS.
+
+        Returns:
+            str: Cursor token.
+        """
+        boundary = [getattr(instance, field.lstrip(DESCENDING)) for field in self.ordering]
+        payload = json.dumps([direction, boundary], cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str | None) -> tuple[str, list[Any]] | None:
+        """
+        Decode the cursor token and convert its values to the types of the ordering fields.
+
+        Args:
+            cursor (str | None): Cursor token.
+
+        Returns:
+            tuple[str, list[Any]] | None: Direction and ordering values, None if the
+                cursor is missing or invalid.
+        """
+        if not cursor:
+            return None
+        payload = decode_payload(cursor)
+        if not is_valid_payload(payload, len(self.fields)):
+            return None
+        direction, boundary = payload
+        try:
+            boundary = [cursor_value(field, raw) for field, raw in zip(self.fields, boundary)]
+        except (ValidationError, TypeError, ValueError, OverflowError):
+            return None
+        return direction, boundary
+
+    def page_queryset(self, cursor: str | None) -> tuple[QuerySet, str, bool]:
+        """
+        Build the query fetching the page and one extra row to detect the following page.
+
+        Args:
+            cursor (str | None): Cursor token.
+
+        Returns:
+            tuple[QuerySet, str, bool]: Query, direction and whether a valid cursor was given.
+        """
+        decoded = self.decode_cursor(cursor)
+        if decoded is None:
+            return self.queryset[:self.per_page + 1], NEXT, False
+        direction, boundary = decoded
+        forward = direction == NEXT
+        queryset = self.queryset.filter(seek_filter(self.ordering, boundary, forward))
+        if not forward:
+            queryset = queryset.reverse()
+        return queryset[:self.per_page + 1], direction, True
+
+    def build_page(self, rows: list, direction: str, has_cursor: bool) -> CursorPage:
+        """
+        Build the page from the fetched rows.
+
+        Args:
+            rows (list): Rows fetched by the page query.
+            direction (str): Direction of the page query.
+            has_cursor (bool): Whether the page was requested with a valid cursor.
+
+        Returns:
+            CursorPage: The page.
+        """
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == NEXT:
+            has_next, has_previous = has_more, has_cursor
+        else:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        return CursorPage(
+            rows,
+            self.encode_cursor(rows[-1], NEXT) if has_next and rows else None,
+            self.encode_cursor(rows[0], PREVIOUS) if has_previous and rows else None,
+        )
+
+    def get_page(self, cursor: str | None) -> CursorPage:
+        """
+        Get the page pointed by the cursor, the first page if the cursor is invalid.
+
+        Args:
+            cursor (str | None): Cursor token.
+
+        Returns:
+            CursorPage: The page.
+        """
+        queryset, direction, has_cursor = self.page_queryset(cursor)
+        return self.build_page(list(queryset), direction, has_cursor)
+
+    async def aget_page(self, cursor: str | None) -> CursorPage:
+        """
+        Get the page pointed by the cursor using the async ORM, see get_page().
+
+        Args:
+            cursor (str | None): Cursor token.
+
+        Returns:
+            CursorPage: The page.
+        """
+        queryset, direction, has_cursor = self.page_queryset(cursor)
+        return self.build_page([row async for row in queryset], direction, has_cursor)
+
+
+def decode_payload(cursor: str) -> Any:
+    """
+    Decode the JSON payload of the cursor token.
+
+    Args:
+        cursor (str): Cursor token.
+
+    Returns:
+        Any: Decoded payload, None if the token is not base64 encoded JSON.
+    """
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        # covers the base64, UTF-8 and JSON decoding errors
+        return None
+
+
+def is_valid_payload(payload, size: int) -> bool:
+    """
+    Check the shape of the decoded cursor payload.
+
+    Args:
+        payload: Decoded JSON payload of the cursor.
+        size (int): Number of the ordering fields.
+
+    Returns:
+        bool: True if the payload is a direction and a list of the ordering values.
+    """
+    if not isinstance(payload, list) or len(payload) != 2:
+        return False
+    direction, boundary = payload
+    if not isinstance(boundary, list) or len(boundary) != size:
+        return False
+    return isinstance(direction, str) and direction in {NEXT, PREVIOUS}
+
+
+def cursor_value(field, raw) -> Any:
+    """
+    Convert an ordering value of the cursor to the type of its field.
+
+    Args:
+        field (Field): The ordering field.
+        raw: Value decoded from the cursor.
+
+    Returns:
+        Any: Converted value.
+
+    Raises:
+        ValueError: If the value cannot be compared in the seek filter.
+    """
+    if not isinstance(raw, (str, int, float)):
+        raise ValueError(raw)
+    converted = field.to_python(raw)
+    if converted is None or '\x00' in str(converted):
+        raise ValueError(raw)
+    return converted
+
+
+def seek_filter(ordering: list[str], boundary: list[Any], forward: bool) -> Q:
+    """
+    Build the filter selecting rows after (or before) the given ordering values.
+
+    Args:
+        ordering (list[str]): Ordering fields.
+        boundary (list[Any]): Ordering values of the boundary row.
+        forward (bool): True to select rows after the boundary row.
+
+    Returns:
+        Q: Filter expression.
+    """
+    seek = Q()
+    equal = {}
+    for field, field_value in zip(ordering, boundary):
+        name = field.lstrip(DESCENDING)
+        lookup = seek_lookup(field, forward)
+        seek |= Q(**equal, **{f'{name}__{lookup}': field_value})
+        equal[name] = field_value
+    first = ordering[0].lstrip(DESCENDING)
+    first_lookup = seek_lookup(ordering[0], forward)
+    # redundant bound on the first field lets the index be range scanned
+    return Q(**{f'{first}__{first_lookup}e': boundary[0]}) & seek
+
+
+def seek_lookup(field: str, forward: bool) -> str:
+    """
+    Get the strict comparison lookup used to seek past the boundary value of the field.
+
+    Args:
+        field (str): Ordering field, prefixed with '-' for descending order.
+        forward (bool): True when seeking to the next page.
+
+    Returns:
+        str: 'gt' or 'lt'.
+    """
+    return 'lt' if field.startswith(DESCENDING) == forward else 'gt'
+
+
+async def aget_numbered_page(paginator: Paginator, number) -> Page:
+    """
+    Get a page of the Django paginator with its rows fetched by the async ORM.
+
+    The total is counted with acount() and stored in the cached count of the paginator,
+    so the page can be rendered without any further query.
+
+    Args:
+        paginator (Paginator): Paginator of a queryset.
+        number: Requested page number, the first or the last page if it is invalid.
+
+    Returns:
+        Page: The page with the fetched rows.
+    """
+    paginator.count = await paginator.object_list.acount()
+    page = paginator.get_page(number)
+    page.object_list = [row async for row in page.object_list]
+    return page
+
+
+class KeysetAPIPagination(BasePagination):
+    """REST framework pagination class based on the keyset paginator."""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+    def get_page_size(self, request) -> int:
+        """
+        Get the page size requested by the client, limited by max_page_size.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            int: Page size.
+        """
+        page_size = request.query_params.get(self.page_size_query_param, '')
+        if page_size.isdigit() and int(page_size) > 0:
+            return min(int(page_size), self.max_page_size)
+        return api_settings.PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None) -> list:
+        """
+        Get the objects of the requested page.
+
+        Args:
+            queryset (QuerySet): Objects to paginate.
+            request (Request): The incoming request.
+            view (APIView): The view.
+
+        Returns:
+            list: Objects of the page.
+        """
+        self.request = request
+        paginator = KeysetPaginator(queryset, self.get_page_size(request))
+        self.page = paginator.get_page(request.query_params.get(self.cursor_query_param))
+        return self.page.object_list
+
+    def get_link(self, cursor: str | None) -> str | None:
+        """
+        Build the link to the page with the cursor.
+
+        Args:
+            cursor (str | None): Cursor of the page.
+
+        Returns:
+            str | None: Absolute URL, None if there is no such page.
+        """
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, serialized) -> Response:
+        """
+        Wrap the serialized page into a response with links to the neighbouring pages.
+
+        Args:
+            serialized (list): Serialized objects of the page.
+
+        Returns:
+            Response: The response.
+        """
+        return Response({
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': serialized,
+        })
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        """
+        Describe the paginated response for the schema generation.
+
+        Args:
+            schema (dict): Schema of the page objects.
+
+        Returns:
+            dict: Schema of the response.
+        """
+        link = {'type': 'string', 'nullable': True, 'format': 'uri'}
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {'next': link, 'previous': link, 'results': schema},
+        }
@@ -0,0 +1,235 @@
+"""Service for buying tickets safely under concurrent access."""
+
+from uuid import UUID
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+from . import availability, inventory
+from .models import Client, SeatHold, Ticket, get_datetime
+
+LOCK_NOWAIT = 'nowait'
+LOCK_SKIP_LOCKED = 'skip_locked'
+LOCK_MODES = (LOCK_NOWAIT, LOCK_SKIP_LOCKED)
+
+
+class PurchaseError(Exception):
+    """Base class for errors raised while buying a ticket."""
+
+
+class SeatTakenError(PurchaseError):
+    """The ticket is already sold or is being bought by another client right now."""
+
+
+class SeatHeldError(SeatTakenError):
+    """The ticket is held by another client and can not be bought until the hold expires."""
+
+
+class HoldLimitError(PurchaseError):
+    """The client already holds as many tickets as settings.SEAT_HOLD_MAX_PER_CLIENT allows."""
+
+
+class InsufficientFundsError(PurchaseError):
+    """The client does not have enough money to pay for the ticket."""
+
+
+class MixedShowsError(PurchaseError):
+    """The tickets of a basket belong to different shows."""
+
+
+def lock_tickets(ticket_ids, lock_mode: str) -> list[Ticket]:
+    """
+    Lock the ticket rows for the current transaction without waiting for other buyers.
+
+    The rows are locked in the order of their IDs, so two buyers of overlapping
+    baskets lock the shared tickets in the same order.
+
+    Args:
+        ticket_ids (Iterable[UUID]): IDs of the tickets to lock.
+        lock_mode (str): Either LOCK_NOWAIT or LOCK_SKIP_LOCKED.
+
+    Returns:
+        list[Ticket]: Locked tickets ordered by ID, without the ones locked by another
+            transaction (skip locked mode) or missing.
+
+    Raises:
+        SeatTakenError: If a ticket is locked by another transaction (nowait mode).
+        ValueError: If the lock mode is unknown.
+    """
+    if lock_mode not in LOCK_MODES:
+        raise ValueError(f'unknown lock mode {lock_mode!r}, expected one of {LOCK_MODES}')
+    tickets = Ticket.objects.select_for_update(
+        nowait=lock_mode == LOCK_NOWAIT,
+        skip_locked=lock_mode == LOCK_SKIP_LOCKED,
+    ).filter(id__in=ticket_ids).order_by('id')
+    try:
+        return list(tickets)
+    except DatabaseError as error:
+        raise SeatTakenError from error
+
+
+def lock_ticket(ticket_id, lock_mode: str) -> Ticket | None:
+    """
+    Lock the ticket row for the current transaction without waiting for other buyers.
+
+    Args:
+        ticket_id (UUID): ID of the ticket to lock.
+        lock_mode (str): Either LOCK_NOWAIT or LOCK_SKIP_LOCKED.
+
+    Returns:
+        Ticket | None: Locked ticket or None if it is locked by another transaction
+            (skip locked mode) or does not exist.
+
+    Raises:
+        SeatTakenError: If the ticket is locked by another transaction (nowait mode).
+        ValueError: If the lock mode is unknown.
+    """
+    return next(iter(lock_tickets([ticket_id], lock_mode)), None)
+
+
+def check_holds(client_id, holds, now) -> None:
+    """
+    Check that none of the tickets is held by another client.
+
+    Holds are changed only with the ticket rows locked, so the check is not racy.
+
+    Args:
+        client_id (UUID): ID of the buying client.
+        holds (QuerySet[SeatHold]): Holds of the bought tickets.
+        now (datetime): Current time.
+
+    Raises:
+        SeatHeldError: If a ticket is held by another client.
+    """
+    if holds.filter(expires__gt=now).exclude(client_id=client_id).exists():
+        raise SeatHeldError
+
+
+def debit(client_id, amount, now) -> None:
+    """
+    Debit the balance of the client with an F() expression guarded by the balance check.
+
+    Args:
+        client_id (UUID): ID of the buying client.
+        amount (Decimal): Price of the bought tickets.
+        now (datetime): Current time.
+
+    Raises:
+        InsufficientFundsError: If the client can not pay the amount.
+    """
+    debited = Client.objects.filter(id=client_id, money__gte=amount).update(
+        money=F('money') - amount,
+        modified=now,
+    )
+    if not debited:
+        raise InsufficientFundsError
+
+
+def basket_show(tickets: list[Ticket], ticket_ids: set) -> UUID:
+    """
+    Get the show of the locked tickets of a basket.
+
+    Args:
+        tickets (list[Ticket]): Locked tickets of the basket.
+        ticket_ids (set): IDs of the tickets of the basket.
+
+    Returns:
+        UUID: ID of the show of the tickets.
+
+    Raises:
+        SeatTakenError: If a ticket is sold, missing or locked by another buyer.
+        MixedShowsError: If the tickets belong to different shows.
+    """
+    if len(tickets) != len(ticket_ids) or any(ticket.client_id for ticket in tickets):
+        raise SeatTakenError
+    shows = {ticket.theater_performance_id for ticket in tickets}
+    if len(shows) > 1:
+        raise MixedShowsError
+    return shows.pop()
+
+
+def purchase_ticket(client_id, ticket_id, lock_mode: str | None = None) -> Ticket:
+    """
+    Sell the ticket to the client in a single transaction.
+
+    The ticket row is locked with SELECT ... FOR UPDATE in a non-blocking mode, so a
+    concurrent buyer gets SeatTakenError at once instead of waiting for the lock.
+    The balance is debited with an F() expression guarded by the balance check,
+    so concurrent purchases of the same client can not lose updates. A ticket held
+    by another client can not be bought until the hold expires, the hold of the
+    buyer is released by the purchase.
+
+    Args:
+        client_id (UUID): ID of the buying client.
+        ticket_id (UUID): ID of the ticket to buy.
+        lock_mode (str | None): Lock mode, defaults to settings.TICKET_LOCK_MODE.
+
+    Returns:
+        Ticket: The sold ticket.
+
+    Raises:
+        SeatTakenError: If the ticket is sold or locked by another buyer.
+        SeatHeldError: If the ticket is held by another client.
+        InsufficientFundsError: If the client can not pay for the ticket.
+    """
+    lock_mode = lock_mode or settings.TICKET_LOCK_MODE
+    with transaction.atomic():
+        ticket = lock_ticket(ticket_id, lock_mode)
+        if ticket is None or ticket.client_id is not None:
+            raise SeatTakenError
+        now = get_datetime()
+        holds = SeatHold.objects.filter(ticket_id=ticket.id)
+        check_holds(client_id, holds, now)
+        debit(client_id, ticket.price, now)
+        Ticket.objects.filter(id=ticket.id).update(client_id=client_id, modified=now)
+        holds.delete()
+        inventory.sell(ticket.theater_performance_id)
+        availability.on_sold(ticket.theater_performance_id, ticket.id)
+    ticket.client_id = client_id
+    ticket.modified = now
+    return ticket
+
+
+def purchase_tickets(client_id, ticket_ids, lock_mode: str | None = None) -> list[Ticket]:
+    """
+    Sell all tickets of a basket to the client in a single transaction or none of them.
+
+    The tickets are locked in the order of their IDs like in lock_tickets(), their
+    total price is debited with a single update and they are sold with another one,
+    so a basket costs the same number of queries whatever its size.
+
+    Args:
+        client_id (UUID): ID of the buying client.
+        ticket_ids (Iterable[UUID]): IDs of the tickets of one show, repeated IDs are ignored.
+        lock_mode (str | None): Lock mode, defaults to settings.TICKET_LOCK_MODE.
+
+    Returns:
+        list[Ticket]: The sold tickets ordered by ID.
+
+    Raises:
+        ValueError: If the basket is empty.
+        SeatTakenError: If a ticket is sold, missing or locked by another buyer.
+        SeatHeldError: If a ticket is held by another client.
+        MixedShowsError: If the tickets belong to different shows.
+        InsufficientFundsError: If the client can not pay for all tickets.
+    """
+    ticket_ids = set(ticket_ids)
+    if not ticket_ids:
+        raise ValueError('the basket is empty')
+    lock_mode = lock_mode or settings.TICKET_LOCK_MODE
+    with transaction.atomic():
+        tickets = lock_tickets(ticket_ids, lock_mode)
+        show = basket_show(tickets, ticket_ids)
+        now = get_datetime()
+        holds = SeatHold.objects.filter(ticket_id__in=ticket_ids)
+        check_holds(client_id, holds, now)
+        debit(client_id, sum(ticket.price for ticket in tickets), now)
+        Ticket.objects.filter(id__in=ticket_ids).update(client_id=client_id, modified=now)
+        holds.delete()
+        inventory.sell(show, len(tickets))
+        availability.on_sold(show, *ticket_ids)
+    for ticket in tickets:
+        ticket.client_id = client_id
+        ticket.modified = now
+    return tickets
@@ -0,0 +1,102 @@
+"""Database router sending the reads to the replicas and everything else to the primary."""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# apps whose rows are read right after being written by the same request
+PRIMARY_APPS = frozenset(('sessions',))
+
+_use_primary = ContextVar('use_primary', default=False)
+
+
+@contextmanager
+def primary(enabled: bool = True):
+    """
+    Send the reads of the current context to the primary database.
+
+    Works as a decorator of the views as well.
+
+    Args:
+        enabled (bool): False leaves the routing as it is.
+
+    Yields:
+        None
+    """
+    token = _use_primary.set(_use_primary.get() or enabled)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Route the reads to a random replica from settings.DATABASE_REPLICAS.
+
+    Reads stay on the primary inside primary(), inside a transaction of the primary,
+    so the locking reads and the reads after a write see the same data, and for the
+    apps from PRIMARY_APPS. All writes and migrations go to the primary.
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        """
+        Choose the database of the read.
+
+        Args:
+            model (type[Model]): The model read.
+            hints: Routing hints.
+
+        Returns:
+            str | None: Alias of a replica or None for the primary.
+        """
+        if not settings.DATABASE_REPLICAS or _use_primary.get():
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in PRIMARY_APPS or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)  # noqa: S311
+
+    def db_for_write(self, model, **hints) -> str:
+        """
+        Choose the database of the write.
+
+        Args:
+            model (type[Model]): The model written.
+            hints: Routing hints.
+
+        Returns:
+            str: The primary database.
+        """
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        """
+        Allow relations between the objects of the primary and the replicas.
+
+        Args:
+            obj1 (Model): First object.
+            obj2 (Model): Second object.
+            hints: Routing hints.
+
+        Returns:
+            bool: True, the replicas hold the same data.
+        """
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        """
+        Migrate only the primary, the replicas copy it.
+
+        Args:
+            db (str): Alias of the database.
+            app_label (str): Label of the migrated app.
+            model_name (str | None): Name of the migrated model.
+            hints: Routing hints.
+
+        Returns:
+            bool: True for the primary.
+        """
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,33 @@
+"""Feed of the upcoming performances."""
+
+from datetime import date
+
+from django.db.models import QuerySet
+
+from .models import Performance, get_datetime
+
+FEED_ORDERING = ('date', 'title')
+
+
+def upcoming(start: date | None = None, end: date | None = None, theater=None) -> QuerySet:
+    """
+    Get the performances from the date range which did not take place yet, soonest first.
+
+    The range scan and the ordering are both served by the performance_date_idx index,
+    so past performances cost nothing however many of them are kept.
+
+    Args:
+        start (date | None): First date of the range, today by default and at the earliest.
+        end (date | None): Last date of the range, unbounded by default.
+        theater (Theater | UUID | None): Only the performances shown in the theater.
+
+    Returns:
+        QuerySet: The performances.
+    """
+    today = get_datetime().date()
+    performances = Performance.objects.filter(date__gte=max(start or today, today))
+    if end is not None:
+        performances = performances.filter(date__lte=end)
+    if theater is not None:
+        performances = performances.filter(theaters=theater)
+    return performances.order_by(*FEED_ORDERING)
@@ -0,0 +1,80 @@
+"""Full-text search over the theaters and the performances."""
+
+import re
+from functools import cache
+
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+
+from .models import SEARCH_CONFIG
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+@cache
+def trigram_enabled() -> bool:
+    """
+    Check if the pg_trgm extension is installed, it is optional for the search.
+
+    Returns:
+        bool: True if the trigram similarity can be used.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+async def atrigram_enabled() -> bool:
+    """
+    Check if the pg_trgm extension is installed from an async view, see trigram_enabled().
+
+    Returns:
+        bool: True if the trigram similarity can be used.
+    """
+    return await sync_to_async(trigram_enabled)()
+
+
+def build_query(text: str, prefix: bool = False) -> SearchQuery:
+    """
+    Build the full-text query from the user input.
+
+    Args:
+        text (str): Search text in the web search syntax.
+        prefix (bool): Match every word as a prefix, for the typeahead.
+
+    Returns:
+        SearchQuery: The query.
+    """
+    if prefix:
+        words = ' & '.join(f'{word}:*' for word in WORD_RE.findall(text))
+        return SearchQuery(words, config=SEARCH_CONFIG, search_type='raw')
+    return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+
+def search(queryset: QuerySet, text: str, prefix: bool = False, trigram: bool = False) -> QuerySet:
+    """
+    Find the records matching the text, the most relevant first.
+
+    The stored search_vector column is matched through its GIN index. With the trigram
+    similarity, titles similar to the text are found as well, so typos are forgiven.
+
+    Args:
+        queryset (QuerySet): Theaters or performances to search.
+        text (str): Search text.
+        prefix (bool): Match every word as a prefix, for the typeahead.
+        trigram (bool): Use the trigram similarity, see trigram_enabled().
+
+    Returns:
+        QuerySet: Matching records annotated with the 'rank'.
+    """
+    if not WORD_RE.search(text):
+        return queryset.none()
+    query = build_query(text, prefix)
+    condition = Q(search_vector=query)
+    rank = SearchRank(F('search_vector'), query)
+    if trigram:
+        condition |= Q(title__trigram_word_similar=text)
+        rank += TrigramWordSimilarity(text, 'title')
+    return queryset.annotate(rank=rank).filter(condition).order_by('-rank', 'pk')
@@ -0,0 +1,322 @@
+"""Bulk import of the theaters, performances and shows of a season from CSV or JSON files."""
+
+import csv
+import json
+import time
+from pathlib import Path
+from types import MappingProxyType
+from uuid import UUID, uuid4
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import conditional, counters
+from .models import Performance, Theater, TheaterPerformance, get_datetime
+
+DEFAULT_BATCH_SIZE = 1000
+FIELDS = MappingProxyType({
+    Theater: ('title', 'address', 'rating'),
+    Performance: ('title', 'description', 'date'),
+})
+# rows without an id update the record with the same natural key
+NATURAL_KEYS = MappingProxyType({
+    Theater: ('title', 'address'),
+    Performance: ('title', 'date'),
+})
+
+
+def read_rows(path: str) -> list[dict]:
+    """
+    Read the rows of a CSV file with a header or of a JSON list of objects.
+
+    Args:
+        path (str): Path to the file, the format is chosen by the extension.
+
+    Returns:
+        list[dict]: The rows.
+
+    Raises:
+        ValueError: If the file format is not supported or the JSON is not a list of objects.
+    """
+    path = Path(path)
+    with open(path, encoding='utf-8', newline='') as rows_file:
+        if path.suffix == '.csv':
+            return list(csv.DictReader(rows_file))
+        if path.suffix == '.json':
+            rows = json.load(rows_file)
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError(f'{path} is not a JSON list of objects')
+            return rows
+    raise ValueError(f'{path} is neither a .csv nor a .json file')
+
+
+def clean_value(field, raw):
+    """
+    Clean the raw value with the validators of the field.
+
+    Blank values get the default of the field, blank ids are left for assign_ids().
+
+    Args:
+        field (Field): Field of the model.
+        raw: Raw value of the row.
+
+    Returns:
+        Cleaned value, None for a blank id.
+    """
+    if raw is not None and raw != '':
+        return field.clean(raw, None)
+    if field.primary_key:
+        return None
+    if field.has_default():
+        return field.get_default()
+    return field.clean(raw, None)
+
+
+def clean_rows(model, rows: list[dict]) -> tuple[dict[int, dict], dict[int, dict]]:
+    """
+    Validate the rows with the validators of the model fields.
+
+    Every field is looked up once for all the rows, no queries are made.
+
+    Args:
+        model (type): Theater or Performance.
+        rows (list[dict]): Raw rows.
+
+    Returns:
+        tuple[dict[int, dict], dict[int, dict]]: Cleaned valid rows and the errors
+            of the rejected rows, both by row number starting from 1.
+    """
+    fields = [model._meta.get_field(name) for name in ('id', *FIELDS[model])]
+    valid, rejected = {}, {}
+    for number, row in enumerate(rows, start=1):
+        cleaned, errors = {}, {}
+        for field in fields:
+            try:
+                cleaned[field.name] = clean_value(field, row.get(field.name))
+            except ValidationError as error:
+                errors[field.name] = error.messages
+        if errors:
+            rejected[number] = errors
+        else:
+            valid[number] = cleaned
+    return valid, rejected
+
+
+def reject_duplicates(model, rows: dict[int, dict], rejected: dict[int, dict]) -> None:
+    """
+    Reject the rows repeating the id or the natural key of an earlier row.
+
+    One upsert can not change a record twice, so only the first of such rows is kept.
+    Runs after assign_ids(), so the rows without an id are compared by the id
+    they were given as well.
+
+    Args:
+        model (type): Theater or Performance.
+        rows (dict[int, dict]): Cleaned rows with ids by row number, changed in place.
+        rejected (dict[int, dict]): Errors of the rejected rows by row number, changed in place.
+    """
+    key = NATURAL_KEYS[model]
+    seen_ids, seen_keys = {}, {}
+    for number, row in list(rows.items()):
+        natural_key = tuple(row[name] for name in key)
+        duplicated, first = 'id', seen_ids.get(row['id'])
+        if first is None:
+            duplicated, first = ', '.join(key), seen_keys.get(natural_key)
+        if first is None:
+            seen_ids[row['id']] = number
+            seen_keys[natural_key] = number
+        else:
+            rejected[number] = {duplicated: [f'duplicate of row {first}']}
+            del rows[number]  # noqa: WPS420
+
+
+def assign_ids(model, rows: list[dict]) -> None:
+    """
+    Give the rows without an id the id of the record with the same natural key, or a new one.
+
+    Rows repeating a natural key get the same id, see reject_duplicates().
+
+    Args:
+        model (type): Theater or Performance.
+        rows (list[dict]): Cleaned rows, changed in place.
+    """
+    key = NATURAL_KEYS[model]
+    missing = [row for row in rows if row['id'] is None]
+    if not missing:
+        return
+    existing = model.objects.filter(title__in={row['title'] for row in missing}).values_list(
+        *key, 'id',
+    )
+    ids = {tuple(record[:-1]): record[-1] for record in existing}
+    for row in missing:
+        row['id'] = ids.get(tuple(row[name] for name in key)) or uuid4()
+        ids[tuple(row[name] for name in key)] = row['id']
+
+
+def upsert(model, rows: list[dict], batch_size: int) -> list:
+    """
+    Insert the new records and update the existing ones by id in batches.
+
+    Args:
+        model (type): Theater or Performance.
+        rows (list[dict]): Cleaned rows with ids.
+        batch_size (int): Number of records written by one query.
+
+    Returns:
+        list: IDs of the written records.
+    """
+    now = get_datetime()
+    model.objects.bulk_create(
+        (model(**row, created=now, modified=now) for row in rows),
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['id'],
+        update_fields=[*FIELDS[model], 'modified'],
+    )
+    counters.invalidate(model)
+    return [row['id'] for row in rows]
+
+
+def resolve(model, references: set[str]) -> dict[str, UUID | str]:
+    """
+    Resolve the references to the records by id or by unique title with two queries.
+
+    Args:
+        model (type): Theater or Performance.
+        references (set[str]): IDs or titles.
+
+    Returns:
+        dict[str, UUID | str]: IDs by reference, or the error for unresolved ones.
+    """
+    ids, titles = {}, set()
+    for reference in references:
+        try:
+            ids[reference] = UUID(str(reference))
+        except ValueError:
+            titles.add(reference)
+    found = set(model.objects.filter(id__in=ids.values()).values_list('id', flat=True))
+    resolved = {raw_id: pk if pk in found else 'does not exist' for raw_id, pk in ids.items()}
+    resolved.update(dict.fromkeys(titles, 'does not exist'))
+    for title, pk in model.objects.filter(title__in=titles).values_list('title', 'id'):
+        resolved[title] = pk if resolved[title] == 'does not exist' else 'is ambiguous'
+    return resolved
+
+
+def show_errors(row: dict, link: dict[str, UUID | str]) -> dict[str, list[str]]:
+    """
+    Get the errors of the unresolved references of the show row.
+
+    Args:
+        row (dict): Raw row of the show.
+        link (dict[str, UUID | str]): IDs or errors of the references by name.
+
+    Returns:
+        dict[str, list[str]]: Errors by reference name, empty for a valid row.
+    """
+    errors = {}
+    for name, resolved in link.items():
+        if not isinstance(resolved, UUID):
+            reference = repr(row.get(name))
+            errors[name] = [f'{reference} {resolved}']
+    return errors
+
+
+def create_shows(shows: set[tuple[UUID, UUID]], batch_size: int) -> None:
+    """
+    Create the links of the theaters to the performances, existing links are kept.
+
+    Args:
+        shows (set[tuple[UUID, UUID]]): Pairs of the theater and the performance IDs.
+        batch_size (int): Number of links written by one query.
+    """
+    TheaterPerformance.objects.bulk_create(
+        (
+            TheaterPerformance(theater_id=theater, performance_id=performance)
+            for theater, performance in shows
+        ),
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    conditional.touch_shows(
+        {theater for theater, _ in shows}, {performance for _, performance in shows},
+    )
+
+
+def import_shows(rows: list[dict], batch_size: int) -> tuple[int, dict[int, dict]]:
+    """
+    Link the theaters to the performances, existing links are kept.
+
+    Args:
+        rows (list[dict]): Rows with the 'theater' and the 'performance' id or unique title.
+        batch_size (int): Number of links written by one query.
+
+    Returns:
+        tuple[int, dict[int, dict]]: Number of the valid links and the errors
+            of the rejected rows by row number.
+    """
+    references = {
+        name: resolve(model, {str(row.get(name) or '') for row in rows})
+        for name, model in (('theater', Theater), ('performance', Performance))
+    }
+    shows, rejected = {}, {}
+    for number, row in enumerate(rows, start=1):
+        link = {name: references[name][str(row.get(name) or '')] for name in references}
+        errors = show_errors(row, link)
+        if errors:
+            rejected[number] = errors
+        else:
+            shows[(link['theater'], link['performance'])] = number
+    create_shows(set(shows), batch_size)
+    return len(shows), rejected
+
+
+def import_season(
+    theaters: list[dict] | None = None,
+    performances: list[dict] | None = None,
+    shows: list[dict] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+) -> dict[str, dict]:
+    """
+    Import the rows of a season in one transaction, invalid rows are skipped.
+
+    Args:
+        theaters (list[dict] | None): Rows of the theaters.
+        performances (list[dict] | None): Rows of the performances.
+        shows (list[dict] | None): Rows of the links, they may refer to the imported records.
+        batch_size (int): Number of records written by one query.
+        dry_run (bool): Validate and roll the import back.
+
+    Returns:
+        dict[str, dict]: Report by kind with the number of 'rows', 'imported' rows,
+            the 'rejected' rows and the 'seconds' spent.
+    """
+    report = {}
+    records = (('theaters', Theater, theaters), ('performances', Performance, performances))
+    with transaction.atomic():
+        for kind, model, rows in records:
+            if rows is None:
+                continue
+            start = time.perf_counter()
+            valid, rejected = clean_rows(model, rows)
+            assign_ids(model, list(valid.values()))
+            reject_duplicates(model, valid, rejected)
+            upsert(model, list(valid.values()), batch_size)
+            report[kind] = {
+                'rows': len(rows),
+                'imported': len(valid),
+                'rejected': rejected,
+                'seconds': time.perf_counter() - start,
+            }
+        if shows is not None:
+            start = time.perf_counter()
+            imported, rejected = import_shows(shows, batch_size)
+            report['shows'] = {
+                'rows': len(shows),
+                'imported': imported,
+                'rejected': rejected,
+                'seconds': time.perf_counter() - start,
+            }
+        if dry_run:
+            transaction.set_rollback(True)
+    return report
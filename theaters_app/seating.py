@@ -0,0 +1,138 @@
+"""Bulk generation of show tickets from a seat map."""
+
+import datetime
+from collections import deque
+from decimal import Decimal
+from typing import Iterator
+
+from django.db import transaction
+
+from . import availability, counters, inventory
+from .models import TheaterPerformance, Ticket, get_datetime
+
+DEFAULT_BATCH_SIZE = 5000
+MAX_BATCH_SIZE = 10000
+ROW_MAX_LENGTH = 20
+ROW_MAX_SEATS = 1000
+TIER_MAX_LENGTH = 50
+
+
+def seat_places(
+    seat_map: list[dict],
+    price_tiers: dict[str, Decimal],
+) -> list[tuple[str, Decimal]]:
+    """
+    Expand the seat map into the places and prices of the tickets.
+
+    Args:
+        seat_map (list[dict]): Rows of the hall with the 'row' name, 'seats' and price 'tier'.
+        price_tiers (dict[str, Decimal]): Prices by tier name.
+
+    Returns:
+        list[tuple[str, Decimal]]: Places in the '<row>-<seat>' form with their prices.
+    """
+    return [
+        (f'{row["row"]}-{seat}', price_tiers[row['tier']])
+        for row in seat_map
+        for seat in range(1, row['seats'] + 1)
+    ]
+
+
+def new_places(
+    theater_performance: TheaterPerformance,
+    seats: list[tuple[str, Decimal]],
+) -> list[tuple[str, Decimal]]:
+    """
+    Drop the places which already have a ticket of the show.
+
+    Args:
+        theater_performance (TheaterPerformance): The show.
+        seats (list[tuple[str, Decimal]]): Places and prices, see seat_places().
+
+    Returns:
+        list[tuple[str, Decimal]]: Places without a ticket and their prices.
+    """
+    existing = set(
+        Ticket.objects.filter(theater_performance=theater_performance).values_list(
+            'place', flat=True,
+        ),
+    )
+    return [(place, price) for place, price in seats if place not in existing]
+
+
+def generate_tickets(
+    theater_performance_id,
+    seats: list[tuple[str, Decimal]],
+    time: datetime.time,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[dict[str, int]]:
+    """
+    Create tickets of the show in batches inside one transaction.
+
+    Places which already have a ticket are skipped, so the generation can be repeated
+    after the seat map is extended. The show row is locked for the whole transaction
+    to keep concurrent generations from creating duplicates. The transaction stays open
+    while the caller handles a progress line, so it must not wait for the network
+    meanwhile, see create_tickets().
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        seats (list[tuple[str, Decimal]]): Places and prices, see seat_places().
+        time (datetime.time): Time of the show printed on the tickets.
+        batch_size (int): Number of tickets inserted by one query.
+
+    Yields:
+        dict[str, int]: Progress with the number of 'created' tickets, the 'total'
+            number of new tickets and the number of 'skipped' existing places.
+    """
+    with transaction.atomic():
+        theater_performance = TheaterPerformance.objects.select_for_update().get(
+            id=theater_performance_id,
+        )
+        new_seats = new_places(theater_performance, seats)
+        progress = {'created': 0, 'total': len(new_seats), 'skipped': len(seats) - len(new_seats)}
+        now = get_datetime()
+        for start in range(0, len(new_seats), batch_size):
+            batch = new_seats[start:start + batch_size]
+            Ticket.objects.bulk_create(
+                Ticket(
+                    price=price,
+                    time=time,
+                    place=place,
+                    theater_performance=theater_performance,
+                    created=now,
+                    modified=now,
+                )
+                for place, price in batch
+            )
+            progress['created'] += len(batch)
+            yield dict(progress)
+        if new_seats:
+            prices = [price for _, price in new_seats]
+            inventory.add_tickets(theater_performance.id, len(new_seats), min(prices), max(prices))
+        else:
+            yield dict(progress)
+        counters.invalidate(Ticket)
+        availability.invalidate(theater_performance.id)
+
+
+def create_tickets(
+    theater_performance_id,
+    seats: list[tuple[str, Decimal]],
+    time: datetime.time,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, int]:
+    """
+    Create tickets of the show and commit them before returning, see generate_tickets().
+
+    Args:
+        theater_performance_id (UUID): ID of the show.
+        seats (list[tuple[str, Decimal]]): Places and prices, see seat_places().
+        time (datetime.time): Time of the show printed on the tickets.
+        batch_size (int): Number of tickets inserted by one query.
+
+    Returns:
+        dict[str, int]: The last progress line.
+    """
+    progress = generate_tickets(theater_performance_id, seats, time, batch_size)
+    return deque(progress, maxlen=1).pop()
@@ -1,8 +1,13 @@
 """Module with serializers for different models."""
 
+from decimal import Decimal
+
+from django.db import transaction
 from rest_framework import serializers
 
-from .models import Performance, Theater, Ticket
+from . import export, inventory, seating
+from .config import BASKET_MAX_TICKETS
+from .models import Client, Performance, Theater, TheaterPerformance, Ticket
 
 
 class TheaterSerialazer(serializers.HyperlinkedModelSerializer):
@@ -12,7 +17,7 @@ class TheaterSerialazer(serializers.HyperlinkedModelSerializer):
         """Meta class."""
 
         model = Theater
-        fields = '__all__'
+        exclude = ('search_vector',)
 
 
 class PerformanceSerialazer(serializers.HyperlinkedModelSerializer):
@@ -22,14 +27,187 @@ class PerformanceSerialazer(serializers.HyperlinkedModelSerializer):
         """Meta class."""
 
         model = Performance
-        fields = '__all__'
+        exclude = ('search_vector',)
+
+
+class TicketStatsMixin:
+    """Mixin of the ticket serializers keeping the statistics of the shows on updates."""
 
+    def update(self, instance, validated_data):
+        """
+        Update the ticket and move it in the statistics of its shows.
 
-class TicketSerialazer(serializers.HyperlinkedModelSerializer):
+        Args:
+            instance (Ticket): The updated ticket.
+            validated_data (dict): Validated fields.
+
+        Returns:
+            Ticket: The saved ticket.
+        """
+        previous = (instance.theater_performance_id, instance.client_id is not None, instance.price)
+        with transaction.atomic():
+            ticket = super().update(instance, validated_data)
+            inventory.move_ticket(ticket, *previous)
+        return ticket
+
+
+class TicketSerialazer(TicketStatsMixin, serializers.HyperlinkedModelSerializer):
     """Serializer for the Ticket model."""
 
+    # there are no API endpoints to link shows and clients to, so they are given by id
+    theater_performance = serializers.PrimaryKeyRelatedField(
+        queryset=TheaterPerformance.objects.all(), allow_null=True, required=False,
+    )
+    client = serializers.PrimaryKeyRelatedField(
+        queryset=Client.objects.all(), allow_null=True, required=False,
+    )
+
     class Meta:
         """Meta class."""
 
         model = Ticket
         fields = '__all__'
+
+
+class TheaterCompactSerialazer(serializers.ModelSerializer):
+    """Serializer for the Theater model with plain ids instead of hyperlinks."""
+
+    class Meta:
+        """Meta class."""
+
+        model = Theater
+        exclude = ('search_vector',)
+
+
+class PerformanceCompactSerialazer(serializers.ModelSerializer):
+    """Serializer for the Performance model with plain ids instead of hyperlinks."""
+
+    class Meta:
+        """Meta class."""
+
+        model = Performance
+        exclude = ('search_vector',)
+
+
+class TicketCompactSerialazer(TicketStatsMixin, serializers.ModelSerializer):
+    """Serializer for the Ticket model with plain ids instead of hyperlinks."""
+
+    class Meta:
+        """Meta class."""
+
+        model = Ticket
+        fields = '__all__'
+
+
+class TheaterSearchSerialazer(serializers.ModelSerializer):
+    """Serializer for a theater found by the search."""
+
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        """Meta class."""
+
+        model = Theater
+        fields = ('id', 'title', 'address', 'rating', 'rank')
+
+
+class PerformanceSearchSerialazer(serializers.ModelSerializer):
+    """Serializer for a performance found by the search."""
+
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        """Meta class."""
+
+        model = Performance
+        fields = ('id', 'title', 'date', 'rank')
+
+
+class UpcomingFilterSerializer(serializers.Serializer):
+    """Serializer for the filters of the upcoming performances feed."""
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    theater = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        """
+        Check that the date range is not empty.
+
+        Args:
+            attrs (dict): Validated fields.
+
+        Returns:
+            dict: Validated fields.
+
+        Raises:
+            ValidationError: If the range ends before it starts.
+        """
+        if 'start' in attrs and 'end' in attrs and attrs['end'] < attrs['start']:
+            raise serializers.ValidationError({'end': 'the range ends before it starts'})
+        return attrs
+
+
+class TicketExportSerializer(UpcomingFilterSerializer):
+    """Serializer for the filters and the format of the ticket export."""
+
+    output = serializers.ChoiceField(choices=tuple(export.FORMATS), default='csv')
+    sold = serializers.BooleanField(default=False)
+    chunk_size = serializers.IntegerField(
+        min_value=1, max_value=export.MAX_CHUNK_SIZE, default=export.DEFAULT_CHUNK_SIZE,
+    )
+
+
+class SeatRowSerializer(serializers.Serializer):
+    """Serializer for a row of the hall seat map."""
+
+    row = serializers.CharField(max_length=seating.ROW_MAX_LENGTH)
+    seats = serializers.IntegerField(min_value=1, max_value=seating.ROW_MAX_SEATS)
+    tier = serializers.CharField(max_length=seating.TIER_MAX_LENGTH)
+
+
+class TicketsGenerationSerializer(serializers.Serializer):
+    """Serializer for the bulk generation of show tickets."""
+
+    theater_performance = serializers.PrimaryKeyRelatedField(
+        queryset=TheaterPerformance.objects.all(),
+    )
+    time = serializers.TimeField()
+    seat_map = SeatRowSerializer(many=True, allow_empty=False)
+    price_tiers = serializers.DictField(
+        child=serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal(0)),
+        allow_empty=False,
+    )
+    batch_size = serializers.IntegerField(
+        min_value=1, max_value=seating.MAX_BATCH_SIZE, default=seating.DEFAULT_BATCH_SIZE,
+    )
+
+    def validate(self, attrs):
+        """
+        Check that every row has a known price tier and rows are not repeated.
+
+        Args:
+            attrs (dict): Validated fields.
+
+        Returns:
+            dict: Validated fields.
+
+        Raises:
+            ValidationError: If the seat map is inconsistent.
+        """
+        rows = [row['row'] for row in attrs['seat_map']]
+        if len(rows) != len(set(rows)):
+            raise serializers.ValidationError({'seat_map': 'rows are repeated'})
+        unknown = {row['tier'] for row in attrs['seat_map']} - set(attrs['price_tiers'])
+        if unknown:
+            tiers = ', '.join(sorted(unknown))
+            raise serializers.ValidationError({'seat_map': f'unknown price tiers: {tiers}'})
+        return attrs
+
+
+class BasketSerializer(serializers.Serializer):
+    """Serializer for the tickets of a basket purchase."""
+
+    tickets = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=BASKET_MAX_TICKETS,
+    )
@@ -0,0 +1,212 @@
+"""Signal receivers keeping cached data in sync with the models."""
+
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import authentication, availability, conditional, counters, inventory, middleware
+from .models import Performance, Theater, TheaterPerformance, Ticket
+
+# deleting these models deletes the shows and their tickets by cascade
+SHOW_OWNERS = (Theater, Performance, TheaterPerformance)
+# actions of m2m_changed which change the shows
+SHOW_ACTIONS = frozenset(('post_add', 'post_remove', 'pre_clear'))
+
+
+def deleted_with_show(origin) -> bool:
+    """
+    Check that the ticket is deleted by the cascade of its show.
+
+    The statistics and the availability of the deleted show are not updated
+    ticket by ticket then, see forget_show_tickets().
+
+    Args:
+        origin (Model | QuerySet | None): Origin of the deletion.
+
+    Returns:
+        bool: True if a theater, a performance or a show is deleted.
+    """
+    model = getattr(origin, 'model', type(origin))
+    return issubclass(model, SHOW_OWNERS)
+
+
+@receiver(post_save, sender=Theater)
+@receiver(post_save, sender=Performance)
+@receiver(post_save, sender=Ticket)
+def count_created(sender, created, **kwargs):
+    """
+    Increment the homepage counter when a record is created.
+
+    Args:
+        sender (type): Model class.
+        created (bool): True if a new record was created.
+        kwargs: Other signal arguments.
+    """
+    if created:
+        counters.increment(sender)
+
+
+@receiver(post_delete, sender=Theater)
+@receiver(post_delete, sender=Performance)
+@receiver(post_delete, sender=Ticket)
+def count_deleted(sender, origin=None, **kwargs):
+    """
+    Decrement the homepage counter when a record is deleted.
+
+    Args:
+        sender (type): Model class.
+        origin (Model | QuerySet | None): Origin of the deletion.
+        kwargs: Other signal arguments.
+    """
+    if sender is not Ticket or not deleted_with_show(origin):
+        counters.increment(sender, -1)
+
+
+@receiver(pre_delete, sender=TheaterPerformance)
+def forget_show_tickets(instance, **kwargs):
+    """
+    Uncount the tickets of the deleted show at once instead of ticket by ticket.
+
+    Args:
+        instance (TheaterPerformance): The deleted show.
+        kwargs: Other signal arguments.
+    """
+    if instance.tickets_total:
+        counters.increment(Ticket, -instance.tickets_total)
+    availability.invalidate(instance.id)
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+def reset_availability(instance, origin=None, **kwargs):
+    """
+    Drop the cached seat availability of the show when its ticket is changed.
+
+    Args:
+        instance (Ticket): The changed ticket.
+        origin (Model | QuerySet | None): Origin of the deletion.
+        kwargs: Other signal arguments.
+    """
+    if not deleted_with_show(origin):
+        availability.invalidate(instance.theater_performance_id)
+
+
+@receiver(post_save, sender=Ticket)
+def count_show_ticket(instance, created, **kwargs):
+    """
+    Count the ticket created one by one in the statistics of its show.
+
+    Args:
+        instance (Ticket): The saved ticket.
+        created (bool): True if a new record was created.
+        kwargs: Other signal arguments.
+    """
+    if created:
+        inventory.add_tickets(
+            instance.theater_performance_id,
+            1,
+            instance.price,
+            instance.price,
+            sold=int(instance.client_id is not None),
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def uncount_show_ticket(instance, origin=None, **kwargs):
+    """
+    Remove the deleted ticket from the statistics of its show, unless the show is deleted.
+
+    Args:
+        instance (Ticket): The deleted ticket.
+        origin (Model | QuerySet | None): Origin of the deletion.
+        kwargs: Other signal arguments.
+    """
+    if deleted_with_show(origin):
+        return
+    inventory.remove_tickets(
+        instance.theater_performance_id, 1, sold=int(instance.client_id is not None),
+    )
+
+
+@receiver(post_save, sender=TheaterPerformance)
+@receiver(post_delete, sender=TheaterPerformance)
+def touch_show_relations(instance, **kwargs):
+    """
+    Bump the modified time of the theater and the performance of the changed show.
+
+    Args:
+        instance (TheaterPerformance): The changed show.
+        kwargs: Other signal arguments.
+    """
+    conditional.touch_shows((instance.theater_id,), (instance.performance_id,))
+
+
+@receiver(m2m_changed, sender=TheaterPerformance)
+def touch_related_shows(instance, action, model, pk_set, **kwargs):
+    """
+    Bump the modified time of both sides of the shows changed through the many-to-many fields.
+
+    Args:
+        instance (Theater | Performance): The object whose relation is changed.
+        action (str): Kind of the change.
+        model (type): Class of the related objects.
+        pk_set (set | None): IDs of the added or removed related objects.
+        kwargs: Other signal arguments.
+    """
+    if action not in SHOW_ACTIONS:
+        return
+    if action == 'pre_clear':
+        own, other = ('theater_id', 'performance_id')
+        if not isinstance(instance, Theater):
+            own, other = other, own
+        pk_set = TheaterPerformance.objects.filter(**{own: instance.id}).values_list(
+            other, flat=True,
+        )
+    conditional.touch(type(instance), instance.id)
+    conditional.touch(model, *pk_set)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def reset_cached_token(instance, **kwargs):
+    """
+    Drop the cached token when it is changed or deleted.
+
+    Args:
+        instance (Token): The changed token.
+        kwargs: Other signal arguments.
+    """
+    authentication.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def reset_user_tokens(instance, created, update_fields, **kwargs):
+    """
+    Drop the cached tokens of the changed user, a login alone changes nothing cached.
+
+    The tokens of a deleted user are deleted with it and dropped by reset_cached_token().
+
+    Args:
+        instance (User): The changed user.
+        created (bool): True if a new record was created.
+        update_fields (frozenset | None): Saved fields.
+        kwargs: Other signal arguments.
+    """
+    if created or update_fields == {'last_login'}:
+        return
+    authentication.invalidate(*Token.objects.filter(user=instance).values_list('key', flat=True))
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """
+    Let the query instrumentation middleware record the queries of the new connection.
+
+    Args:
+        sender (type): Class of the database wrapper.
+        connection (BaseDatabaseWrapper): The connection.
+        kwargs: Other signal arguments.
+    """
+    middleware.install_query_collector(connection)
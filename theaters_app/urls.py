@@ -25,7 +25,16 @@ urlpatterns = [
     path('performances/', views.PerformanceListView.as_view(), name='performances'),
     path('performance/<uuid:performance_id>', views.performance_view, name='performance'),
     path('ticket/<uuid:ticket_id>', views.ticket_view, name='ticket'),
+    path('upcoming/', views.upcoming_view, name='upcoming'),
+    path('search/', views.search_view, name='search'),
 
+    path(
+        'api/availability/<uuid:theater_performance_id>/',
+        views.availability_view,
+        name='availability',
+    ),
+    path('api/search/', views.search_api_view, name='search-api'),
+    path('api/auth-cache/', views.auth_cache_view, name='auth-cache'),
     path('api/', include(router.urls)),
     path('token/', obtain_auth_token),
 ]
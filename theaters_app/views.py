@@ -1,19 +1,56 @@
 """Contains views for rendering HTML templates and processing user requests."""
 
-from typing import Any
+import base64
+from types import MappingProxyType
 
-from django.contrib.auth import decorators, mixins
+from django.conf import settings
+from django.contrib.auth import decorators
 from django.core import paginator as django_paginator
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.generic import ListView
-from rest_framework import permissions, viewsets
-
+from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.response import Response
+
+from . import (
+    authentication,
+    availability,
+    conditional,
+    counters,
+    export,
+    holds,
+    page_cache,
+    purchase,
+    routers,
+    schedule,
+    search,
+    seating,
+)
+from .config import SEARCH_MAX_LIMIT, SEARCH_RESULTS_LIMIT, TICKETS_PAGE_SIZE
+from .decorators import acondition, aload_user, alogin_required
 from .forms import AddFundsForm, RegistrationForm
-from .models import Client, Performance, Theater, TheaterPerformance, Ticket
-from .serializers import PerformanceSerialazer, TheaterSerialazer, TicketSerialazer
-
-
-def main(request):
+from .models import Client, Performance, SeatHold, Theater, TheaterPerformance, Ticket
+from .pagination import KeysetPaginator, aget_numbered_page
+from .serializers import (
+    BasketSerializer,
+    PerformanceCompactSerialazer,
+    PerformanceSearchSerialazer,
+    PerformanceSerialazer,
+    TheaterCompactSerialazer,
+    TheaterSearchSerialazer,
+    TheaterSerialazer,
+    TicketCompactSerialazer,
+    TicketExportSerializer,
+    TicketsGenerationSerializer,
+    TicketSerialazer,
+    UpcomingFilterSerializer,
+)
+
+
+@aload_user
+async def main(request):
     """
     View function for rendering the homepage.
 
@@ -23,13 +60,14 @@ def main(request):
     Returns:
         HttpResponse: Rendered HTML template.
     """
+    theaters, performances, tickets = await counters.acounts(Theater, Performance, Ticket)
     return render(
         request=request,
         template_name='index.html',
         context={
-            'theaters': Theater.objects.count(),
-            'performances': Performance.objects.count(),
-            'tickets': Ticket.objects.count(),
+            'theaters': theaters,
+            'performances': performances,
+            'tickets': tickets,
         },
     )
 
@@ -61,6 +99,24 @@ def register(request):
     )
 
 
+def request_client(request) -> Client:
+    """
+    Get the client of the request set by ClientMiddleware.
+
+    Args:
+        request (HttpRequest): The request of an authenticated user.
+
+    Returns:
+        Client: The client.
+
+    Raises:
+        Http404: If the user has no client.
+    """
+    if not request.client:
+        raise Http404('The user has no client')
+    return request.client
+
+
 @decorators.login_required
 def profile(request):
     """
@@ -72,8 +128,20 @@ def profile(request):
     Returns:
         HttpResponse: Rendered HTML template.
     """
-    client = Client.objects.get(user=request.user)
-    tickets = Ticket.objects.filter(client_id=client.id)
+    client = request_client(request)
+    tickets = Ticket.objects.filter(client_id=client.id).select_related(
+        'theater_performance__theater',
+        'theater_performance__performance',
+    ).only(
+        'id',
+        'place',
+        'theater_performance__theater__title',
+        'theater_performance__performance__title',
+        'theater_performance__performance__date',
+    )
+    page_obj = django_paginator.Paginator(tickets, TICKETS_PAGE_SIZE).get_page(
+        request.GET.get('page'),
+    )
 
     if request.method == 'POST':
         form = AddFundsForm(request.POST)
@@ -89,7 +157,9 @@ def profile(request):
         template_name='pages/profile.html',
         context={
             'client': client,
-            'tickets': tickets,
+            'tickets': page_obj,
+            'page_obj': page_obj,
+            'is_paginated': page_obj.has_other_pages(),
             'form': form,
         },
     )
@@ -97,7 +167,12 @@ def profile(request):
 
 def create_list_view(model_class, plural_name, template):
     """
-    Create a ListView with pagination for a given model class.
+    Create a ListView with keyset pagination for a given model class.
+
+    Pages are addressed by an opaque cursor in the query string, so deep pages cost
+    the same as the first one and no COUNT query is made. The view is asynchronous,
+    the page is fetched with the async ORM. The ETag of the page is computed from the
+    modified times of its records, so a fresh page is not rendered again.
 
     Args:
         model_class (type): class of the model
@@ -107,22 +182,32 @@ def create_list_view(model_class, plural_name, template):
     Returns:
         type: class, which is created dynamic
     """
-    class CustomListView(mixins.LoginRequiredMixin, ListView):
+    class CustomListView(ListView):
         """Class, which is created dynamic, for view list of some model."""
 
         model = model_class
         template_name = template
         paginate_by = 10
-        context_object_name = plural_name
-
-        def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
-            context = super().get_context_data(**kwargs)
-            instances = model_class.objects.all()
-            paginator = django_paginator.Paginator(instances, 10)
-            page = self.request.GET.get('page')
-            page_obj = paginator.get_page(page)
-            context[f'{plural_name}_list'] = page_obj
-            return context
+        context_object_name = f'{plural_name}_list'
+
+        @classmethod
+        def as_view(cls, **initkwargs):
+            return alogin_required(super().as_view(**initkwargs))
+
+        async def get(self, request, *args, **kwargs):
+            self.paginator = KeysetPaginator(self.get_queryset(), self.paginate_by)
+            self.page = await self.paginator.aget_page(request.GET.get('cursor'))
+            self.object_list = self.page.object_list
+            etag, last_modified = conditional.page_state(
+                self.object_list, request.user.pk, self.page.next_cursor, self.page.previous_cursor,
+            )
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is None:
+                response = self.render_to_response(self.get_context_data())
+            return conditional.add_validators(request, response, etag, last_modified)
+
+        def paginate_queryset(self, queryset, page_size):
+            return self.paginator, self.page, self.page.object_list, self.page.has_other_pages()
 
     return CustomListView
 
@@ -132,8 +217,9 @@ PerformanceListView = create_list_view(Performance, 'performances', 'catalog/per
 TicketListView = create_list_view(Ticket, 'tickets', 'catalog/tickets.html')
 
 
-@decorators.login_required
-def theater_view(request, theater_id):
+@alogin_required
+@acondition(conditional.atheater_state)
+async def theater_view(request, theater_id):
     """
     View function for rendering the company detail page.
 
@@ -144,16 +230,19 @@ def theater_view(request, theater_id):
     Returns:
         HttpResponse: Rendered HTML template.
     """
-    theater = get_object_or_404(Theater, id=theater_id)
+    theater = await page_cache.aget(Theater, theater_id, request.page_version)
     context = {
         'theater': theater,
+        'cache_ttl': settings.PAGE_CACHE_TTL,
+        'page_version': request.page_version,
     }
 
     return render(request=request, template_name='entities/theater.html', context=context)
 
 
-@decorators.login_required
-def performance_view(request, performance_id):
+@alogin_required
+@acondition(conditional.aperformance_state)
+async def performance_view(request, performance_id):
     """
     View function for rendering the company detail page.
 
@@ -164,22 +253,114 @@ def performance_view(request, performance_id):
     Returns:
         HttpResponse: Rendered HTML template.
     """
-    performance = get_object_or_404(Performance, id=performance_id)
-    theater_performances = TheaterPerformance.objects.filter(performance_id=performance)
-
-    free_tickets = []
-    for t_p in theater_performances:
-        tickets = Ticket.objects.filter(theater_performance_id=t_p.id)
-        free_tickets += [ticket for ticket in tickets if not ticket.client]
+    performance = await page_cache.aget(Performance, performance_id, request.page_version)
+    shows = TheaterPerformance.objects.filter(performance_id=performance.id).select_related(
+        'theater',
+    )
+    free_tickets = Ticket.objects.filter(
+        theater_performance__performance_id=performance.id,
+        client__isnull=True,
+    ).select_related('theater_performance__theater')
+    page_obj = await aget_numbered_page(
+        django_paginator.Paginator(free_tickets, TICKETS_PAGE_SIZE),
+        request.GET.get('page'),
+    )
 
     context = {
         'performance': performance,
-        'tickets': free_tickets,
+        'cache_ttl': settings.PAGE_CACHE_TTL,
+        'page_version': request.page_version,
+        'shows': [show async for show in shows],
+        'tickets': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
     }
 
     return render(request=request, template_name='entities/performance.html', context=context)
 
 
+def search_results(text: str, prefix: bool, limit: int, trigram: bool) -> tuple:
+    """
+    Build the search queries of the theaters and the performances.
+
+    Args:
+        text (str): Search text.
+        prefix (bool): Match the words as prefixes, for the typeahead.
+        limit (int): Maximum number of records of every model.
+        trigram (bool): Use the trigram similarity.
+
+    Returns:
+        tuple: Querysets of the found theaters and performances.
+    """
+    theaters = Theater.objects.only('id', 'title', 'address', 'rating')
+    performances = Performance.objects.only('id', 'title', 'date')
+    return (
+        search.search(theaters, text, prefix, trigram)[:limit],
+        search.search(performances, text, prefix, trigram)[:limit],
+    )
+
+
+@alogin_required
+async def search_view(request):
+    """
+    View function for rendering the search page.
+
+    Args:
+        request: Request object.
+
+    Returns:
+        HttpResponse: Rendered HTML template.
+    """
+    text = request.GET.get('q', '').strip()
+    prefix = request.GET.get('prefix', '').lower() in TRUE_VALUES
+    theaters, performances = search_results(
+        text, prefix, SEARCH_RESULTS_LIMIT, await search.atrigram_enabled(),
+    )
+    context = {
+        'query': text,
+        'prefix': prefix,
+        'theaters': [theater async for theater in theaters],
+        'performances': [performance async for performance in performances],
+    }
+
+    return render(request=request, template_name='pages/search.html', context=context)
+
+
+@alogin_required
+async def upcoming_view(request):
+    """
+    View function for rendering the feed of the upcoming performances.
+
+    The feed is filtered by ?start, ?end and ?theater and paginated by a cursor.
+
+    Args:
+        request: Request object.
+
+    Returns:
+        HttpResponse: Rendered HTML template.
+    """
+    filters = UpcomingFilterSerializer(data=request.GET)
+    if filters.is_valid():
+        performances = schedule.upcoming(**filters.validated_data)
+    else:
+        performances = Performance.objects.none()
+    page_obj = await KeysetPaginator(performances, TICKETS_PAGE_SIZE).aget_page(
+        request.GET.get('cursor'),
+    )
+    query = request.GET.copy()
+    query.pop('cursor', None)
+    context = {
+        'performances': page_obj,
+        'filters': request.GET,
+        'errors': filters.errors,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'query': query.urlencode(),
+    }
+
+    return render(request=request, template_name='pages/upcoming.html', context=context)
+
+
 @decorators.login_required
 def ticket_view(request, ticket_id):
     """
@@ -193,7 +374,7 @@ def ticket_view(request, ticket_id):
         HttpResponse: Rendered HTML template.
     """
     ticket = get_object_or_404(Ticket, id=ticket_id)
-    client = Client.objects.get(user=request.user)
+    client = request_client(request)
     if ticket.theater_performance_id:
         theater_performance = TheaterPerformance.objects.get(id=ticket.theater_performance_id)
     else:
@@ -208,11 +389,82 @@ def ticket_view(request, ticket_id):
     return render(request=request, template_name='entities/ticket.html', context=context)
 
 
+HELD_ERROR = 'This ticket is held by another user, try again in a few minutes'
+HOLD_LIMIT_ERROR = 'You hold too many tickets already, buy or release some of them first'
+TAKEN_ERROR = 'This ticket has just been taken by another user'
+# details and statuses of the failed basket purchases by the error class
+BASKET_ERRORS = MappingProxyType({
+    purchase.SeatHeldError: (HELD_ERROR, status.HTTP_409_CONFLICT),
+    purchase.HoldLimitError: (HOLD_LIMIT_ERROR, status.HTTP_409_CONFLICT),
+    purchase.SeatTakenError: ('Some of the tickets are already sold', status.HTTP_409_CONFLICT),
+    purchase.MixedShowsError: (
+        'The tickets belong to different shows', status.HTTP_400_BAD_REQUEST,
+    ),
+    purchase.InsufficientFundsError: (
+        'Not enough money to buy the tickets', status.HTTP_400_BAD_REQUEST,
+    ),
+})
+
+
+def hold_for_page(client, ticket) -> tuple[SeatHold | None, str | None]:
+    """
+    Hold the free ticket for the client who asked for it on the buy page.
+
+    Args:
+        client (Client): The client.
+        ticket (Ticket): The ticket, refreshed if it has just been sold.
+
+    Returns:
+        tuple[SeatHold | None, str | None]: The hold, or the error if the ticket is held,
+            sold or being bought, or the client holds too many tickets.
+    """
+    try:
+        return holds.hold_ticket(client.id, ticket.id), None
+    except purchase.SeatHeldError:
+        return None, HELD_ERROR
+    except purchase.HoldLimitError:
+        return None, HOLD_LIMIT_ERROR
+    except purchase.SeatTakenError:
+        ticket.refresh_from_db()
+        return None, TAKEN_ERROR
+
+
+def purchase_for_page(client, ticket) -> tuple[bool, str | None]:
+    """
+    Buy the ticket for the client who posted the buy page.
+
+    Args:
+        client (Client): The client, refreshed if it can not pay.
+        ticket (Ticket): The ticket, refreshed if it has just been sold.
+
+    Returns:
+        tuple[bool, str | None]: Whether the ticket is bought, and the error if the ticket
+            is held or taken.
+    """
+    try:
+        purchase.purchase_ticket(client.id, ticket.id)
+    except purchase.SeatHeldError:
+        return False, HELD_ERROR
+    except purchase.SeatTakenError:
+        ticket.refresh_from_db()
+        return False, TAKEN_ERROR
+    except purchase.InsufficientFundsError:
+        client.refresh_from_db()
+        return False, None
+    return True, None
+
+
 @decorators.login_required
+@routers.primary()
 def buy(request, ticket_id):
     """
     Handle the ticket purchase process for authenticated users.
 
+    Posting the hold form holds the free ticket for the client for settings.SEAT_HOLD_MINUTES,
+    so other clients can not buy it meanwhile, opening the page does not hold anything.
+    The page reads from the primary database, so a ticket sold a moment ago is never
+    offered from a lagging replica.
+
     Args:
         request (HttpRequest): The HTTP request object.
         ticket_id (int): The ID of the ticket to be purchased.
@@ -221,13 +473,14 @@ def buy(request, ticket_id):
         HttpResponse: Rendered HTML template.
     """
     ticket = get_object_or_404(Ticket, id=ticket_id)
-    client = Client.objects.get(user=request.user)
-    if request.method == 'POST' and client.money >= ticket.price:
-        ticket.client_id = client.id
-        client.money -= ticket.price
-        ticket.save()
-        client.save()
-        return redirect('profile')
+    client = request_client(request)
+    error, hold = None, None
+    if request.method == 'POST' and 'hold' in request.POST:
+        hold, error = hold_for_page(client, ticket)
+    elif request.method == 'POST':
+        bought, error = purchase_for_page(client, ticket)
+        if bought:
+            return redirect('profile')
 
     return render(
         request=request,
@@ -235,8 +488,13 @@ def buy(request, ticket_id):
         context={
             'ticket': ticket,
             'client': client,
+            'error': error,
+            'hold': hold,
+            'hold_minutes': settings.SEAT_HOLD_MINUTES,
+            'held': error == HELD_ERROR,
             'test': client.id == ticket.client_id,
         },
+        status=status.HTTP_409_CONFLICT if error else status.HTTP_200_OK,
     )
 
 
@@ -265,27 +523,360 @@ class APIPermission(permissions.BasePermission):
         return False
 
 
-def create_view_set(model_class, serializer):
+TRUE_VALUES = frozenset(('1', 'true', 'yes'))
+
+
+class ConditionalViewSetMixin:
+    """Answer the list and detail requests of a ViewSet with the conditional responses."""
+
+    def conditional_response(self, records, respond, *parts):
+        """
+        Answer 304 if the client has the current version of the records.
+
+        Args:
+            records (list): Records of the response.
+            respond (Callable): Function building the response when they changed.
+            parts: Other values of the response, such as the page links.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        etag, last_modified = conditional.page_state(
+            records, self.request.accepted_renderer.format, *parts,
+        )
+        response = conditional.not_modified(self.request, etag, last_modified)
+        if response is None:
+            response = respond()
+        return conditional.add_validators(self.request, response, etag, last_modified)
+
+    def paginated_response(self, queryset):
+        """
+        Respond with a page of the records, or 304 if the page did not change.
+
+        Args:
+            queryset (QuerySet): Records to paginate.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        page = self.paginate_queryset(queryset)
+        # the links change when records are added around the page, not in it
+        return self.conditional_response(
+            page,
+            lambda: self.get_paginated_response(self.get_serializer(page, many=True).data),
+            self.paginator.page.next_cursor,
+            self.paginator.page.previous_cursor,
+        )
+
+    def list(self, request, *args, **kwargs):
+        """
+        List a page of the records.
+
+        Args:
+            request (Request): The incoming request.
+            args: Positional arguments of the URL.
+            kwargs: Keyword arguments of the URL.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        return self.paginated_response(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a record.
+
+        Args:
+            request (Request): The incoming request.
+            args: Positional arguments of the URL.
+            kwargs: Keyword arguments of the URL.
+
+        Returns:
+            HttpResponse: The response.
+        """
+        instance = self.get_object()
+        return self.conditional_response(
+            [instance], lambda: Response(self.get_serializer(instance).data),
+        )
+
+
+def create_view_set(model_class, serializer, compact_serializer, prefetched=()):
     """
     Create a custom ViewSet class for the given model and serializer.
 
+    Lists are paginated by the keyset pagination from the REST framework settings.
+    Clients may pass ?compact=1 to get plain ids instead of hyperlinks. Lists and
+    details carry an ETag and Last-Modified computed from the modified times of the
+    records, conditional requests for fresh ones are answered with 304 without
+    serializing them.
+
     Args:
         model_class (type): The model class for which the ViewSet is being created.
         serializer (type): The serializer class to be used with the ViewSet.
+        compact_serializer (type): The serializer class used in compact mode.
+        prefetched (tuple[str]): Many-to-many relations prefetched for the serializer.
 
     Returns:
         CustomViewSet: A custom ViewSet class that extends viewsets.ModelViewSet.
     """
-    class CustomViewSet(viewsets.ModelViewSet):
+    class CustomViewSet(ConditionalViewSetMixin, viewsets.ModelViewSet):
         """Custom ViewSet class for handling CRUD operations on the provided model."""
 
-        queryset = model_class.objects.all()
+        queryset = model_class.objects.prefetch_related(*prefetched)
         serializer_class = serializer
         permission_classes = [APIPermission]
 
+        def get_serializer_class(self):  # noqa: WPS615
+            if self.request.query_params.get('compact', '').lower() in TRUE_VALUES:
+                return compact_serializer
+            return serializer
+
     return CustomViewSet
 
 
-TheaterViewSet = create_view_set(Theater, TheaterSerialazer)
-PerformanceViewSet = create_view_set(Performance, PerformanceSerialazer)
-TicketViewSet = create_view_set(Ticket, TicketSerialazer)
+TheaterViewSet = create_view_set(
+    Theater, TheaterSerialazer, TheaterCompactSerialazer, prefetched=('performances',),
+)
+
+
+PerformanceBaseViewSet = create_view_set(
+    Performance, PerformanceSerialazer, PerformanceCompactSerialazer, prefetched=('theaters',),
+)
+
+
+class PerformanceViewSet(PerformanceBaseViewSet):
+    """ViewSet for performances with the feed of the upcoming ones."""
+
+    @action(detail=False)
+    def upcoming(self, request):
+        """
+        List the performances which did not take place yet, soonest first.
+
+        The feed is filtered by ?start, ?end and ?theater and paginated by a cursor.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            Response: A page of the performances.
+        """
+        filters = UpcomingFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        performances = schedule.upcoming(**filters.validated_data).prefetch_related('theaters')
+        return self.paginated_response(performances)
+
+
+TicketBaseViewSet = create_view_set(Ticket, TicketSerialazer, TicketCompactSerialazer)
+
+
+class TicketViewSet(TicketBaseViewSet):
+    """ViewSet for tickets with the bulk generation of a show seating."""
+
+    @action(detail=False, methods=['post'], serializer_class=TicketsGenerationSerializer)
+    def generate(self, request):
+        """
+        Create tickets of a show from a seat map.
+
+        All batches are inserted and committed before the response is built, so no
+        lock is held while the response is sent and 201 means the tickets exist.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            Response: Number of the 'created' tickets, the 'total' number of new ones
+                and the number of 'skipped' existing places.
+        """
+        serializer = TicketsGenerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        validated = serializer.validated_data
+        progress = seating.create_tickets(
+            validated['theater_performance'].id,
+            seating.seat_places(validated['seat_map'], validated['price_tiers']),
+            validated['time'],
+            validated['batch_size'],
+        )
+        return Response(progress, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True,
+        methods=['post', 'delete'],
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def hold(self, request, pk=None):
+        """
+        Hold the ticket for the client of the user, DELETE releases the hold.
+
+        Args:
+            request (Request): The incoming request.
+            pk (str): ID of the ticket.
+
+        Returns:
+            Response: The hold with its expiry time, or 409 if the ticket is sold or held.
+        """
+        ticket = self.get_object()
+        client = get_object_or_404(Client, user=request.user)
+        if request.method == 'DELETE':
+            released = holds.release(client.id, ticket.id)
+            return Response(
+                status=status.HTTP_204_NO_CONTENT if released else status.HTTP_404_NOT_FOUND,
+            )
+        try:
+            hold = holds.hold_ticket(client.id, ticket.id)
+        except purchase.SeatHeldError:
+            return Response({'detail': HELD_ERROR}, status=status.HTTP_409_CONFLICT)
+        except purchase.HoldLimitError:
+            return Response({'detail': HOLD_LIMIT_ERROR}, status=status.HTTP_409_CONFLICT)
+        except purchase.SeatTakenError:
+            return Response(
+                {'detail': 'This ticket is already sold'}, status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            {'ticket': hold.ticket_id, 'expires': hold.expires}, status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[permissions.IsAuthenticated],
+        serializer_class=BasketSerializer,
+    )
+    def basket(self, request):
+        """
+        Buy several tickets of one show at once, all of them or none.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            Response: IDs and the total price of the sold tickets, 409 if a ticket is
+                sold or held, 400 if the client can not pay or the shows differ.
+        """
+        serializer = BasketSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        client = get_object_or_404(Client, user=request.user)
+        try:
+            tickets = purchase.purchase_tickets(client.id, serializer.validated_data['tickets'])
+        except purchase.PurchaseError as error:
+            detail, status_code = BASKET_ERRORS[type(error)]
+            return Response({'detail': detail}, status=status_code)
+        return Response(
+            {
+                'tickets': [ticket.id for ticket in tickets],
+                'total': sum(ticket.price for ticket in tickets),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    @action(
+        detail=False,
+        url_path='export',
+        url_name='export',
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def export_tickets(self, request):
+        """
+        Stream the tickets with their shows and clients as CSV or NDJSON, for the staff.
+
+        The tickets are read through a server-side cursor, so the memory use does not
+        depend on their number. They are filtered by ?start, ?end (the performance date),
+        ?theater and ?sold, the format is chosen by ?output. Under ASGI the lines are
+        an asynchronous iterator, so Django does not read the whole export into memory
+        to serve it.
+
+        Args:
+            request (Request): The incoming request.
+
+        Returns:
+            StreamingHttpResponse: Lines of the export.
+        """
+        serializer = TicketExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        output = serializer.validated_data['output']
+        lines, content_type = export.export(
+            asynchronous=isinstance(request._request, ASGIRequest),  # noqa: WPS437
+            **serializer.validated_data,
+        )
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tickets.{output}"'
+        return response
+
+
+@api_view(['GET'])
+@permission_classes([APIPermission])
+def availability_view(request, theater_performance_id):
+    """
+    Get the seat availability of the show from the cache.
+
+    Seat i is free when bit i % 8 of byte i // 8 of the base64 encoded 'free' bitmap
+    is set. Pass ?layout=1 to get the places and ticket ids of the seats as well.
+
+    Args:
+        request (Request): The incoming request.
+        theater_performance_id (UUID): ID of the show.
+
+    Returns:
+        Response: Availability of the show.
+
+    Raises:
+        Http404: If the show does not exist.
+    """
+    seats = availability.get(theater_performance_id)
+    if seats is None:
+        raise Http404('No TheaterPerformance matches the given query.')
+    show = {
+        'theater_performance': theater_performance_id,
+        'seats': len(seats['places']),
+        'free_count': int.from_bytes(seats['free'], 'little').bit_count(),
+        'free': base64.b64encode(seats['free']).decode(),
+    }
+    if request.query_params.get('layout', '').lower() in TRUE_VALUES:
+        show['places'] = seats['places']
+        show['tickets'] = seats['tickets']
+    return Response(show)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def auth_cache_view(request):
+    """
+    Get the hit rate of the API token cache for the staff, DELETE resets the counters.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        Response: Numbers of the cache hits and misses and the share of hits.
+    """
+    if request.method == 'DELETE':
+        authentication.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(authentication.stats())
+
+
+@api_view(['GET'])
+@permission_classes([APIPermission])
+def search_api_view(request):
+    """
+    Search the theaters and the performances, the most relevant first.
+
+    Pass ?prefix=1 for the typeahead, every word is matched as a prefix then.
+    The number of results of every model is limited by ?limit.
+
+    Args:
+        request (Request): The incoming request.
+
+    Returns:
+        Response: Found theaters and performances with their rank.
+    """
+    text = request.query_params.get('q', '').strip()
+    if not text:
+        return Response({'q': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+    limit = request.query_params.get('limit', '')
+    limit = min(int(limit), SEARCH_MAX_LIMIT) if limit.isdigit() else SEARCH_RESULTS_LIMIT
+    prefix = request.query_params.get('prefix', '').lower() in TRUE_VALUES
+    theaters, performances = search_results(text, prefix, limit, search.trigram_enabled())
+    return Response({
+        'theaters': TheaterSearchSerialazer(theaters, many=True).data,
+        'performances': PerformanceSearchSerialazer(performances, many=True).data,
+    })